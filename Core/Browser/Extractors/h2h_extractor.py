@@ -16,6 +16,7 @@ from typing import Dict, Any, List
 from Core.Intelligence.selector_manager import SelectorManager
 from Data.Access.db_helpers import save_schedule_entry
 from Core.Browser.site_helpers import fs_universal_popup_dismissal
+from Core.Browser.page_archive import record_scenario
 import asyncio
 
 async def activate_h2h_tab(page: Page) -> bool:
@@ -109,6 +110,7 @@ async def extract_h2h_data(page: Page, home_team_main: str, away_team_main: str,
     Eliminates hardcoded CSS classes for robust scraping.
     """
     print("      [Extractor] Extracting H2H tab...")
+    await record_scenario("h2h", page, home_team_main=home_team_main, away_team_main=away_team_main, context=context)
 
     # Get ALL selectors from knowledge base matching exact keys from fs_h2h_tab.txt
     selectors = {
@@ -9,6 +9,7 @@ from typing import List, Dict, Any
 from playwright.async_api import Page, TimeoutError
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Browser.site_helpers import fs_universal_popup_dismissal
+from Core.Browser.page_archive import record_scenario
 
 CTX = "fs_league_page"
 
@@ -17,6 +18,7 @@ async def extract_league_match_urls(page: Page, league_url: str, mode: str = "re
     """
     Visits a league page (results or fixtures) and harvests all match URLs.
     """
+    await record_scenario("league_match_urls", page, league_url=league_url, mode=mode)
     target_url = league_url.rstrip('/')
     if mode == "results":
         if not target_url.endswith("/results"):
@@ -9,7 +9,8 @@ import re
 from typing import Dict, Any, List
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Browser.site_helpers import fs_universal_popup_dismissal
-import asyncio
+from Core.Browser.wait_helpers import wait_for_dom_quiet
+from Core.Browser.page_archive import record_scenario
 
 async def activate_standings_tab(page: Page) -> bool:
     """
@@ -65,15 +66,16 @@ async def activate_standings_tab(page: Page) -> bool:
 async def _post_activation_prep(page: Page):
     """Wait for content and dismiss popups after tab activation."""
     await page.wait_for_load_state("domcontentloaded")
-    await asyncio.sleep(2.0)
+    await wait_for_dom_quiet(page, quiet_ms=500, timeout=3000)
     await fs_universal_popup_dismissal(page, "fs_standings_tab")
-    await asyncio.sleep(3.0)
+    await wait_for_dom_quiet(page, quiet_ms=500, timeout=3000)
 
 async def extract_standings_data(page: Page, context: str = "fs_standings_tab") -> Dict[str, Any]:
     """
     Extracts essential standings data: position, team, stats, and league info.
     """
     print("      [Extractor] Extracting Standings tab...")
+    await record_scenario("standings", page, context=context)
 
     selectors = {
         "standings_row": SelectorManager.get_selector(context, "standings_row") or ".ui-table__row",
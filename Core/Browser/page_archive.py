@@ -0,0 +1,217 @@
+# page_archive.py: Record/replay archive of Flashscore and Football.com network traffic.
+# Part of LeoBook Core — Browser Automation
+#
+# Classes: PageArchive
+# Functions: request_key(), get_page_archive(), attach_page_archive(), record_scenario(), archive_mode()
+
+"""
+Page Archive Module
+LEO_PAGE_ARCHIVE=record saves every response a browser context receives
+(documents, XHR/fetch feeds, scripts, styles) under PAGE_ARCHIVE_DIR while
+Leo runs normally. LEO_PAGE_ARCHIVE=replay serves those responses back through
+Playwright route fulfillment, so the extractors run against a frozen copy of
+the sites with no network latency; requests that were never recorded are
+aborted. Scripts/replay_extractors.py replays the recorded extractor calls
+(scenarios) and times them.
+
+Layout:
+    index.jsonl     one line per response: key, url, method, status, headers, body sha1
+    bodies/<sha1>   response bodies, content-addressed (identical bodies stored once)
+    scenarios.jsonl extractor calls seen while recording (page URL, arguments, viewport, UA)
+
+Requests are keyed by method + URL (volatile cache-buster params dropped) + a
+hash of the POST body. A key recorded several times (polled feeds) is replayed
+in recorded order, repeating the last response once exhausted.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+PAGE_ARCHIVE_MODE = os.getenv("LEO_PAGE_ARCHIVE", "off").strip().lower()  # off | record | replay
+PAGE_ARCHIVE_DIR = os.getenv("LEO_PAGE_ARCHIVE_DIR", os.path.join("Data", "Store", "page_archive"))
+PAGE_ARCHIVE_IGNORE_PARAMS = {p.strip() for p in os.getenv(
+    "LEO_PAGE_ARCHIVE_IGNORE_PARAMS", "_,t,ts,timestamp,cb,rnd,nocache").split(",") if p.strip()}
+PAGE_ARCHIVE_SKIP_TYPES = {t.strip() for t in os.getenv(
+    "LEO_PAGE_ARCHIVE_SKIP_TYPES", "image,media,font").split(",") if t.strip()}
+
+# Headers that must not be replayed verbatim (the fulfilled body is already decoded)
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+def archive_mode() -> str:
+    return PAGE_ARCHIVE_MODE if PAGE_ARCHIVE_MODE in ("record", "replay") else "off"
+
+
+def request_key(method: str, url: str, post_data: Optional[bytes] = None) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k not in PAGE_ARCHIVE_IGNORE_PARAMS))
+    key = f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+    if post_data:
+        key += " #" + hashlib.sha1(post_data).hexdigest()[:12]
+    return key
+
+
+class PageArchive:
+    """One archive directory; records from or replays into Playwright browser contexts."""
+
+    def __init__(self, path: str = PAGE_ARCHIVE_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._bodies_dir = os.path.join(path, "bodies")
+        self._scenario_keys = set()
+        self.stats = defaultdict(int)
+
+    # ── Recording ──────────────────────────────────────────────
+
+    async def record_context(self, context, site: str = ""):
+        os.makedirs(self._bodies_dir, exist_ok=True)
+        pending = set()
+
+        def _on_response(response):
+            task = asyncio.ensure_future(self._store_response(response, site))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        context.on("response", _on_response)
+
+    async def _store_response(self, response, site: str):
+        try:
+            request = response.request
+            if request.resource_type in PAGE_ARCHIVE_SKIP_TYPES:
+                return
+            body = b""
+            if not 300 <= response.status < 400:
+                body = await response.body()
+            sha = hashlib.sha1(body).hexdigest()
+            body_path = os.path.join(self._bodies_dir, sha)
+            if not os.path.exists(body_path):
+                tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, body_path)
+            headers = {k: v for k, v in (await response.all_headers()).items() if k.lower() not in _DROP_HEADERS}
+            entry = {
+                "key": request_key(request.method, request.url, request.post_data_buffer),
+                "url": request.url,
+                "method": request.method,
+                "resource_type": request.resource_type,
+                "site": site,
+                "status": response.status,
+                "headers": headers,
+                "body": sha,
+            }
+            with self._lock:
+                with open(os.path.join(self.path, "index.jsonl"), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            self.stats["recorded"] += 1
+        except Exception as e:
+            # Responses of closed pages/contexts cannot be read any more
+            self.stats["record_errors"] += 1
+            if "closed" not in str(e).lower():
+                print(f"    [Archive] Could not record {getattr(response, 'url', '?')[:80]}: {e}")
+
+    async def record_scenario(self, extractor: str, page, **kwargs):
+        key = (extractor, page.url, json.dumps(kwargs, sort_keys=True, default=str))
+        if key in self._scenario_keys:
+            return
+        self._scenario_keys.add(key)
+        try:
+            user_agent = await page.evaluate("navigator.userAgent")
+        except Exception:
+            user_agent = None
+        scenario = {"extractor": extractor, "url": page.url, "kwargs": kwargs,
+                    "viewport": page.viewport_size, "user_agent": user_agent}
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            with open(os.path.join(self.path, "scenarios.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(scenario, default=str) + "\n")
+
+    # ── Replay ─────────────────────────────────────────────────
+
+    def entries(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._entries is None:
+            entries = defaultdict(list)
+            index_path = os.path.join(self.path, "index.jsonl")
+            if os.path.exists(index_path):
+                with open(index_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            entry = json.loads(line)
+                            entries[entry["key"]].append(entry)
+            self._entries = dict(entries)
+        return self._entries
+
+    def scenarios(self, extractor: Optional[str] = None) -> List[Dict[str, Any]]:
+        path = os.path.join(self.path, "scenarios.jsonl")
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return [r for r in rows if extractor is None or r["extractor"] == extractor]
+
+    def _body(self, sha: str) -> bytes:
+        with open(os.path.join(self._bodies_dir, sha), "rb") as f:
+            return f.read()
+
+    async def replay_context(self, context, miss: str = "abort"):
+        """Serves recorded responses to `context`; each context replays every key from its first response."""
+        entries = self.entries()
+        served = defaultdict(int)
+
+        async def _handle(route):
+            request = route.request
+            key = request_key(request.method, request.url, request.post_data_buffer)
+            recorded = entries.get(key)
+            if not recorded:
+                self.stats["misses"] += 1
+                if miss == "continue":
+                    await route.continue_()
+                else:
+                    await route.abort()
+                return
+            entry = recorded[min(served[key], len(recorded) - 1)]
+            served[key] += 1
+            self.stats["hits"] += 1
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=self._body(entry["body"]))
+
+        await context.route("**/*", _handle)
+
+
+_archive: Optional[PageArchive] = None
+
+
+def get_page_archive() -> PageArchive:
+    global _archive
+    if _archive is None:
+        _archive = PageArchive()
+    return _archive
+
+
+async def attach_page_archive(context, site: str = ""):
+    """Records or replays `context` according to LEO_PAGE_ARCHIVE (no-op when off)."""
+    mode = archive_mode()
+    if mode == "off" or context is None:
+        return
+    if mode == "record":
+        await get_page_archive().record_context(context, site)
+    else:
+        await get_page_archive().replay_context(context)
+
+
+async def record_scenario(extractor: str, page, **kwargs):
+    """Notes an extractor call while recording, so replay_extractors can re-run it."""
+    if archive_mode() != "record":
+        return
+    try:
+        await get_page_archive().record_scenario(extractor, page, **kwargs)
+    except Exception as e:
+        print(f"    [Archive] Could not record scenario '{extractor}': {e}")
@@ -0,0 +1,120 @@
+# wait_helpers.py: Readiness-predicate waits that replace fixed sleeps.
+# Part of LeoBook Core — Browser Automation
+#
+# Functions: wait_for_condition(), wait_for_selector_count_stable(), wait_for_network_idle(), wait_for_js_predicate(), wait_for_dom_quiet()
+
+"""
+Wait Helpers Module
+Adaptive waits for Playwright pages and frames. Each helper returns as soon as
+the page is ready and falls back to its timeout otherwise — none of them raise,
+so they can be dropped in wherever a fixed asyncio.sleep() used to sit.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Union
+from playwright.async_api import Page, Frame
+
+PageLike = Union[Page, Frame]
+
+# Resolves true once no DOM mutation has been seen for quietMs, false at timeoutMs.
+_DOM_QUIET_JS = r"""([quietMs, timeoutMs]) => new Promise(resolve => {
+    const root = document.body || document.documentElement;
+    if (!root) { resolve(true); return; }
+    let quietTimer = null;
+    let hardTimer = null;
+    let observer = null;
+    const done = (ok) => {
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(hardTimer);
+        resolve(ok);
+    };
+    observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    observer.observe(root, {childList: true, subtree: true, attributes: true, characterData: true});
+    quietTimer = setTimeout(() => done(true), quietMs);
+    hardTimer = setTimeout(() => done(false), timeoutMs);
+})"""
+
+
+async def wait_for_condition(condition_func: Callable[[], Awaitable[Any]], timeout: int = 10000, interval: float = 0.5) -> bool:
+    """
+    Polls a condition_func (async) until it returns True or timeout (ms) expires.
+    """
+    deadline = time.monotonic() + timeout / 1000.0
+    while True:
+        try:
+            if await condition_func():
+                return True
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(interval)
+
+
+async def wait_for_selector_count_stable(page: PageLike, selector: str, min_count: int = 1,
+                                         stable_ms: int = 500, timeout: int = 10000,
+                                         interval: float = 0.15) -> int:
+    """
+    Waits until at least min_count elements match selector and the count has not
+    changed for stable_ms. Returns the last observed count (also on timeout).
+    """
+    if not selector:
+        return 0
+    deadline = time.monotonic() + timeout / 1000.0
+    last_count = -1
+    stable_since = time.monotonic()
+    while True:
+        try:
+            count = await page.locator(selector).count()
+        except Exception:
+            count = 0
+        now = time.monotonic()
+        if count != last_count:
+            last_count = count
+            stable_since = now
+        elif count >= min_count and (now - stable_since) * 1000 >= stable_ms:
+            return count
+        if now >= deadline:
+            return max(last_count, 0)
+        await asyncio.sleep(interval)
+
+
+async def wait_for_network_idle(page: PageLike, timeout: int = 5000) -> bool:
+    """
+    Waits for Playwright's network-idle state (no connections for 500ms).
+    Pages with long-polling/websockets may never get there — returns False on timeout.
+    """
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_js_predicate(page: PageLike, expression: str, arg: Any = None,
+                                timeout: int = 10000, polling: int = 100) -> bool:
+    """Waits until a JS expression/function evaluates truthy in the page. Returns False on timeout."""
+    try:
+        await page.wait_for_function(expression, arg=arg, timeout=timeout, polling=polling)
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_dom_quiet(page: PageLike, quiet_ms: int = 400, timeout: int = 5000) -> bool:
+    """
+    Waits until the DOM has had no mutations for quiet_ms (e.g. after a click that
+    expands or re-renders a list). Returns False if the page kept changing until timeout.
+    """
+    try:
+        return bool(await asyncio.wait_for(
+            page.evaluate(_DOM_QUIET_JS, [quiet_ms, timeout]),
+            timeout=timeout / 1000.0 + 2
+        ))
+    except Exception:
+        return False
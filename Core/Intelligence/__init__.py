@@ -13,11 +13,26 @@ This package contains the core intelligence components for LeoBook:
 - Betting Markets: Market-specific math and probability
 """
 
-from .rule_engine import RuleEngine
-from .selector_manager import SelectorManager
-from .visual_analyzer import VisualAnalyzer
-from .popup_handler import PopupHandler
-from .page_analyzer import PageAnalyzer
+import importlib
+
+# Re-exports resolve on first access (PEP 562) so importing a light submodule
+# such as aigo_suite or llm_cache does not pull in numpy/Playwright/the AI stack.
+_LAZY_EXPORTS = {
+    "RuleEngine": ".rule_engine",
+    "SelectorManager": ".selector_manager",
+    "VisualAnalyzer": ".visual_analyzer",
+    "PopupHandler": ".popup_handler",
+    "PageAnalyzer": ".page_analyzer",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
 
 __version__ = "2.6.0"
 __all__ = [
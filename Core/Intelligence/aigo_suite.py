@@ -5,9 +5,27 @@
 
 import asyncio
 import functools
+import sys
 import time
 from typing import Callable, Any, Optional, Dict
-from playwright.async_api import Page, TimeoutError
+
+from Core.System.metrics import RETRIES
+from Core.System.tracing import span
+
+
+def _find_page(args, kwargs):
+    """First Playwright Page among the call arguments (Playwright itself is never imported here)."""
+    page = kwargs.get('page')
+    if page:
+        return page
+    pw = sys.modules.get("playwright.async_api")
+    if pw is None:
+        return None  # Playwright not loaded yet, so no argument can be a Page
+    for arg in args:
+        if isinstance(arg, pw.Page):
+            return arg
+    return None
+
 
 class AIGOSuite:
     """
@@ -20,7 +38,8 @@ class AIGOSuite:
         delay: float = 2.0,
         context_key: Optional[str] = None,
         element_key: Optional[str] = None,
-        use_aigo: bool = True
+        use_aigo: bool = True,
+        trace: bool = True
     ):
         """
         Universal decorator for retrying operations with AIGO healing as the final escape hatch.
@@ -31,17 +50,21 @@ class AIGOSuite:
             context_key: Context for AIGO healing (e.g., 'fb_match_page').
             element_key: Specific selector key to heal if the operation fails.
             use_aigo: Whether to trigger AIGO healing on the final failure.
+            trace: Whether to open an 'aigo_retry:<name>' span. Turn it off for
+                long-running entry points (Leo.main), whose span would otherwise
+                be the never-ending root of every cycle's trace.
         """
         def decorator(func: Callable):
             @functools.wraps(func)
             async def wrapper(*args, **kwargs):
+                if not trace:
+                    return await _with_retries(None, *args, **kwargs)
+                with span(f"aigo_retry:{func.__qualname__}") as current_span:
+                    return await _with_retries(current_span, *args, **kwargs)
+
+            async def _with_retries(current_span, *args, **kwargs):
                 # Attempt to extract 'page' from arguments
-                page = kwargs.get('page')
-                if not page:
-                    for arg in args:
-                        if isinstance(arg, Page):
-                            page = arg
-                            break
+                page = _find_page(args, kwargs)
 
                 last_exception = None
                 
@@ -51,7 +74,10 @@ class AIGOSuite:
                         return await func(*args, **kwargs)
                     except Exception as e:
                         last_exception = e
+                        if current_span is not None:
+                            current_span.set(failed_attempts=attempt + 1)
                         if attempt < max_retries:
+                            RETRIES.inc(function=func.__qualname__)
                             print(f"    [AIGO Retry] Attempt {attempt+1}/{max_retries+1} failed: {e}. Retrying in {delay}s...")
                             await asyncio.sleep(delay)
                         else:
@@ -63,6 +89,8 @@ class AIGOSuite:
                                     page, context_key, element_key, failure_reason=str(e)
                                 )
                                 
+                                if current_span is not None:
+                                    current_span.set(healed=bool(healed_selector))
                                 if healed_selector:
                                     print(f"    [AIGO SUCCESS] Healed selector found. Attempting final recovery run...")
                                     try:
@@ -1,23 +1,116 @@
 # api_manager.py: Manages AI API interactions (Grok, Gemini Fallback).
 # Part of LeoBook Core — Intelligence (AI Engine)
 #
-# Functions: unified_api_call(), grok_api_call(), gemini_api_call()
+# Functions: unified_api_call(), grok_api_call(), gemini_api_call(), get_http_client(), close_http_clients()
 
 import os
-import requests
 import json
 import base64
 import asyncio
 
+import httpx
+
+from .offline_llm import is_offline, is_recording, get_offline_provider
+from Core.System.metrics import llm_call_metrics
+from Core.System.tracing import traced
+
 # AI API configurations
 GROK_API_URL = "https://api.x.ai/v1/chat/completions"
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "180"))
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "32"))
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Shared transports, one per event loop (Leo.py runs several asyncio.run() calls
+# and an httpx/genai async client must not outlive the loop it was created on).
+_http_clients = {}    # id(loop) -> (loop, httpx.AsyncClient)
+_gemini_clients = {}  # (id(loop), api_key) -> (loop, genai.Client)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled keep-alive AsyncClient for the running event loop
+    (HTTP/2 when the h2 package is installed).
+    """
+    loop = asyncio.get_running_loop()
+    entry = _http_clients.get(id(loop))
+    if entry and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+    client = httpx.AsyncClient(
+        http2=_HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(LLM_HTTP_TIMEOUT, connect=15.0),
+        limits=httpx.Limits(
+            max_connections=LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS // 2,
+            keepalive_expiry=120.0,
+        ),
+    )
+    _http_clients[id(loop)] = (loop, client)
+    return client
+
+
+def _close_gemini_client(client):
+    """Best-effort synchronous close of a genai.Client (the only option once its loop is gone)."""
+    try:
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+    except Exception:
+        pass
+
+
+def _get_gemini_client(api_key: str):
+    """Reuses one genai.Client per key (and loop) instead of building a new client per call."""
+    import google.genai as genai
+    loop = asyncio.get_running_loop()
+    cache_key = (id(loop), api_key)
+    entry = _gemini_clients.get(cache_key)
+    if entry and entry[0] is loop:
+        return entry[1]
+    if entry:
+        # id(loop) was reused by a new loop: the cached client belongs to a dead one
+        _close_gemini_client(entry[1])
+    client = genai.Client(api_key=api_key)
+    _gemini_clients[cache_key] = (loop, client)
+    return client
+
+
+async def close_http_clients():
+    """Closes the transports owned by the running loop (call before the loop shuts down)."""
+    loop = asyncio.get_running_loop()
+    entry = _http_clients.pop(id(loop), None)
+    if entry and not entry[1].is_closed:
+        await entry[1].aclose()
+    for cache_key in [k for k in _gemini_clients if k[0] == id(loop)]:
+        owner, client = _gemini_clients.pop(cache_key)
+        if owner is not loop:
+            _close_gemini_client(client)
+            continue
+        try:
+            aclose = getattr(getattr(client, "aio", None), "aclose", None)
+            if aclose is not None:
+                await aclose()
+            _close_gemini_client(client)
+        except Exception:
+            pass
 
 
+@llm_call_metrics("Grok", default_model="grok-4-latest", key_env="GROK_API_KEY")
 async def grok_api_call(prompt_content, generation_config=None, **kwargs):
     """
     Calls Grok API for AI analysis (vision and text).
-    Uses asyncio.to_thread to keep the event loop running during the blocking request.
+    Uses the shared pooled AsyncClient (no thread hop, TLS session reused across calls).
     """
+    if is_offline():
+        return await get_offline_provider().generate(
+            prompt_content, generation_config, provider="Grok", model="grok-4-latest",
+            api_key=os.getenv("GROK_API_KEY", "offline-grok")
+        )
+
     grok_api_key = os.getenv("GROK_API_KEY")
     if not grok_api_key:
         raise ValueError("GROK_API_KEY environment variable not set")
@@ -31,6 +124,7 @@ async def grok_api_call(prompt_content, generation_config=None, **kwargs):
                 message_content.append({"type": "text", "text": item})
             elif isinstance(item, dict):
                 b64_data = None
+                mime_type = item.get("mime_type") or item.get("inline_data", {}).get("mime_type") or "image/png"
                 if "inline_data" in item:
                     b64_data = item["inline_data"].get("data")
                 elif "data" in item:
@@ -42,7 +136,7 @@ async def grok_api_call(prompt_content, generation_config=None, **kwargs):
                     message_content.append({
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/png;base64,{b64_data}"
+                            "url": f"data:{mime_type};base64,{b64_data}"
                         }
                     })
     elif isinstance(prompt_content, str):
@@ -85,18 +179,17 @@ async def grok_api_call(prompt_content, generation_config=None, **kwargs):
         payload["response_format"] = response_format
 
     # 4. Execute Request
-    def _make_grok_request():
-        headers = {
-            "Authorization": f"Bearer {grok_api_key}",
-            "Content-Type": "application/json"
-        }
-        return requests.post(GROK_API_URL, json=payload, headers=headers, timeout=180)
-
-    response = await asyncio.to_thread(_make_grok_request)
+    headers = {
+        "Authorization": f"Bearer {grok_api_key}",
+        "Content-Type": "application/json"
+    }
+    response = await get_http_client().post(GROK_API_URL, json=payload, headers=headers)
     response.raise_for_status()
 
     data = response.json()
     content = data['choices'][0]['message']['content']
+    if is_recording():
+        get_offline_provider().record(prompt_content, generation_config, content, "Grok", "grok-4-latest")
 
     # Wrap response to match Mock Leo AI object interface
     class MockLeoResponse:
@@ -113,20 +206,26 @@ async def grok_api_call(prompt_content, generation_config=None, **kwargs):
     return MockLeoResponse(content)
 
 
+@llm_call_metrics("Gemini", default_model="gemini-2.5-flash", key_env="GEMINI_API_KEY")
 async def gemini_api_call(prompt_content, generation_config=None, **kwargs):
     """
     Calls Google Gemini API for AI analysis.
-    Uses google-genai SDK v1.64+ (Client-based API).
+    Uses google-genai SDK v1.64+ (Client-based API) through its native async
+    surface (client.aio), with one cached client per key.
     Accepts optional api_key and model kwargs for multi-key/model rotation.
     """
     gemini_api_key = kwargs.get('api_key') or os.getenv("GEMINI_API_KEY", "").split(",")[0].strip()
+    if is_offline():
+        return await get_offline_provider().generate(
+            prompt_content, generation_config, provider="Gemini",
+            model=kwargs.get('model', 'gemini-2.5-flash'), api_key=gemini_api_key
+        )
     if not gemini_api_key:
         raise ValueError("GEMINI_API_KEY environment variable not set")
 
-    import google.genai as genai
     from google.genai import types
 
-    client = genai.Client(api_key=gemini_api_key)
+    client = _get_gemini_client(gemini_api_key)
 
     # 1. Parse Input (Text + Images)
     contents = []
@@ -140,6 +239,7 @@ async def gemini_api_call(prompt_content, generation_config=None, **kwargs):
             elif isinstance(item, dict):
                 b64_data = None
                 raw_bytes = None
+                mime_type = item.get("mime_type") or item.get("inline_data", {}).get("mime_type") or "image/png"
 
                 if "inline_data" in item:
                     b64_data = item["inline_data"].get("data")
@@ -156,7 +256,7 @@ async def gemini_api_call(prompt_content, generation_config=None, **kwargs):
                 if raw_bytes:
                     contents.append(types.Part.from_bytes(
                         data=raw_bytes,
-                        mime_type="image/png"
+                        mime_type=mime_type
                     ))
 
     # 2. Build config
@@ -180,28 +280,28 @@ async def gemini_api_call(prompt_content, generation_config=None, **kwargs):
     # 3. Execute Request — use model from kwargs or default
     model_name = kwargs.get('model', 'gemini-2.5-flash')
 
-    def _make_gemini_request():
-        return client.models.generate_content(
-            model=model_name,
-            contents=contents,
-            config=gen_config,
-        )
-
-    response = await asyncio.to_thread(_make_gemini_request)
+    response = await client.aio.models.generate_content(
+        model=model_name,
+        contents=contents,
+        config=gen_config,
+    )
 
     # Wrap response to match expected interface
     class MockGeminiResponse:
         def __init__(self, content):
             self.text = content
 
+    if is_recording():
+        get_offline_provider().record(prompt_content, generation_config, response.text, "Gemini", model_name)
     return MockGeminiResponse(response.text)
 
 
+@traced("llm.unified_api_call", attrs=lambda *a, **k: {"context": k.get("llm_context", "aigo")})
 async def unified_api_call(prompt_content, generation_config=None, **kwargs):
     """
     Unified API call with adaptive provider routing, multi-model + multi-key
     Gemini rotation, and auto-fallback.
-    
+
     Uses MODELS_DESCENDING chain: tries best model across all keys first,
     then downgrades model on exhaustion.
     """
@@ -214,6 +314,7 @@ async def unified_api_call(prompt_content, generation_config=None, **kwargs):
     # Get model chain for this context (default: AIGO = DESCENDING)
     context = kwargs.pop('llm_context', 'aigo')
     model_chain = health_manager.get_model_chain(context)
+    est_tokens = health_manager.estimate_tokens(prompt_content)
 
     last_error = None
     for provider_name in ordered:
@@ -228,10 +329,11 @@ async def unified_api_call(prompt_content, generation_config=None, **kwargs):
                 # Try up to 3 keys per model before downgrading
                 max_key_tries = min(3, len(health_manager._gemini_active or health_manager._gemini_keys))
                 for key_attempt in range(max_key_tries):
-                    api_key = health_manager.get_next_gemini_key(model=model_name)
+                    # Scheduler queues until a key has RPM/TPM capacity for this model
+                    api_key = await health_manager.acquire_gemini_key(model_name, est_tokens)
                     if not api_key:
-                        # All keys exhausted for this model — downgrade
-                        print(f"    [AI] All keys exhausted for {model_name}, downgrading...")
+                        # No key can serve this model soon enough — downgrade
+                        print(f"    [AI] No key capacity for {model_name}, downgrading...")
                         break
                     try:
                         key_suffix = api_key[-4:]
@@ -248,7 +350,6 @@ async def unified_api_call(prompt_content, generation_config=None, **kwargs):
                         if "429" in err_str or "RESOURCE_EXHAUSTED" in err_str:
                             health_manager.on_gemini_429(api_key, model=model_name)
                             print(f"    [AI] Key ...{key_suffix} rate-limited on {model_name}, rotating...")
-                            await asyncio.sleep(1)
                             continue
                         elif "403" in err_str:
                             health_manager.on_gemini_403(api_key)
@@ -0,0 +1,308 @@
+# dom_distiller.py: Compact DOM and screenshot payloads for AI healing calls.
+# Part of LeoBook Core — Intelligence (AI Engine)
+#
+# Functions: distill_dom(), distill_html(), capture_compact_screenshot()
+
+"""
+DOM Distiller Module
+Selector healing, state discovery and popup analysis used to ship the full
+page.content() and a full-page PNG with every call. The helpers here build a
+bounded payload instead: scripts/styles/SVG paths are dropped, only stable
+attributes are kept (ids, data-*, aria-*, roles, non-generated classes),
+runs of structurally identical siblings are collapsed to a few examples, and
+screenshots are viewport/element-cropped JPEGs at CSS scale.
+"""
+
+import os
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+DOM_DISTILL_MAX_CHARS = int(os.getenv("DOM_DISTILL_MAX_CHARS", "24000"))
+DOM_DISTILL_MAX_SIBLINGS = int(os.getenv("DOM_DISTILL_MAX_SIBLINGS", "3"))
+DOM_DISTILL_TEXT_CHARS = int(os.getenv("DOM_DISTILL_TEXT_CHARS", "80"))
+SCREENSHOT_MAX_WIDTH = int(os.getenv("AI_SCREENSHOT_MAX_WIDTH", "1024"))
+SCREENSHOT_JPEG_QUALITY = int(os.getenv("AI_SCREENSHOT_JPEG_QUALITY", "60"))
+
+# Elements that never help a selector decision
+_DROP_TAGS = {"script", "style", "noscript", "template", "link", "meta", "head", "iframe", "canvas", "path", "defs"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+_KEEP_ATTRS = {"id", "class", "name", "type", "role", "href", "placeholder", "title", "alt", "for", "value"}
+# Hashed/CSS-in-JS class names change on every deploy ('css-1abc23', 'sc-bdVaJa', 'jsx-123')
+_UNSTABLE_CLASS = re.compile(r"^(css|sc|jsx|emotion|styled)-[\w-]*$|^[a-z]{1,3}-?[0-9a-f]{5,}$|[0-9a-f]{8,}", re.IGNORECASE)
+
+# In-page walker: same rules as the Python fallback, but it also skips hidden elements.
+_DISTILL_JS = r"""([rootSelector, maxChars, maxSiblings, textChars]) => {
+    const DROP = new Set(["SCRIPT","STYLE","NOSCRIPT","TEMPLATE","LINK","META","HEAD","IFRAME","CANVAS"]);
+    const VOID = new Set(["AREA","BASE","BR","COL","EMBED","HR","IMG","INPUT","SOURCE","TRACK","WBR"]);
+    const KEEP = new Set(["id","class","name","type","role","href","placeholder","title","alt","for","value"]);
+    const UNSTABLE = /^(css|sc|jsx|emotion|styled)-[\w-]*$|^[a-z]{1,3}-?[0-9a-f]{5,}$|[0-9a-f]{8,}/i;
+    const root = (rootSelector && document.querySelector(rootSelector)) || document.body || document.documentElement;
+    if (!root) return "";
+    const out = [];
+    let size = 0;
+    let truncated = false;
+    const emit = (s) => {
+        if (truncated) return;
+        if (size + s.length > maxChars) { truncated = true; return; }
+        out.push(s); size += s.length;
+    };
+    const esc = (s) => s.replace(/"/g, "'");
+    const attrs = (el) => {
+        const parts = [];
+        for (const a of el.attributes) {
+            let name = a.name, val = a.value;
+            if (!(KEEP.has(name) || name.startsWith("data-") || name.startsWith("aria-"))) continue;
+            if (name === "class") {
+                val = val.split(/\s+/).filter(c => c && !UNSTABLE.test(c)).slice(0, 4).join(" ");
+                if (!val) continue;
+            }
+            if (name === "href" && val.length > 60) val = val.slice(0, 60) + "...";
+            if (val.length > 80) val = val.slice(0, 80) + "...";
+            parts.push(val === "" ? name : `${name}="${esc(val)}"`);
+        }
+        return parts.length ? " " + parts.join(" ") : "";
+    };
+    const signature = (el) => el.tagName + "." + (el.getAttribute("class") || "").split(/\s+/).filter(c => c && !UNSTABLE.test(c)).sort().join(".");
+    const hidden = (el) => {
+        if (el.hasAttribute("hidden")) return true;
+        const st = window.getComputedStyle(el);
+        return st.display === "none" || st.visibility === "hidden";
+    };
+    const walk = (el, depth) => {
+        if (truncated) return;
+        const tag = el.tagName;
+        if (DROP.has(tag) || hidden(el)) return;
+        const pad = " ".repeat(Math.min(depth, 20));
+        const t = tag.toLowerCase();
+        if (t === "svg") { emit(`${pad}<svg${attrs(el)}/>\n`); return; }
+        if (VOID.has(tag)) { emit(`${pad}<${t}${attrs(el)}>\n`); return; }
+        emit(`${pad}<${t}${attrs(el)}>\n`);
+        const seen = new Map();
+        let skipped = 0;
+        for (const node of el.childNodes) {
+            if (node.nodeType === 3) {
+                const text = node.textContent.replace(/\s+/g, " ").trim();
+                if (text) emit(`${pad} ${text.length > textChars ? text.slice(0, textChars) + "..." : text}\n`);
+            } else if (node.nodeType === 1) {
+                const sig = signature(node);
+                const n = (seen.get(sig) || 0) + 1;
+                seen.set(sig, n);
+                if (n > maxSiblings) { skipped++; continue; }
+                walk(node, depth + 1);
+            }
+        }
+        if (skipped) emit(`${pad} <!-- ${skipped} similar siblings omitted -->\n`);
+        emit(`${pad}</${t}>\n`);
+    };
+    walk(root, 0);
+    if (truncated) out.push("<!-- truncated -->\n");
+    return out.join("");
+}"""
+
+
+def _stable_attrs(attrs: List[tuple]) -> str:
+    parts = []
+    for name, value in attrs:
+        value = value or ""
+        if not (name in _KEEP_ATTRS or name.startswith("data-") or name.startswith("aria-")):
+            continue
+        if name == "class":
+            value = " ".join([c for c in value.split() if not _UNSTABLE_CLASS.search(c)][:4])
+            if not value:
+                continue
+        if name == "href" and len(value) > 60:
+            value = value[:60] + "..."
+        if len(value) > 80:
+            value = value[:80] + "..."
+        parts.append(f'{name}="{value.replace(chr(34), chr(39))}"' if value else name)
+    return (" " + " ".join(parts)) if parts else ""
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "signature", "children")
+
+    def __init__(self, tag: str, attrs: str, signature: str):
+        self.tag = tag
+        self.attrs = attrs
+        self.signature = signature
+        self.children: List[Any] = []  # _Node or str
+
+
+class _TreeBuilder(HTMLParser):
+    """Tolerant HTML -> light tree, dropping non-structural subtrees as it goes."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Node("root", "", "")
+        self._stack = [self.root]
+        self._drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._drop_depth:
+            if tag not in _VOID_TAGS:
+                self._drop_depth += 1
+            return
+        if tag in _DROP_TAGS:
+            if tag not in _VOID_TAGS:
+                self._drop_depth = 1
+            return
+        classes = dict(attrs).get("class") or ""
+        signature = tag + "." + ".".join(sorted(c for c in classes.split() if not _UNSTABLE_CLASS.search(c)))
+        node = _Node(tag, _stable_attrs(attrs), signature)
+        self._stack[-1].children.append(node)
+        if tag not in _VOID_TAGS and tag != "svg":
+            self._stack.append(node)
+        elif tag == "svg":
+            self._drop_depth = 1  # keep the <svg> marker, drop its paths
+
+    def handle_startendtag(self, tag, attrs):
+        if self._drop_depth or tag in _DROP_TAGS:
+            return
+        self._stack[-1].children.append(_Node(tag, _stable_attrs(attrs), tag))
+
+    def handle_endtag(self, tag):
+        if self._drop_depth:
+            self._drop_depth -= 1
+            return
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                return
+
+    def handle_data(self, data):
+        if self._drop_depth:
+            return
+        text = " ".join(data.split())
+        if text:
+            self._stack[-1].children.append(text)
+
+
+def _render(node: _Node, depth: int, out: List[str], budget: List[int], max_siblings: int, text_chars: int):
+    pad = " " * min(depth, 20)
+
+    def emit(line: str) -> bool:
+        if budget[0] < len(line):
+            budget[0] = -1
+            return False
+        out.append(line)
+        budget[0] -= len(line)
+        return True
+
+    if node.tag in _VOID_TAGS or node.tag == "svg":
+        emit(f"{pad}<{node.tag}{node.attrs}{'/' if node.tag == 'svg' else ''}>\n")
+        return
+    if node.tag != "root" and not emit(f"{pad}<{node.tag}{node.attrs}>\n"):
+        return
+    seen: Dict[str, int] = {}
+    skipped = 0
+    for child in node.children:
+        if budget[0] < 0:
+            return
+        if isinstance(child, str):
+            emit(f"{pad} {child[:text_chars] + '...' if len(child) > text_chars else child}\n")
+            continue
+        seen[child.signature] = seen.get(child.signature, 0) + 1
+        if seen[child.signature] > max_siblings:
+            skipped += 1
+            continue
+        _render(child, depth + 1, out, budget, max_siblings, text_chars)
+    if skipped:
+        emit(f"{pad} <!-- {skipped} similar siblings omitted -->\n")
+    if node.tag != "root":
+        emit(f"{pad}</{node.tag}>\n")
+
+
+def distill_html(html: str, max_chars: int = DOM_DISTILL_MAX_CHARS,
+                 max_siblings: int = DOM_DISTILL_MAX_SIBLINGS,
+                 text_chars: int = DOM_DISTILL_TEXT_CHARS) -> str:
+    """
+    Distills an HTML string (e.g. a logged page or page.content()) to an indented,
+    attribute-filtered outline of at most max_chars. Cannot see CSS visibility —
+    prefer distill_dom() when a live page is available.
+    """
+    if not html:
+        return ""
+    builder = _TreeBuilder()
+    try:
+        builder.feed(html)
+        builder.close()
+    except Exception:
+        pass
+    out: List[str] = []
+    budget = [max_chars]
+    _render(builder.root, -1, out, budget, max_siblings, text_chars)
+    if budget[0] < 0:
+        out.append("<!-- truncated -->\n")
+    return "".join(out)
+
+
+async def distill_dom(page, root_selector: Optional[str] = None, max_chars: int = DOM_DISTILL_MAX_CHARS,
+                      max_siblings: int = DOM_DISTILL_MAX_SIBLINGS,
+                      text_chars: int = DOM_DISTILL_TEXT_CHARS) -> str:
+    """
+    Distills the live DOM in-page (visible elements only), optionally rooted at
+    root_selector (e.g. an open dialog). Falls back to distill_html(page.content()).
+    """
+    try:
+        return await page.evaluate(_DISTILL_JS, [root_selector, max_chars, max_siblings, text_chars])
+    except Exception as e:
+        print(f"    [DOM Distill] In-page distillation failed ({e}); using HTML fallback.")
+    try:
+        return distill_html(await page.content(), max_chars, max_siblings, text_chars)
+    except Exception:
+        return ""
+
+
+def _downscale(data: bytes, max_width: int, quality: int) -> bytes:
+    """Resizes a JPEG wider than max_width when Pillow is installed; otherwise returns it unchanged."""
+    try:
+        from PIL import Image
+        import io
+    except ImportError:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.width <= max_width:
+                return data
+            height = max(1, int(img.height * max_width / img.width))
+            buf = io.BytesIO()
+            img.convert("RGB").resize((max_width, height)).save(buf, format="JPEG", quality=quality)
+            return buf.getvalue()
+    except Exception:
+        return data
+
+
+async def capture_compact_screenshot(page, clip_selector: Optional[str] = None,
+                                     max_width: int = SCREENSHOT_MAX_WIDTH,
+                                     quality: int = SCREENSHOT_JPEG_QUALITY,
+                                     padding: int = 16) -> Optional[Dict[str, Any]]:
+    """
+    Viewport (or clip_selector element) JPEG at CSS pixel scale, downscaled to
+    max_width when Pillow is available. Returns an image part {"mime_type", "data"} for unified_api_call,
+    or None if the capture failed.
+    """
+    options: Dict[str, Any] = {"type": "jpeg", "quality": quality, "scale": "css", "timeout": 5000}
+    try:
+        viewport = page.viewport_size or {"width": max_width, "height": 800}
+        clip = None
+        if clip_selector:
+            try:
+                box = await page.locator(clip_selector).first.bounding_box(timeout=1000)
+            except Exception:
+                box = None
+            if box and box["width"] > 0 and box["height"] > 0:
+                x = max(0.0, box["x"] - padding)
+                y = max(0.0, box["y"] - padding)
+                clip = {
+                    "x": x, "y": y,
+                    "width": min(box["width"] + 2 * padding, viewport["width"] - x),
+                    "height": min(box["height"] + 2 * padding, viewport["height"] - y),
+                }
+        if clip and clip["width"] > 0 and clip["height"] > 0:
+            options["clip"] = clip
+        data = await page.screenshot(**options)
+    except Exception as e:
+        print(f"    [DOM Distill] Compact screenshot failed: {e}")
+        return None
+    return {"mime_type": "image/jpeg", "data": _downscale(data, max_width, quality)}
@@ -0,0 +1,184 @@
+# llm_cache.py: Persistent content-addressed cache for LLM responses.
+# Part of LeoBook Core — Intelligence (AI Engine)
+#
+# Classes: LLMResponseCache
+# Functions: make_cache_key(), get_llm_cache()
+
+"""
+LLM Response Cache Module
+Stores parsed LLM answers in a local SQLite file keyed by a SHA-256 of
+(namespace, model, prompt, normalized inputs). Entries expire after a TTL and
+the table is trimmed to a maximum size (least recently used first), so
+repeated metadata questions across runs cost no quota or latency.
+
+With LLM_PROVIDER_MODE=offline the cache is off: synthetic answers must never
+be served to a live run, and offline throughput runs must pay the simulated
+latency and injected faults on every call.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("Data", "Store", "llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86400
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+_PRUNE_EVERY = 200  # writes between size-cap checks
+
+
+def _normalize(value: Any) -> Any:
+    """Makes prompt inputs hashable in a stable way (bytes are digested, dict keys sorted)."""
+    if isinstance(value, bytes):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def make_cache_key(namespace: str, model: str, prompt: Any, inputs: Any = None) -> str:
+    """SHA-256 over the namespace, model, whitespace-normalized prompt and inputs."""
+    material = json.dumps(
+        [namespace, model or "", _normalize(prompt), _normalize(inputs)],
+        sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed key/value store with TTL expiry and an LRU size cap."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT,
+                    model TEXT,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Any:
+        """Returns the cached parsed value or None on miss/expiry/error."""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                value, expires_at = row
+                if expires_at is not None and expires_at <= now:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.hits += 1
+            return json.loads(value)
+        except Exception as e:
+            print(f"    [LLM Cache] Read failed: {e}")
+            return None
+
+    def set(self, key: str, value: Any, namespace: str = "", model: str = "",
+            ttl_seconds: Optional[float] = None):
+        """Stores a JSON-serializable value. Silently skips values that cannot be serialized."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, namespace, model, value, created_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, namespace, model, payload, now, now + ttl if ttl else None, now)
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % _PRUNE_EVERY == 0:
+                    self._prune_locked(conn)
+        except Exception as e:
+            print(f"    [LLM Cache] Write failed: {e}")
+
+    def _prune_locked(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+        conn.commit()
+
+    def prune(self):
+        """Drops expired rows and trims to max_entries."""
+        try:
+            with self._lock:
+                self._prune_locked(self._connect())
+        except Exception as e:
+            print(f"    [LLM Cache] Prune failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "path": self.path,
+        }
+
+
+_cache_instance: Optional[LLMResponseCache] = None
+_instance_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache, or None when LLM_CACHE_ENABLED is off or in offline mode."""
+    global _cache_instance
+    from .offline_llm import is_offline
+    if not LLM_CACHE_ENABLED or is_offline():
+        return None
+    with _instance_lock:
+        if _cache_instance is None:
+            _cache_instance = LLMResponseCache()
+        return _cache_instance
@@ -1,7 +1,7 @@
 # llm_health_manager.py: Adaptive LLM provider health-check and routing.
 # Part of LeoBook Core — Intelligence (AI Engine)
 #
-# Classes: LLMHealthManager
+# Classes: LLMHealthManager, TokenBucket
 # Called by: api_manager.py, build_search_dict.py
 
 """
@@ -20,17 +20,89 @@ Model Chains (Feb 2026 free-tier rate limits per key):
 
 DESCENDING = pro-first (AIGO predictions, match analysis)
 ASCENDING  = lite-first (search-dict metadata enrichment)
+
+Scheduling: every (key, model) pair has RPM and TPM token buckets plus an RPD
+counter. acquire_gemini_key() hands out the key with capacity right now and,
+when every key is momentarily saturated, awaits the earliest refill instead of
+firing a request that would come back 429. on_gemini_429() remains as a safety
+net for limits we did not predict.
+
+Persistence: ping results, 403-dead keys, per-model exhaustion marks and daily
+usage counters are written (debounced, atomically) to LLM_HEALTH_STATE_PATH and
+restored when the singleton is created. Keys are stored as SHA-256 fingerprints,
+never in clear. A 403-dead mark expires after LLM_DEAD_KEY_TTL_HOURS: the key is
+then re-probed on the next ping and rejoins the pool if it answers. A restart
+within LLM_HEALTH_STATE_TTL reuses the last ping instead of re-probing every
+provider; older state is refreshed lazily by the first ensure_initialized() call.
+With LLM_PROVIDER_MODE=offline the state lives in LLM_OFFLINE_HEALTH_STATE_PATH
+instead, so injected 403s/429s never mark real keys dead for live runs.
 """
 
 import os
+import json
 import time
+import atexit
 import asyncio
-import requests
+import hashlib
+import threading
+from datetime import datetime
 from dotenv import load_dotenv
 
+try:
+    from zoneinfo import ZoneInfo
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")  # Gemini daily quotas reset at midnight Pacific
+except Exception:
+    _QUOTA_TZ = None
+
 load_dotenv()
 
 PING_INTERVAL = 900  # 15 minutes
+GEMINI_MAX_QUEUE_WAIT = float(os.getenv("GEMINI_MAX_QUEUE_WAIT", "65"))  # seconds a call may queue for capacity
+GEMINI_DEFAULT_OUTPUT_TOKENS = 1024  # reserved per call on top of the prompt estimate
+LLM_HEALTH_STATE_PATH = os.getenv("LLM_HEALTH_STATE_PATH", os.path.join("Data", "Store", "llm_health.json"))
+LLM_OFFLINE_HEALTH_STATE_PATH = os.getenv("LLM_OFFLINE_HEALTH_STATE_PATH",
+                                          os.path.join("Data", "Store", "llm_health.offline.json"))
+LLM_HEALTH_STATE_TTL = float(os.getenv("LLM_HEALTH_STATE_TTL", str(PING_INTERVAL)))  # seconds a saved ping is trusted
+LLM_HEALTH_FLUSH_INTERVAL = float(os.getenv("LLM_HEALTH_FLUSH_INTERVAL", "10"))  # debounce for state writes
+LLM_DEAD_KEY_TTL_HOURS = float(os.getenv("LLM_DEAD_KEY_TTL_HOURS", "24"))  # a 403-dead key is re-probed after this
+
+
+def _state_path() -> str:
+    """Offline runs keep their own state file: injected faults must not outlive them."""
+    from .offline_llm import is_offline
+    return LLM_OFFLINE_HEALTH_STATE_PATH if is_offline() else LLM_HEALTH_STATE_PATH
+
+
+class TokenBucket:
+    """Continuous-refill token bucket (capacity tokens per 60 seconds)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def drain(self):
+        """Empties the bucket (used after an unexpected 429)."""
+        self._refill()
+        self.tokens = 0.0
 
 
 class LLMHealthManager:
@@ -61,6 +133,16 @@ class LLMHealthManager:
     # Default model for health-check pings (cheapest)
     PING_MODEL = "gemini-2.5-flash-lite"
 
+    # Free-tier limits per key: model -> (RPM, TPM, RPD)
+    MODEL_LIMITS = {
+        "gemini-2.5-pro":         (5,  250_000,   100),
+        "gemini-3-flash-preview": (5,  250_000,    20),
+        "gemini-2.5-flash":       (10, 250_000,   250),
+        "gemini-2.0-flash":       (15, 1_000_000, 1500),
+        "gemini-2.5-flash-lite":  (15, 250_000,  1000),
+    }
+    DEFAULT_LIMITS = (5, 250_000, 100)
+
     GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/openai/chat/completions"
     GROK_API_URL = "https://api.x.ai/v1/chat/completions"
     GROK_MODEL = "grok-4-latest"
@@ -76,6 +158,22 @@ class LLMHealthManager:
             cls._instance._initialized = False
             # Per-model exhausted keys (model_name -> set of exhausted keys)
             cls._instance._model_exhausted_keys = {}
+            # Scheduler state: (key, model) -> {"rpm": TokenBucket, "tpm": TokenBucket, "day": str, "used_today": int}
+            cls._instance._budgets = {}
+            cls._instance._budget_lock = threading.Lock()
+            # Persistence: (model, key) -> time marked exhausted; 403-dead key fingerprint -> time
+            # marked dead; restored (key, model) -> (day, used_today) seeds for _budget()
+            cls._instance._exhausted_at = {}
+            cls._instance._dead_fps = {}
+            cls._instance._restored_usage = {}
+            # Dirty when _state_changes != _state_written (the count covered by the last write)
+            cls._instance._state_changes = 0
+            cls._instance._state_written = 0
+            cls._instance._state_timer = None
+            cls._instance._state_lock = threading.Lock()
+            cls._instance._state_write_lock = threading.Lock()
+            cls._instance._restore_state()
+            atexit.register(cls._instance.flush_state)
         return cls._instance
 
     # ── Public API ──────────────────────────────────────────────
@@ -128,7 +226,7 @@ class LLMHealthManager:
     def get_next_gemini_key(self, model: str = None) -> str:
         """
         Round-robin through active Gemini keys, skipping keys exhausted for
-        the given model.
+        the given model. Legacy, non-queueing accessor — prefer acquire_gemini_key().
         """
         pool = self._gemini_active if self._gemini_active else self._gemini_keys
         if not pool:
@@ -145,15 +243,116 @@ class LLMHealthManager:
         self._gemini_index += 1
         return key
 
+    # ── Proactive Scheduler ─────────────────────────────────────
+
+    @staticmethod
+    def estimate_tokens(prompt_content) -> int:
+        """Rough prompt size (≈4 chars/token, ~260 tokens per image) plus the output reservation."""
+        chars, images = 0, 0
+        items = prompt_content if isinstance(prompt_content, list) else [prompt_content]
+        for item in items:
+            if isinstance(item, str):
+                chars += len(item)
+            elif item is not None:
+                images += 1
+        return chars // 4 + images * 260 + GEMINI_DEFAULT_OUTPUT_TOKENS
+
+    @staticmethod
+    def _quota_day() -> str:
+        now = datetime.now(_QUOTA_TZ) if _QUOTA_TZ else datetime.utcnow()
+        return now.strftime("%Y-%m-%d")
+
+    def _budget(self, key: str, model: str) -> dict:
+        """Caller holds _budget_lock."""
+        state = self._budgets.get((key, model))
+        if state is None:
+            rpm, tpm, _ = self.MODEL_LIMITS.get(model, self.DEFAULT_LIMITS)
+            day, used = self._restored_usage.pop((key, model), (self._quota_day(), 0))
+            state = {"rpm": TokenBucket(rpm), "tpm": TokenBucket(tpm), "day": day, "used_today": used}
+            self._budgets[(key, model)] = state
+        today = self._quota_day()
+        if state["day"] != today:
+            state["day"], state["used_today"] = today, 0
+        return state
+
+    def reserve_gemini_key(self, model: str, est_tokens: int = GEMINI_DEFAULT_OUTPUT_TOKENS):
+        """
+        Non-blocking reservation. Returns (key, 0.0) when a key has capacity now,
+        ("", seconds) when the earliest key frees up after `seconds`, or ("", None)
+        when every key is out of daily quota / exhausted for this model.
+        """
+        pool = self._gemini_active if self._gemini_active else self._gemini_keys
+        exhausted = self._model_exhausted_keys.get(model, set())
+        rpd = self.MODEL_LIMITS.get(model, self.DEFAULT_LIMITS)[2]
+        with self._budget_lock:
+            candidates = [k for k in pool if k not in exhausted]
+            if not candidates:
+                return "", None
+            # Rotate the starting point so load spreads evenly across keys
+            start = self._gemini_index % len(candidates)
+            ordered = candidates[start:] + candidates[:start]
+            best_wait = None
+            for key in ordered:
+                state = self._budget(key, model)
+                if state["used_today"] >= rpd:
+                    continue
+                wait = max(state["rpm"].wait_time(1), state["tpm"].wait_time(est_tokens))
+                if wait <= 0:
+                    state["rpm"].consume(1)
+                    state["tpm"].consume(est_tokens)
+                    state["used_today"] += 1
+                    self._gemini_index += 1
+                    self._state_changes += 1
+                    self._schedule_flush()
+                    return key, 0.0
+                best_wait = wait if best_wait is None else min(best_wait, wait)
+            return "", best_wait
+
+    async def acquire_gemini_key(self, model: str, est_tokens: int = GEMINI_DEFAULT_OUTPUT_TOKENS,
+                                 max_wait: float = GEMINI_MAX_QUEUE_WAIT) -> str:
+        """
+        Queues (without blocking the event loop) until some key has RPM/TPM capacity
+        for `model`. Returns "" when no key can serve it within max_wait — the caller
+        should downgrade to the next model.
+        """
+        deadline = time.monotonic() + max_wait
+        announced = False
+        while True:
+            key, wait = self.reserve_gemini_key(model, est_tokens)
+            if key:
+                return key
+            if wait is None or time.monotonic() + wait > deadline:
+                return ""
+            if not announced:
+                print(f"    [LLM Health] All keys at capacity for {model}; queueing {wait:.1f}s...")
+                announced = True
+            await asyncio.sleep(min(wait + 0.05, max(0.05, deadline - time.monotonic())))
+
+    def scheduler_snapshot(self) -> dict:
+        """Per-model view of remaining capacity (for logs/metrics)."""
+        snapshot = {}
+        with self._budget_lock:
+            for (key, model), state in self._budgets.items():
+                rpd = self.MODEL_LIMITS.get(model, self.DEFAULT_LIMITS)[2]
+                entry = snapshot.setdefault(model, {"keys": 0, "used_today": 0, "daily_capacity": 0})
+                entry["keys"] += 1
+                entry["used_today"] += state["used_today"]
+                entry["daily_capacity"] += rpd
+        return snapshot
+
     def on_gemini_429(self, failed_key: str, model: str = None):
         """
         Called when a Gemini key hits 429 for a specific model.
         Marks the key as exhausted for that model (not globally).
         """
         if model:
+            with self._budget_lock:
+                self._budget(failed_key, model)["rpm"].drain()
             if model not in self._model_exhausted_keys:
                 self._model_exhausted_keys[model] = set()
             self._model_exhausted_keys[model].add(failed_key)
+            self._exhausted_at[(model, failed_key)] = time.time()
+            self.save_state()
             remaining = len([k for k in (self._gemini_active or self._gemini_keys)
                            if k not in self._model_exhausted_keys[model]])
             print(f"    [LLM Health] Key ...{failed_key[-4:]} exhausted for {model}. "
@@ -168,19 +367,175 @@ class LLMHealthManager:
                 print(f"    [LLM Health] Gemini key rotated out (429). {remaining} keys remaining.")
                 if remaining == 0:
                     print(f"    [LLM Health] ⚠ All {len(self._gemini_keys)} Gemini keys exhausted!")
+                self.save_state()
 
     def on_gemini_403(self, failed_key: str):
-        """Called when a Gemini key hits 403. Permanently remove from ALL pools."""
+        """Called when a Gemini key hits 403. Removed from ALL pools until re-probed after LLM_DEAD_KEY_TTL_HOURS."""
         if failed_key in self._gemini_active:
             self._gemini_active.remove(failed_key)
         if failed_key in self._gemini_keys:
             self._gemini_keys.remove(failed_key)
-        print(f"    [LLM Health] Gemini key permanently removed (403 Forbidden). "
+        self._dead_fps[self._fingerprint(failed_key)] = time.time()
+        print(f"    [LLM Health] Gemini key removed (403 Forbidden) for {LLM_DEAD_KEY_TTL_HOURS:g}h. "
               f"{len(self._gemini_active)} active, {len(self._gemini_keys)} total.")
+        self.save_state(immediate=True)
 
     def reset_model_exhaustion(self):
         """Reset per-model exhaustion tracking (call at start of each cycle)."""
         self._model_exhausted_keys.clear()
+        self._exhausted_at.clear()
+        self.save_state()
+
+    # ── Persistence ─────────────────────────────────────────────
+
+    @staticmethod
+    def _fingerprint(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _all_configured_gemini_keys() -> list:
+        raw = os.getenv("GEMINI_API_KEY", "")
+        return [k.strip() for k in raw.split(",") if k.strip()]
+
+    def _configured_gemini_keys(self) -> list:
+        """GEMINI_API_KEY entries minus keys marked dead (403); expired marks wait for _reprobe_dead_keys()."""
+        return [k for k in self._all_configured_gemini_keys() if self._fingerprint(k) not in self._dead_fps]
+
+    async def _reprobe_dead_keys(self):
+        """Pings configured keys whose 403 mark is older than LLM_DEAD_KEY_TTL_HOURS; live ones are revived."""
+        now = time.time()
+        ttl = LLM_DEAD_KEY_TTL_HOURS * 3600
+        configured = {self._fingerprint(k): k for k in self._all_configured_gemini_keys()}
+        # Marks of keys no longer configured are dropped once expired
+        for fp, marked_at in list(self._dead_fps.items()):
+            if now - marked_at < ttl:
+                continue
+            key = configured.get(fp)
+            if key is None:
+                del self._dead_fps[fp]
+            elif await self._ping_key("Gemini", self.GEMINI_API_URL, self.PING_MODEL, key):
+                del self._dead_fps[fp]
+                print(f"  [LLM Health] Gemini key ...{key[-4:]} answers again — back in the pool.")
+            else:
+                self._dead_fps[fp] = now
+                print(f"  [LLM Health] Gemini key ...{key[-4:]} still failing — kept out for {LLM_DEAD_KEY_TTL_HOURS:g}h.")
+
+    def _restore_state(self):
+        """Loads the last saved health state. Missing/corrupt files just mean a cold start."""
+        try:
+            with open(_state_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"  [LLM Health] Ignoring unreadable state file: {e}")
+            return
+
+        now = time.time()
+        dead = data.get("gemini_dead", {})
+        # Version-1 files stored a bare list: start their expiry clock now
+        self._dead_fps = {fp: now for fp in dead} if isinstance(dead, list) else {fp: float(t) for fp, t in dead.items()}
+        self._gemini_keys = self._configured_gemini_keys()
+        by_fp = {self._fingerprint(k): k for k in self._gemini_keys}
+
+        # Exhaustion marks live as long as an in-process re-ping would have kept them
+        for model, marks in data.get("exhausted", {}).items():
+            for fp, marked_at in marks.items():
+                key = by_fp.get(fp)
+                if key and now - marked_at < PING_INTERVAL:
+                    self._model_exhausted_keys.setdefault(model, set()).add(key)
+                    self._exhausted_at[(model, key)] = marked_at
+
+        today = self._quota_day()
+        for fp, models in data.get("usage", {}).items():
+            key = by_fp.get(fp)
+            if not key:
+                continue
+            for model, (day, used) in models.items():
+                if day == today:
+                    self._restored_usage[(key, model)] = (day, int(used))
+
+        last_ping = float(data.get("last_ping", 0.0))
+        if last_ping and now - last_ping < LLM_HEALTH_STATE_TTL:
+            active_fps = set(data.get("gemini_active", []))
+            self._gemini_active = [k for k in self._gemini_keys if self._fingerprint(k) in active_fps]
+            self._grok_active = bool(data.get("grok_active")) and bool(os.getenv("GROK_API_KEY"))
+            self._last_ping = last_ping
+            self._initialized = True
+            age = int(now - last_ping)
+            print(f"  [LLM Health] Restored provider state ({age}s old): Grok {'✓' if self._grok_active else '✗'}, "
+                  f"Gemini {len(self._gemini_active)}/{len(self._gemini_keys)} keys.")
+
+    def _snapshot_state(self) -> dict:
+        with self._budget_lock:
+            usage = {}
+            for (key, model), state in self._budgets.items():
+                if state["used_today"]:
+                    usage.setdefault(self._fingerprint(key), {})[model] = [state["day"], state["used_today"]]
+            for (key, model), (day, used) in self._restored_usage.items():
+                usage.setdefault(self._fingerprint(key), {}).setdefault(model, [day, used])
+        # The event loop mutates these while a Timer thread flushes: copy each one in a
+        # single C-level call before iterating
+        exhausted_at, dead_fps, gemini_active = self._exhausted_at.copy(), self._dead_fps.copy(), list(self._gemini_active)
+        exhausted = {}
+        for (model, key), marked_at in exhausted_at.items():
+            exhausted.setdefault(model, {})[self._fingerprint(key)] = marked_at
+        return {
+            "version": 2,
+            "saved_at": time.time(),
+            "last_ping": self._last_ping,
+            "grok_active": self._grok_active,
+            "gemini_active": [self._fingerprint(k) for k in gemini_active],
+            "gemini_dead": dict(sorted(dead_fps.items())),
+            "exhausted": exhausted,
+            "usage": usage,
+        }
+
+    def _schedule_flush(self):
+        with self._state_lock:
+            if self._state_timer is None and LLM_HEALTH_FLUSH_INTERVAL > 0:
+                self._state_timer = threading.Timer(LLM_HEALTH_FLUSH_INTERVAL, self.flush_state)
+                self._state_timer.daemon = True
+                self._state_timer.start()
+
+    def save_state(self, immediate: bool = False):
+        """Marks the health state dirty; writes after LLM_HEALTH_FLUSH_INTERVAL (or now if immediate)."""
+        self._state_changes += 1
+        if immediate or LLM_HEALTH_FLUSH_INTERVAL <= 0:
+            self.flush_state()
+        else:
+            self._schedule_flush()
+
+    def flush_state(self) -> bool:
+        """
+        Writes pending state atomically (tmp file + os.replace). Returns True if a write
+        happened. Writers are serialized; the state only counts as written once
+        os.replace succeeded, and changes made during the write keep it dirty.
+        """
+        with self._state_lock:
+            if self._state_timer is not None:
+                self._state_timer.cancel()
+                self._state_timer = None
+        with self._state_write_lock:
+            changes = self._state_changes
+            if changes == self._state_written:
+                return False
+            state_path = _state_path()
+            tmp_path = state_path + ".tmp"
+            try:
+                data = self._snapshot_state()
+                os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=1)
+                os.replace(tmp_path, state_path)
+                self._state_written = changes
+                return True
+            except Exception as e:
+                print(f"  [LLM Health] Failed to persist state: {e}")
+                return False
+            finally:
+                if self._state_changes != self._state_written:
+                    self._schedule_flush()
 
     # ── Internals ───────────────────────────────────────────────
 
@@ -188,12 +543,13 @@ class LLMHealthManager:
         """Ping Grok + sample Gemini keys."""
         print("  [LLM Health] Pinging providers...")
 
-        # Parse Gemini keys
-        raw = os.getenv("GEMINI_API_KEY", "")
-        self._gemini_keys = [k.strip() for k in raw.split(",") if k.strip()]
+        # Parse Gemini keys (keys that returned 403 stay out until their mark expires and a re-probe passes)
+        await self._reprobe_dead_keys()
+        self._gemini_keys = self._configured_gemini_keys()
 
         # Reset per-model exhaustion on re-ping
         self._model_exhausted_keys.clear()
+        self._exhausted_at.clear()
 
         # Ping Grok
         grok_key = os.getenv("GROK_API_KEY", "")
@@ -222,6 +578,7 @@ class LLMHealthManager:
 
         self._last_ping = time.time()
         self._initialized = True
+        self.save_state(immediate=True)
 
         if not self._grok_active and not self._gemini_active:
             print("  [LLM Health] ⚠ CRITICAL — All LLM providers are offline! User action required.")
@@ -231,6 +588,10 @@ class LLMHealthManager:
         if not api_key:
             return False
 
+        from .offline_llm import is_offline, get_offline_provider
+        if is_offline():
+            return await get_offline_provider().ping(api_key)
+
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
@@ -242,14 +603,12 @@ class LLMHealthManager:
             "temperature": 0,
         }
 
-        def _do_ping():
-            try:
-                resp = requests.post(api_url, headers=headers, json=payload, timeout=10)
-                return resp.status_code in (200, 429)
-            except Exception:
-                return False
-
-        return await asyncio.to_thread(_do_ping)
+        from .api_manager import get_http_client
+        try:
+            resp = await get_http_client().post(api_url, headers=headers, json=payload, timeout=10)
+            return resp.status_code in (200, 429)
+        except Exception:
+            return False
 
 
 # Module-level singleton
@@ -0,0 +1,295 @@
+# offline_llm.py: Deterministic offline LLM provider (replay / synthesis / fault injection).
+# Part of LeoBook Core — Intelligence (AI Engine)
+#
+# Classes: OfflineLLMProvider, OfflineLLMResponse
+# Functions: get_offline_provider(), is_offline(), is_recording(), register_synthesizer()
+
+"""
+Offline LLM Module
+Stand-in for Gemini/Grok so enrichment, matching and healing throughput can be
+measured — and key rotation exercised — without quota or network.
+
+LLM_PROVIDER_MODE selects the behaviour:
+  live     real providers (default)
+  record   real providers; every answer is appended to LLM_REPLAY_PATH
+  offline  no network: answers are replayed by prompt hash, or synthesized
+           by the first matching synthesizer (schema-valid for the known
+           LeoBook prompts), after a simulated latency. 429s are injected at
+           LLM_OFFLINE_429_RATE per call and 403s for a fixed, seed-chosen
+           fraction (LLM_OFFLINE_403_RATE) of keys.
+
+Everything random is drawn from LLM_OFFLINE_SEED, so two offline runs with the
+same inputs make the same calls, fail the same way and return the same text.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .llm_cache import make_cache_key
+
+LLM_PROVIDER_MODE = os.getenv("LLM_PROVIDER_MODE", "live").strip().lower()
+LLM_REPLAY_PATH = os.getenv("LLM_REPLAY_PATH", os.path.join("Data", "Store", "llm_replay.jsonl"))
+LLM_OFFLINE_LATENCY_MS = float(os.getenv("LLM_OFFLINE_LATENCY_MS", "250"))
+LLM_OFFLINE_JITTER_MS = float(os.getenv("LLM_OFFLINE_JITTER_MS", "100"))
+LLM_OFFLINE_MS_PER_1K_TOKENS = float(os.getenv("LLM_OFFLINE_MS_PER_1K_TOKENS", "40"))
+LLM_OFFLINE_429_RATE = float(os.getenv("LLM_OFFLINE_429_RATE", "0"))
+LLM_OFFLINE_403_RATE = float(os.getenv("LLM_OFFLINE_403_RATE", "0"))
+LLM_OFFLINE_SEED = int(os.getenv("LLM_OFFLINE_SEED", "1337"))
+
+
+def is_offline() -> bool:
+    return LLM_PROVIDER_MODE == "offline"
+
+
+def is_recording() -> bool:
+    return LLM_PROVIDER_MODE == "record"
+
+
+class OfflineLLMResponse:
+    """Same .text interface as the provider response wrappers in api_manager."""
+    def __init__(self, content: str, source: str = "synthetic"):
+        self.text = content
+        self.source = source
+
+
+def _prompt_text(prompt_content: Any) -> str:
+    if isinstance(prompt_content, str):
+        return prompt_content
+    if isinstance(prompt_content, list):
+        return "\n".join(item for item in prompt_content if isinstance(item, str))
+    return str(prompt_content or "")
+
+
+# ── Synthesizers ──────────────────────────────────────────────
+# Each takes the prompt text and returns response text, or None to pass.
+
+def _list_items(text: str) -> List[str]:
+    return [m.strip() for m in re.findall(r"^- (.+)$", text, flags=re.MULTILINE)]
+
+
+def _synth_search_dict(text: str) -> Optional[str]:
+    if "football/soccer database expert" not in text:
+        return None
+    is_team = "team names" in text
+    rows = []
+    for name in _list_items(text):
+        row = {"input_name": name, "official_name": name, "other_names": [], "abbreviations": []}
+        if is_team:
+            row.update({"country": "unknown", "city": "unknown", "stadium": None,
+                        "league": "unknown", "founded": None, "wikipedia_url": None})
+        else:
+            row.update({"level": None, "season_format": None, "wikipedia_url": None})
+        rows.append(row)
+    return json.dumps(rows)
+
+
+def _synth_fixture_matcher(text: str) -> Optional[str]:
+    if "PREDICTIONS:" not in text or "SITE_MATCHES:" not in text:
+        return None
+    from ..Utils.name_index import normalize_for_search
+    pred_block, _, site_block = text.partition("SITE_MATCHES:")
+    site_by_pair = {}
+    for home, away, url in re.findall(r"^(.+?) vs (.+?) at .*? - URL: (\S+)", site_block, flags=re.MULTILINE):
+        site_by_pair.setdefault((normalize_for_search(home), normalize_for_search(away)), url)
+    result = {}
+    for fid, home, away in re.findall(r"^([^:\n]+): (.+?) vs (.+?) at ", pred_block.split("PREDICTIONS:")[-1], flags=re.MULTILINE):
+        url = site_by_pair.get((normalize_for_search(home), normalize_for_search(away)))
+        if url:
+            result[fid.strip()] = url
+    return json.dumps(result)
+
+
+def _synth_match_resolver(text: str) -> Optional[str]:
+    if "Which of the following options represents the same match" not in text:
+        return None
+    target = re.search(r"match named: '(.+?)'", text)
+    options = _list_items(text.split("Options:")[-1])
+    if target and options:
+        from ..Utils.name_index import normalize_for_search
+        wanted = normalize_for_search(target.group(1))
+        for option in options:
+            if normalize_for_search(option) == wanted:
+                return option
+    return "None"
+
+
+def _synth_selectors(text: str) -> Optional[str]:
+    targeted = re.search(r'Find the CSS selector for the key: "([^"]+)"', text)
+    if targeted:
+        key = targeted.group(1)
+        return json.dumps({key: f"[data-testid='{key}']"})
+    bulk = re.search(r"ONLY return keys from this list: \[(.*?)\]", text, flags=re.DOTALL)
+    if bulk:
+        keys = re.findall(r'"([^"]+)"', bulk.group(1))
+        return json.dumps({key: f"[data-testid='{key}']" for key in keys})
+    return None
+
+
+def _synth_popup(text: str) -> Optional[str]:
+    if "popup/modal dismissal" not in text:
+        return None
+    return json.dumps({"has_popup": False, "selectors": [], "steps": 0, "type": "none"})
+
+
+def _synth_state(text: str) -> Optional[str]:
+    if "CURRENT STATE of the automation" not in text:
+        return None
+    return json.dumps({"state": "unknown", "is_modal": False, "milestone_found": "", "primary_exit_selector": ""})
+
+
+_synthesizers: List[Tuple[str, Callable[[str], Optional[str]]]] = [
+    ("search_dict", _synth_search_dict),
+    ("fixture_matcher", _synth_fixture_matcher),
+    ("match_resolver", _synth_match_resolver),
+    ("selectors", _synth_selectors),
+    ("popup", _synth_popup),
+    ("state_discovery", _synth_state),
+]
+
+
+def register_synthesizer(name: str, fn: Callable[[str], Optional[str]], first: bool = True):
+    """Adds a synthesizer (prompt text -> response text or None). first=True gives it priority."""
+    entry = (name, fn)
+    if first:
+        _synthesizers.insert(0, entry)
+    else:
+        _synthesizers.append(entry)
+
+
+# ── Provider ──────────────────────────────────────────────────
+
+class OfflineLLMProvider:
+    """Replay store + synthesizers + latency/fault simulation."""
+
+    def __init__(self, replay_path: str = LLM_REPLAY_PATH, seed: int = LLM_OFFLINE_SEED,
+                 latency_ms: float = LLM_OFFLINE_LATENCY_MS, jitter_ms: float = LLM_OFFLINE_JITTER_MS,
+                 ms_per_1k_tokens: float = LLM_OFFLINE_MS_PER_1K_TOKENS,
+                 rate_429: float = LLM_OFFLINE_429_RATE, rate_403: float = LLM_OFFLINE_403_RATE):
+        self.replay_path = replay_path
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.rate_429 = rate_429
+        self.rate_403 = rate_403
+        self._rng = random.Random(seed)
+        self._replay: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "replayed": 0, "synthesized": 0, "fallback": 0,
+                         "injected_429": 0, "injected_403": 0, "recorded": 0}
+
+    @staticmethod
+    def replay_key(prompt_content: Any, generation_config: Any = None) -> str:
+        """Model-agnostic hash, so a replay still hits after the router picks a different model."""
+        return make_cache_key("replay", "", prompt_content, generation_config)
+
+    def _load(self) -> Dict[str, str]:
+        if self._replay is None:
+            replay = {}
+            try:
+                with open(self.replay_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            replay[entry["key"]] = entry["text"]
+                        except (ValueError, KeyError):
+                            continue
+            except FileNotFoundError:
+                pass
+            self._replay = replay
+            if replay:
+                print(f"    [Offline LLM] Loaded {len(replay)} recorded responses.")
+        return self._replay
+
+    def record(self, prompt_content: Any, generation_config: Any, text: str,
+               provider: str = "", model: str = ""):
+        """Appends a live answer to the replay store (record mode)."""
+        if not text:
+            return
+        key = self.replay_key(prompt_content, generation_config)
+        entry = {"key": key, "provider": provider, "model": model, "text": text}
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.replay_path) or ".", exist_ok=True)
+                with open(self.replay_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                if self._replay is not None:
+                    self._replay[key] = text
+                self.counters["recorded"] += 1
+        except Exception as e:
+            print(f"    [Offline LLM] Record failed: {e}")
+
+    def key_is_dead(self, api_key: str) -> bool:
+        """Sticky per-key 403: the same keys are 'revoked' on every run with the same seed."""
+        if not api_key or self.rate_403 <= 0:
+            return False
+        digest = hashlib.sha256(f"{self.seed}:{api_key}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64 < self.rate_403
+
+    async def ping(self, api_key: str) -> bool:
+        """Health-check stand-in: dead keys fail, everything else answers."""
+        await asyncio.sleep(0)
+        return not self.key_is_dead(api_key)
+
+    def _answer(self, prompt_content: Any, generation_config: Any) -> Tuple[str, str]:
+        replay = self._load()
+        hit = replay.get(self.replay_key(prompt_content, generation_config))
+        if hit is not None:
+            return hit, "replayed"
+        text = _prompt_text(prompt_content)
+        for _, fn in _synthesizers:
+            try:
+                out = fn(text)
+            except Exception:
+                out = None
+            if out is not None:
+                return out, "synthesized"
+        wants_json = (isinstance(generation_config, dict) and generation_config.get("response_mime_type") == "application/json") \
+            or getattr(generation_config, "response_mime_type", None) == "application/json"
+        return ("{}" if wants_json else "OK"), "fallback"
+
+    async def generate(self, prompt_content: Any, generation_config: Any = None, provider: str = "Gemini",
+                       model: str = "", api_key: str = "") -> OfflineLLMResponse:
+        """Simulated provider call. Raises the same error strings the routers match on (429/403)."""
+        with self._lock:
+            self.counters["calls"] += 1
+            roll = self._rng.random()
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+
+        if self.key_is_dead(api_key):
+            self.counters["injected_403"] += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError(f"403 PERMISSION_DENIED (offline {provider} key ...{api_key[-4:]})")
+        if roll < self.rate_429:
+            self.counters["injected_429"] += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError(f"429 RESOURCE_EXHAUSTED (offline {provider} {model})")
+
+        text, source = self._answer(prompt_content, generation_config)
+        tokens = len(_prompt_text(prompt_content)) // 4 + len(text) // 4
+        delay_ms = max(0.0, self.latency_ms + jitter + tokens / 1000.0 * self.ms_per_1k_tokens)
+        await asyncio.sleep(delay_ms / 1000.0)
+        self.counters[source] += 1
+        return OfflineLLMResponse(text, source)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": LLM_PROVIDER_MODE, "replay_path": self.replay_path, **self.counters}
+
+
+_provider_instance: Optional[OfflineLLMProvider] = None
+_instance_lock = threading.Lock()
+
+
+def get_offline_provider() -> OfflineLLMProvider:
+    """Process-wide offline provider (also used as the recorder in record mode)."""
+    global _provider_instance
+    with _instance_lock:
+        if _provider_instance is None:
+            _provider_instance = OfflineLLMProvider()
+        return _provider_instance
@@ -9,10 +9,13 @@ Handles webpage content analysis, data extraction, and league information proces
 Responsible for extracting structured data from web pages for prediction analysis.
 """
 
+import os
 from typing import Dict, Any, List, Optional
 
 from .selector_db import knowledge_db
 
+STATE_DISCOVERY_DOM_CHARS = int(os.getenv("STATE_DISCOVERY_DOM_CHARS", "6000"))
+
 
 class PageAnalyzer:
     """Handles webpage content analysis and data extraction"""
@@ -268,6 +271,19 @@ class PageAnalyzer:
                 }
             """)
 
+            # 1b. Distilled DOM outline, rooted at an open dialog when there is one.
+            # It covers the headings/buttons/text of the summary, so it replaces it
+            # (title and URL kept) and the payload stays within STATE_DISCOVERY_DOM_CHARS.
+            from .dom_distiller import distill_dom
+            dialog = '[role="dialog"], [aria-modal="true"], .modal, .popup'
+            has_dialog = await page.locator(dialog).count() > 0
+            outline = await distill_dom(page, root_selector=dialog if has_dialog else None,
+                                        max_chars=STATE_DISCOVERY_DOM_CHARS)
+            if outline:
+                header = [line for line in html_content.split("\n")
+                          if line.startswith(("PAGE_TITLE:", "PAGE_URL:"))]
+                html_content = "\n".join(header + ["DOM_OUTLINE:", outline])
+
             # 2. Format prompt with HTML content
             formatted_prompt = STATE_DISCOVERY_PROMPT.format(html_content=html_content)
 
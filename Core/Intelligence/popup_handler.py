@@ -13,6 +13,7 @@ execution logic, and high-level orchestration previously split across 4 files.
 """
 
 import asyncio
+import os
 import re
 import json
 import base64
@@ -21,6 +22,10 @@ from typing import Dict, Any, List, Optional
 from .selector_manager import SelectorManager
 from .api_manager import grok_api_call
 from .utils import clean_json_response
+from .dom_distiller import distill_dom, distill_html, capture_compact_screenshot
+
+POPUP_DOM_CHARS = int(os.getenv("POPUP_DOM_CHARS", "6000"))
+POPUP_ROOT_SELECTOR = '[role="dialog"], [aria-modal="true"], .modal, .popup, .overlay'
 
 # ==============================================================================
 # 1. POPUP DETECTOR (Heuristics)
@@ -251,14 +256,24 @@ class LeoPopupAnalyzer:
 
     async def analyze_popup(self, page, html_content: str, screenshot_path: Optional[str] = None, context: str = "generic") -> Dict[str, Any]:
         try:
-            if not screenshot_path:
-                img_data = base64.b64encode(await page.screenshot(full_page=True, type="png")).decode("utf-8")
-            else:
+            # Popups sit in the viewport: crop to the dialog (or viewport) as a compact JPEG
+            # instead of a full-page PNG; a caller-supplied screenshot is the fallback.
+            has_dialog = await page.locator(POPUP_ROOT_SELECTOR).count() > 0
+            image = await capture_compact_screenshot(page, clip_selector=POPUP_ROOT_SELECTOR if has_dialog else None)
+            if image is None and screenshot_path:
                 with open(screenshot_path, "rb") as f:
-                    img_data = base64.b64encode(f.read()).decode("utf-8")
-
-            prompt = self._create_prompt(html_content, context)
-            response = await grok_api_call([prompt, {"inline_data": {"mime_type": "image/png", "data": img_data}}], generation_config={"temperature": 0.1, "response_mime_type": "application/json"})
+                    image = {"mime_type": "image/png", "data": f.read()}
+            outline = await distill_dom(page, root_selector=POPUP_ROOT_SELECTOR if has_dialog else None,
+                                        max_chars=POPUP_DOM_CHARS)
+            if not outline:
+                outline = distill_html(html_content, max_chars=POPUP_DOM_CHARS)
+
+            prompt = self._create_prompt(outline, context)
+            parts = [prompt]
+            if image is not None:
+                img_data = base64.b64encode(image["data"]).decode("utf-8")
+                parts.append({"inline_data": {"mime_type": image["mime_type"], "data": img_data}})
+            response = await grok_api_call(parts, generation_config={"temperature": 0.1, "response_mime_type": "application/json"})
             
             if response and hasattr(response, 'text') and response.text:
                 analysis = json.loads(clean_json_response(response.text))
@@ -272,7 +287,8 @@ class LeoPopupAnalyzer:
         return f"""
         Analyze this webpage screenshot + HTML for popup/modal dismissal. Context: {ctx}
         Return JSON: {{"has_popup": true/false, "selectors": ["css_sel1"], "steps": 1, "type": "modal"}}
-        Prioritize visible close buttons. HTML: {html[:3000]}...
+        Prioritize visible close buttons. HTML outline:
+        {html}
         """
 
     def _validate(self, a: Dict[str, Any], ctx: str) -> Dict[str, Any]:
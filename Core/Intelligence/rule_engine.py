@@ -18,9 +18,11 @@ from .tag_generator import TagGenerator
 from .goal_predictor import GoalPredictor
 from .betting_markets import BettingMarkets
 from .rule_config import RuleConfig
+from Core.System.tracing import traced
 
 class RuleEngine:
     @staticmethod
+    @traced("rule_engine.analyze")
     def analyze(vision_data: Dict[str, Any], config: RuleConfig = None) -> Dict[str, Any]:
         """
         MAIN PREDICTION ENGINE — Returns full market predictions
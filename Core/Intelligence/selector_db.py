@@ -1,20 +1,33 @@
 # selector_db.py: selector_db.py: Database manager for AI-learned CSS selectors.
 # Part of LeoBook Core — Intelligence (AI Engine)
 #
-# Functions: load_knowledge(), save_knowledge()
+# Functions: load_knowledge(), save_knowledge(), flush_knowledge(), log_selector_failure()
 
 """
 Database Manager for LeoBook
 Handles persistent storage for AI-learned CSS selectors and knowledge base.
+Writes are buffered: save_knowledge() marks the in-memory state dirty and a
+timer flushes it to disk (atomic replace) after KNOWLEDGE_FLUSH_INTERVAL seconds.
+The timer thread never iterates the live dict (the event loop keeps mutating it):
+it writes a snapshot built from atomic dict copies. Pending changes are also
+flushed at interpreter exit.
 """
 
+import atexit
 import json
+import os
+import threading
 from pathlib import Path
 
 # Knowledge base for selector storage
 KNOWLEDGE_FILE = Path("Config/knowledge.json")
+KNOWLEDGE_FLUSH_INTERVAL = float(os.getenv("KNOWLEDGE_FLUSH_INTERVAL", "5"))
 knowledge_db: dict = {}
 
+_flush_lock = threading.RLock()
+_flush_timer = None
+_dirty = False
+
 
 def load_knowledge():
     """Loads the selector knowledge base into memory."""
@@ -28,35 +41,76 @@ def load_knowledge():
 
 
 def save_knowledge():
-    """Performs an UPSERT operation to save knowledge."""
-    KNOWLEDGE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    disk_data = {}
-    
-    # 1. Load existing data from disk (to avoid wiping parallel updates)
-    if KNOWLEDGE_FILE.exists():
-        try:
-            with open(KNOWLEDGE_FILE, "r", encoding="utf-8") as f:
-                disk_data = json.load(f)
-        except Exception:
-            disk_data = {}
+    """Marks the knowledge base dirty and schedules a buffered flush."""
+    global _dirty, _flush_timer
+    with _flush_lock:
+        _dirty = True
+        if KNOWLEDGE_FLUSH_INTERVAL <= 0:
+            flush_knowledge()
+            return
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(KNOWLEDGE_FLUSH_INTERVAL, flush_knowledge)
+            _flush_timer.daemon = True
+            _flush_timer.start()
 
-    # 2. Update with current memory state (Upsert)
-    for context_key, memory_selectors in knowledge_db.items():
-        if context_key not in disk_data:
-            disk_data[context_key] = {}
-        
-        if isinstance(disk_data[context_key], dict) and isinstance(memory_selectors, dict):
-            disk_data[context_key].update(memory_selectors)
-        else:
-            disk_data[context_key] = memory_selectors
 
-    # 3. Save back to disk
-    try:
-        with open(KNOWLEDGE_FILE, "w", encoding="utf-8") as f:
-            json.dump(disk_data, f, indent=4)
-        # Suppressed print for cleaner logs unless debugging
-    except Exception as e:
-        print(f"Error saving knowledge: {e}")
+def _snapshot(value):
+    """Deep copy safe against concurrent mutation: every container is copied with one atomic C-level copy."""
+    if isinstance(value, dict):
+        return {k: _snapshot(v) for k, v in value.copy().items()}
+    if isinstance(value, list):
+        return [_snapshot(v) for v in value.copy()]
+    return value
+
+
+def flush_knowledge() -> bool:
+    """Performs an UPSERT of the in-memory knowledge into KNOWLEDGE_FILE if there are pending changes."""
+    global _dirty, _flush_timer
+    with _flush_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        if not _dirty:
+            return False
+        memory_state = _snapshot(knowledge_db)
+
+        KNOWLEDGE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        disk_data = {}
+
+        # 1. Load existing data from disk (to avoid wiping parallel updates)
+        if KNOWLEDGE_FILE.exists():
+            try:
+                with open(KNOWLEDGE_FILE, "r", encoding="utf-8") as f:
+                    disk_data = json.load(f)
+            except Exception:
+                disk_data = {}
+
+        # 2. Update with current memory state (Upsert)
+        for context_key, memory_selectors in memory_state.items():
+            if context_key not in disk_data:
+                disk_data[context_key] = {}
+
+            if isinstance(disk_data[context_key], dict) and isinstance(memory_selectors, dict):
+                disk_data[context_key].update(memory_selectors)
+            else:
+                disk_data[context_key] = memory_selectors
+
+        # 3. Atomic write: temp file in the same directory, then replace
+        tmp_path = KNOWLEDGE_FILE.with_suffix(KNOWLEDGE_FILE.suffix + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(disk_data, f, indent=4)
+            os.replace(tmp_path, KNOWLEDGE_FILE)
+            _dirty = False
+            return True
+        except Exception as e:
+            # Still dirty: retry on the next interval instead of dropping the changes
+            print(f"Error saving knowledge: {e}")
+            if KNOWLEDGE_FLUSH_INTERVAL > 0:
+                _flush_timer = threading.Timer(KNOWLEDGE_FLUSH_INTERVAL, flush_knowledge)
+                _flush_timer.daemon = True
+                _flush_timer.start()
+            return False
 
 
 def log_selector_failure(context: str, key: str, error_msg: str):
@@ -85,3 +139,4 @@ def log_selector_failure(context: str, key: str, error_msg: str):
 
 # Initialize on import
 load_knowledge()
+atexit.register(flush_knowledge)
@@ -14,7 +14,7 @@ AUTO-HEALING PHILOSOPHY:
 - Use get_selector_with_fallback() for robust selector access with automatic healing
 
 USAGE PATTERNS:
-1. get_selector_auto() - Simple DB lookup (no healing)
+1. get_selector_auto() - DB lookup + visibility validation (cached per URL pattern) + targeted healing
 2. get_selector_with_fallback() - DB lookup + on-demand healing if selector fails
 3. heal_selector_on_failure() - Direct healing when you know a selector failed
 """
@@ -24,11 +24,23 @@ import re
 import json
 import asyncio
 from typing import Dict, Any, Optional
+from urllib.parse import urlparse
 
 from .selector_db import load_knowledge, save_knowledge, knowledge_db
 from .api_manager import unified_api_call
 from .utils import clean_json_response
 from .prompts import get_keys_for_context, BASE_MAPPING_INSTRUCTIONS
+from Core.Utils.ttl_cache import TTLCache
+from Core.System.metrics import SELECTOR_HEALS
+
+# Validation cache: a selector confirmed visible on a URL pattern is trusted for
+# SELECTOR_VALIDATION_TTL seconds; a key that stayed missing after healing is
+# not re-waited/re-healed on the same URL for SELECTOR_NEGATIVE_TTL seconds.
+SELECTOR_VALIDATION_TTL = float(os.getenv("SELECTOR_VALIDATION_TTL", "900"))
+SELECTOR_NEGATIVE_TTL = float(os.getenv("SELECTOR_NEGATIVE_TTL", "120"))
+SELECTOR_VALIDATION_TIMEOUT_MS = int(os.getenv("SELECTOR_VALIDATION_TIMEOUT_MS", "5000"))
+_validation_cache = TTLCache("selector_validation", max_size=4096, ttl_seconds=SELECTOR_VALIDATION_TTL)
+_NEGATIVE = "__missing__"
 
 # ==============================================================================
 # 1. SELECTOR AI MAPPING & SIMPLIFICATION (Merged from mapping & utils)
@@ -133,6 +145,19 @@ def _simplify_complex_selector(selector: str, html_content: str, key: str) -> st
 # ==============================================================================
 
 
+def _url_pattern(page) -> str:
+    """
+    Reduces a page URL to host + first two path segments (e.g. 'www.flashscore.com/match/football'),
+    so every match/team page of the same kind shares one validation entry.
+    """
+    try:
+        parsed = urlparse(page.url or "")
+    except Exception:
+        return ""
+    segments = [seg for seg in parsed.path.split("/") if seg][:2]
+    return "/".join([parsed.netloc] + segments)
+
+
 class SelectorManager:
     """Manages CSS selectors for web automation with auto-healing capabilities"""
 
@@ -156,8 +181,12 @@ class SelectorManager:
         """
         SMART ACCESSOR:
         1. Checks if selector exists in DB.
-        2. Validates if selector is present on the current page.
+        2. Validates if selector is present on the current page (skipped when the same
+           selector was already confirmed on this URL pattern within SELECTOR_VALIDATION_TTL).
         3. If missing or invalid, AUTOMATICALLY triggers TARGETED AI healing for THIS KEY ONLY.
+        4. A key still not visible after healing (optional element, inactive tab) is
+           marked missing on this URL for SELECTOR_NEGATIVE_TTL, so repeat calls return
+           at once instead of paying the wait and another heal.
         
         IMPORTANT: Does NOT re-analyze all selectors for the context.
         Many selectors are behind tabs/interactions and won't be visible
@@ -165,38 +194,60 @@ class SelectorManager:
         """
         # 1. Quick Lookup
         selector = knowledge_db.get(context_key, {}).get(element_key)
+        url_pattern = _url_pattern(page)
+        cache_key = (context_key, element_key, selector or "", url_pattern)
+
+        # Negatives are keyed on the full URL (incl. #tab fragment) so switching tabs re-validates.
+        negative_key = (context_key, element_key, _NEGATIVE, getattr(page, "url", ""))
+
+        if _validation_cache.get(cache_key):
+            return str(selector)
+        negative = _validation_cache.get(negative_key)
+        if negative is not None:
+            return negative
 
         # 2. Validation
-        is_valid = False
-        if selector:
-            try:
-                await page.wait_for_selector(selector, state='visible', timeout=5000)
-                is_valid = True
-            except Exception:
-                is_valid = False
+        is_valid = await SelectorManager._is_visible(page, selector)
+        if is_valid:
+            _validation_cache.set(cache_key, True)
+            return str(selector)
 
         # 3. Targeted Auto-Healing (SINGLE KEY ONLY)
-        if not is_valid:
-            print(
-                f"    [Auto-Heal] Selector '{element_key}' in '{context_key}' invalid/missing. Initiating TARGETED AI repair..."
-            )
-            from .visual_analyzer import VisualAnalyzer
-            
-            info = f"Selector '{element_key}' in '{context_key}' invalid/missing."
-            # TARGETED: Only ask AI about THIS specific key, not all 155+ keys
-            await VisualAnalyzer.analyze_page_and_update_selectors(
-                page, context_key, force_refresh=True, info=info, target_key=element_key
-            )
+        print(
+            f"    [Auto-Heal] Selector '{element_key}' in '{context_key}' invalid/missing. Initiating TARGETED AI repair..."
+        )
+        from .visual_analyzer import VisualAnalyzer
 
-            # Re-fetch
-            selector = knowledge_db.get(context_key, {}).get(element_key)
+        info = f"Selector '{element_key}' in '{context_key}' invalid/missing."
+        # TARGETED: Only ask AI about THIS specific key, not all 155+ keys
+        await VisualAnalyzer.analyze_page_and_update_selectors(
+            page, context_key, force_refresh=True, info=info, target_key=element_key
+        )
 
-            if selector:
-                print(f"    [Auto-Heal Success] New selector for '{element_key}': {selector}")
-            else:
-                print(f"    [Auto-Heal Skipped] '{element_key}' not visible in current page state. Will retry when tab/section is active.")
+        # Re-fetch and re-validate: only a new, visible selector counts as healed
+        old_selector = selector
+        selector = knowledge_db.get(context_key, {}).get(element_key)
+        if selector and selector != old_selector and await SelectorManager._is_visible(page, selector):
+            print(f"    [Auto-Heal Success] New selector for '{element_key}': {selector}")
+            _validation_cache.set((context_key, element_key, selector, url_pattern), True)
+            return str(selector)
+
+        # Optional/tab-bound element absent from this page state: skip the wait + heal
+        # on this URL for SELECTOR_NEGATIVE_TTL (the selector is still handed back).
+        print(f"    [Auto-Heal Skipped] '{element_key}' not visible in current page state. Will retry when tab/section is active.")
+        result = str(selector) if selector else ""
+        _validation_cache.set(negative_key, result, ttl_seconds=SELECTOR_NEGATIVE_TTL)
+        return result
 
-        return str(selector) if selector else ""
+    @staticmethod
+    async def _is_visible(page, selector: Optional[str]) -> bool:
+        if not selector:
+            return False
+        try:
+            await page.wait_for_selector(selector, state='visible', timeout=SELECTOR_VALIDATION_TIMEOUT_MS)
+            return True
+        except Exception:
+            return False
 
     @staticmethod
     async def heal_selector_on_failure(page, context_key: str, element_key: str, failure_reason: str = "") -> str:
@@ -211,6 +262,7 @@ class SelectorManager:
 
         # Capture the OLD (broken) selector before healing
         old_selector = knowledge_db.get(context_key, {}).get(element_key, "")
+        SelectorManager.invalidate_validation(page, context_key, element_key, old_selector)
 
         try:
             from .page_analyzer import PageAnalyzer
@@ -219,6 +271,7 @@ class SelectorManager:
             if not content_is_correct:
                 curr_url = page.url
                 print(f"    [Heal Aborted] Wrong page context for '{context_key}': {curr_url}")
+                SELECTOR_HEALS.inc(context=context_key, outcome="wrong_page")
                 return ""
 
             info = f"Selector '{element_key}' failed during use in '{context_key}'. {failure_reason}"
@@ -232,18 +285,30 @@ class SelectorManager:
             # Guard: if the selector didn't actually change, healing failed
             if healed_selector and healed_selector != old_selector:
                 print(f"    [Heal Success] New selector for '{element_key}': {healed_selector}")
+                SELECTOR_HEALS.inc(context=context_key, outcome="healed")
                 return str(healed_selector)
             elif healed_selector == old_selector:
                 print(f"    [Heal Failed] Selector unchanged ('{healed_selector}') — AI providers likely offline. Skipping recovery.")
+                SELECTOR_HEALS.inc(context=context_key, outcome="unchanged")
                 return ""
             else:
                 print(f"    [Heal Skipped] '{element_key}' not visible in current page state. May require tab navigation first.")
+                SELECTOR_HEALS.inc(context=context_key, outcome="not_visible")
                 return ""
 
         except Exception as e:
             print(f"    [Heal Error] AI healing failed for '{element_key}': {e}")
+            SELECTOR_HEALS.inc(context=context_key, outcome="error")
             return ""
 
+    @staticmethod
+    def invalidate_validation(page, context_key: str, element_key: str, selector: Optional[str] = None):
+        """Drops the cached validation (and any negative mark) for a key on this page (call when a selector fails in use)."""
+        if selector is None:
+            selector = knowledge_db.get(context_key, {}).get(element_key, "")
+        _validation_cache.pop((context_key, element_key, selector or "", _url_pattern(page)))
+        _validation_cache.pop((context_key, element_key, _NEGATIVE, getattr(page, "url", "")))
+
     @staticmethod
     def has_selectors_for_context(context: str) -> bool:
         """Check if selectors exist for a given context"""
@@ -4,18 +4,37 @@
 # Classes: UnifiedBatchMatcher
 
 """
-Unified Batch Matcher - v7 (Prompt Fix + No-Match Handling + Data Validation)
+Unified Batch Matcher - v8 (Candidate Pruning + Concurrent Chunks)
 High-reliability batch matching with your specified models.
+Each chunk's prompt carries only the site matches that share a team-name token
+with its predictions (and kick off within the time window); a prediction with no
+shared token ("Man Utd" vs "Manchester United") is offered every site match in
+its time window instead. Chunks run concurrently, paced by the Gemini key scheduler.
 """
 
 import os
 import json
 import asyncio
+from collections import defaultdict
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from .api_manager import unified_api_call
 from .utils import clean_json_response
 from Core.Intelligence.aigo_suite import AIGOSuite
+from Core.Utils.name_index import name_tokens, kickoff_minutes
+
+CANDIDATES_PER_PREDICTION = int(os.getenv("MATCHER_CANDIDATES_PER_PREDICTION", "5"))
+CANDIDATE_TIME_WINDOW_MINUTES = int(os.getenv("MATCHER_TIME_WINDOW_MINUTES", "90"))
+CHUNK_CONCURRENCY = int(os.getenv("MATCHER_CHUNK_CONCURRENCY", "3"))
+
+
+def _site_home(s: Dict) -> str:
+    return s.get('home') or s.get('home_team') or ''
+
+
+def _site_away(s: Dict) -> str:
+    return s.get('away') or s.get('away_team') or ''
+
 
 class UnifiedBatchMatcher:
     def __init__(self):
@@ -24,30 +43,115 @@ class UnifiedBatchMatcher:
     @AIGOSuite.aigo_retry(max_retries=2, delay=2.0, use_aigo=False)
     async def match_batch(self, date: str, predictions: List[Dict], site_matches: List[Dict]) -> Dict[str, str]:
         all_results = {}
-        predictions = sorted(predictions, key=lambda x: x.get('fixture_id', ''))
-        total_chunks = (len(predictions) + self.chunk_size - 1) // self.chunk_size
-        
-        print(f"  [AI Matcher] Processing {len(predictions)} predictions in {total_chunks} chunks (size {self.chunk_size})...")
+        # Kickoff order clusters chunks around the same site candidates
+        predictions = sorted(predictions, key=lambda x: (str(x.get('match_time', '')), str(x.get('fixture_id', ''))))
 
-        if not site_matches or all(m.get('home') == 'None' or m.get('away') == 'None' for m in site_matches):
+        if not site_matches or all(_site_home(m) == 'None' or _site_away(m) == 'None' for m in site_matches):
             print("  [AI Matcher] No valid site matches for date – skipping batch")
             return {}
 
-        for i in range(0, len(predictions), self.chunk_size):
-            chunk_preds = predictions[i:i + self.chunk_size]
-            chunk_idx = (i // self.chunk_size) + 1
-            print(f"  [AI Matcher] Chunk {chunk_idx}/{total_chunks} ({len(chunk_preds)} items)...")
-            
-            chunk_result = await self._process_single_chunk(date, chunk_preds, site_matches)
+        site_matches = [m for m in site_matches if not m.get('date') or not date or m.get('date') == date] or site_matches
+        candidate_map = self._candidate_map(predictions, site_matches)
+        plausible = [p for p in predictions if candidate_map.get(id(p))]
+        skipped = len(predictions) - len(plausible)
+        if skipped:
+            print(f"  [AI Matcher] {skipped} prediction(s) have no plausible site candidate – not sent to AI.")
+
+        chunks = [plausible[i:i + self.chunk_size] for i in range(0, len(plausible), self.chunk_size)]
+        total_chunks = len(chunks)
+        print(f"  [AI Matcher] Processing {len(plausible)} predictions in {total_chunks} chunks "
+              f"(size {self.chunk_size}, up to {CHUNK_CONCURRENCY} concurrent)...")
+
+        semaphore = asyncio.Semaphore(CHUNK_CONCURRENCY)
+
+        async def _run_chunk(chunk_idx: int, chunk_preds: List[Dict]) -> Dict[str, str]:
+            seen, chunk_sites = set(), []
+            for pred in chunk_preds:
+                for site_idx in candidate_map[id(pred)]:
+                    if site_idx not in seen:
+                        seen.add(site_idx)
+                        chunk_sites.append(site_matches[site_idx])
+            async with semaphore:
+                print(f"  [AI Matcher] Chunk {chunk_idx}/{total_chunks} ({len(chunk_preds)} items, "
+                      f"{len(chunk_sites)}/{len(site_matches)} site candidates)...")
+                chunk_result = await self._process_single_chunk(date, chunk_preds, chunk_sites)
+            # Only accept fixture ids / URLs that were actually offered in this chunk
+            allowed_ids = {str(p.get('fixture_id')) for p in chunk_preds}
+            allowed_urls = {s.get('url') for s in chunk_sites}
+            chunk_result = {k: v for k, v in (chunk_result or {}).items() if str(k) in allowed_ids and v in allowed_urls}
             if chunk_result:
-                all_results.update(chunk_result)
                 print(f"  [AI Matcher] Chunk {chunk_idx} matched {len(chunk_result)} fixtures.")
             else:
                 print(f"  [AI Matcher] Chunk {chunk_idx} returned no matches.")
+            return chunk_result
+
+        results = await asyncio.gather(
+            *[_run_chunk(idx, chunk) for idx, chunk in enumerate(chunks, start=1)],
+            return_exceptions=True
+        )
+        for chunk_result in results:
+            if isinstance(chunk_result, Exception):
+                print(f"  [AI Matcher] Chunk failed: {chunk_result}")
+                continue
+            all_results.update(chunk_result)
 
         print(f"  [AI Matcher] Final: {len(all_results)}/{len(predictions)} matched")
         return all_results
 
+    def _candidate_map(self, predictions: List[Dict], site_matches: List[Dict]) -> Dict[int, List[int]]:
+        """
+        id(prediction) -> indices of its top CANDIDATES_PER_PREDICTION site matches: those sharing
+        a team-name token, within CANDIDATE_TIME_WINDOW_MINUTES when both kickoffs are known,
+        ranked by token Jaccard then kickoff distance. Without any token hit (abbreviations such
+        as "PSG" / "Paris SG") every site match inside the time window is a candidate, nearest
+        kickoff first; only when none is in the window is the prediction left without candidates.
+        """
+        site_tokens = []
+        token_index = defaultdict(set)
+        for idx, s in enumerate(site_matches):
+            tokens = name_tokens(f"{_site_home(s)} {_site_away(s)}")
+            site_tokens.append(tokens)
+            for token in tokens:
+                token_index[token].add(idx)
+
+        candidate_map = {}
+        for pred in predictions:
+            p_tokens = name_tokens(f"{pred.get('home_team', '')} {pred.get('away_team', '')}")
+            p_kick = kickoff_minutes(pred.get('match_time'))
+            hits = set()
+            for token in p_tokens:
+                hits |= token_index.get(token, set())
+            scored = []
+            for idx in hits:
+                time_gap = self._time_gap(p_kick, site_matches[idx])
+                if time_gap is None:
+                    continue
+                jaccard = len(p_tokens & site_tokens[idx]) / len(p_tokens | site_tokens[idx])
+                scored.append((-jaccard, time_gap, idx))
+            if scored:
+                scored.sort()
+                candidate_map[id(pred)] = [idx for _, _, idx in scored[:CANDIDATES_PER_PREDICTION]]
+                continue
+            # No shared token: let the AI judge name equivalence among everything kicking off nearby
+            in_window = []
+            for idx, site in enumerate(site_matches):
+                time_gap = self._time_gap(p_kick, site)
+                if time_gap is not None:
+                    in_window.append((time_gap, idx))
+            in_window.sort()
+            candidate_map[id(pred)] = [idx for _, idx in in_window]
+        return candidate_map
+
+    @staticmethod
+    def _time_gap(p_kick: Optional[int], site: Dict) -> Optional[int]:
+        """Minutes between kickoffs (0 when either is unknown), None when outside the time window."""
+        s_kick = kickoff_minutes(site.get('time'))
+        if p_kick is None or s_kick is None:
+            return 0
+        diff = abs(s_kick - p_kick)
+        time_gap = min(diff, 1440 - diff)
+        return None if time_gap > CANDIDATE_TIME_WINDOW_MINUTES else time_gap
+
     @AIGOSuite.aigo_retry(max_retries=2, delay=2.0)
     async def _process_single_chunk(self, date: str, predictions: List[Dict], site_matches: List[Dict]) -> Dict[str, str]:
         prompt = self._build_improved_prompt(date, predictions, site_matches)
@@ -78,9 +182,9 @@ class UnifiedBatchMatcher:
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S WAT")
         
         pred_summary = [f"{p.get('fixture_id')}: {p.get('home_team')} vs {p.get('away_team')} at {p.get('match_time')} ({p.get('date')})" for p in predictions]
-        site_summary = [f"{s.get('home')} vs {s.get('away')} at {s.get('time')} ({s.get('date')}) - URL: {s.get('url')}" for s in site_matches]
-
-    
+        site_summary = [f"{_site_home(s)} vs {_site_away(s)} at {s.get('time')} ({s.get('date')}) - URL: {s.get('url')}" for s in site_matches]
+        pred_block = "\n".join(pred_summary)
+        site_block = "\n".join(site_summary)
 
         prompt = f"""You are a 100% precise fixture matcher for betting.
 Current time: {now_str} (WAT/Nigeria)
@@ -103,10 +207,10 @@ Input: PRED: "Arsenal vs Chelsea at 15:00" SITE: "Arsenal U21 vs Chelsea U21 at
 Input: PRED: "Real Madrid vs Barcelona at 21:00" SITE: no match → {{}}
 
 PREDICTIONS:
-{'\n'.join(pred_summary)}
+{pred_block}
 
 SITE_MATCHES:
-{'\n'.join(site_summary)}
+{site_block}
 
 RESPONSE: Valid JSON only.
 """
@@ -11,7 +11,6 @@ Orchestrates sub-modules for visual analysis, selector mapping, and recovery.
 """
 
 import os
-import re
 import json
 from typing import Dict, Any, List, Optional
 from pathlib import Path
@@ -23,6 +22,7 @@ from ..Utils.utils import LOG_DIR
 
 # Import sub-modules
 from .utils import clean_html_content
+from .dom_distiller import distill_dom, distill_html, capture_compact_screenshot
 from .selector_manager import map_visuals_to_selectors, simplify_selectors
 
 # --- Vision Integration ---
@@ -31,28 +31,32 @@ async def get_visual_ui_analysis(page: Any, context_key: str = "unknown") -> str
     from .api_manager import unified_api_call
     import os
 
-    print(f"    [VISION] Loading UI/UX analysis from logged screenshot for '{context_key}'...")
+    print(f"    [VISION] Loading UI/UX analysis for '{context_key}'...")
 
-    # Look in Page subdirectory where screenshots are saved
-    PAGE_LOG_DIR = LOG_DIR / "Page"
-    files = list(PAGE_LOG_DIR.glob(f"*{context_key}.png"))
+    # Compact viewport JPEG straight from the page; the logged PNG is the fallback
+    image_data = await capture_compact_screenshot(page) if page is not None else None
 
-    if not files:
-        print(f"    [VISION ERROR] No screenshot found for context: {context_key}")
-        return ""
+    if image_data is None:
+        # Look in Page subdirectory where screenshots are saved
+        PAGE_LOG_DIR = LOG_DIR / "Page"
+        files = list(PAGE_LOG_DIR.glob(f"*{context_key}.png"))
 
-    # Get the most recent screenshot
-    png_file = max(files, key=os.path.getmtime)
-    print(f"    [VISION] Using logged screenshot: {png_file.name}")
+        if not files:
+            print(f"    [VISION ERROR] No screenshot found for context: {context_key}")
+            return ""
+
+        # Get the most recent screenshot
+        png_file = max(files, key=os.path.getmtime)
+        print(f"    [VISION] Using logged screenshot: {png_file.name}")
 
-    try:
         # Check if file is not empty (successful screenshot)
         if png_file.stat().st_size == 0:
             print(f"    [VISION ERROR] Screenshot file is empty: {png_file.name}")
             return ""
-
         image_data = {"mime_type": "image/png", "data": png_file.read_bytes()}
 
+    try:
+
         prompt = """
         You are a senior front-end engineer and UI/UX analyst with 15+ years of experience in reverse-engineering complex web applications.
         Your task: Perform an exhaustive, pixel-perfect visual inventory of the provided screenshot.
@@ -152,26 +156,25 @@ class VisualAnalyzer:
         if not ui_visual_context:
             return
 
-        PAGE_LOG_DIR = LOG_DIR / "Page"
-        files = list(PAGE_LOG_DIR.glob(f"*{context_key}.html"))
-        if not files:
-            print(f"    [AI INTEL ERROR] No HTML file found for context: {context_key}")
-            return
-
-        html_file = max(files, key=os.path.getmtime)
-        print(f"    [AI INTEL] Using logged HTML: {html_file.name}")
-
-        try:
-            with open(html_file, "r", encoding="utf-8") as f:
-                html_content = f.read()
-        except Exception as e:
-            print(f"    [AI INTEL ERROR] Failed to load HTML: {e}")
-            return
-
-        # Optional: Minimal clean to save tokens
-        html_content = re.sub(r"<script.*?</script>", "", html_content, flags=re.DOTALL | re.IGNORECASE)
-        html_content = re.sub(r"<style.*?</style>", "", html_content, flags=re.DOTALL | re.IGNORECASE)
-        html_content = html_content[:100000]
+        # Step 2: Distilled DOM (visible structure + stable attributes, bounded size)
+        html_content = await distill_dom(page)
+        if not html_content:
+            PAGE_LOG_DIR = LOG_DIR / "Page"
+            files = list(PAGE_LOG_DIR.glob(f"*{context_key}.html"))
+            if not files:
+                print(f"    [AI INTEL ERROR] No HTML file found for context: {context_key}")
+                return
+
+            html_file = max(files, key=os.path.getmtime)
+            print(f"    [AI INTEL] Using logged HTML: {html_file.name}")
+
+            try:
+                with open(html_file, "r", encoding="utf-8") as f:
+                    html_content = distill_html(f.read())
+            except Exception as e:
+                print(f"    [AI INTEL ERROR] Failed to load HTML: {e}")
+                return
+        print(f"    [AI INTEL] Distilled DOM: {len(html_content)} chars.")
 
         # --- Build prompt based on mode ---
         keys_list_str = ", ".join([f'"{k}"' for k in keys_to_find])
@@ -223,7 +226,7 @@ class VisualAnalyzer:
         ### INPUT
         --- VISUAL INVENTORY ---
         {ui_visual_context}
-        --- CLEANED HTML SOURCE ---
+        --- DISTILLED HTML SOURCE ---
         {html_content}
         Return ONLY the JSON mapping. No explanations. No markdown.
         """
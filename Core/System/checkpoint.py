@@ -0,0 +1,165 @@
+# checkpoint.py: Persistent step/work-item checkpoints for resumable cycles.
+# Part of LeoBook Core — System
+#
+# Classes: CycleCheckpoint
+# Functions: get_active_checkpoint(), set_active_checkpoint()
+
+"""
+Cycle Checkpoint Module
+Records which chapter steps of the current cycle have completed and which
+work items (dates, fixtures) inside a step were already handled, in
+Data/Store/cycle_checkpoint.json. After a crash or restart Leo.py resumes
+the unfinished cycle: completed steps are skipped with their stored
+result, and run_flashscore_analysis skips dates and fixtures it already
+processed. A cycle older than CYCLE_CHECKPOINT_MAX_AGE_HOURS is abandoned
+and a fresh one starts.
+
+The checkpoint stores the steps its cycle planned. A restart resumes it only
+when the new plan's steps are a subset of those: a step finished in a
+booking-only cycle must not count as done in a full cycle, where it has to run
+again after the new predictions.
+"""
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime as dt, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+CYCLE_CHECKPOINT_PATH = os.getenv("CYCLE_CHECKPOINT_PATH", os.path.join("Data", "Store", "cycle_checkpoint.json"))
+CYCLE_CHECKPOINT_MAX_AGE_HOURS = float(os.getenv("CYCLE_CHECKPOINT_MAX_AGE_HOURS", "12"))
+
+
+class CycleCheckpoint:
+    """One cycle's progress; every mutation is written through (atomically) to disk."""
+
+    def __init__(self, path: str = CYCLE_CHECKPOINT_PATH, data: Optional[Dict[str, Any]] = None,
+                 plan_steps: Optional[Iterable[str]] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = data or {
+            "cycle_id": uuid.uuid4().hex[:12],
+            "started_at": dt.now().isoformat(timespec="seconds"),
+            "completed_at": None,
+            "plan_steps": sorted(plan_steps) if plan_steps is not None else None,
+            "steps": {},
+            "work": {},
+        }
+
+    # ── Lifecycle ──────────────────────────────────────────────
+
+    @classmethod
+    def load_or_start(cls, path: str = CYCLE_CHECKPOINT_PATH,
+                      max_age_hours: float = CYCLE_CHECKPOINT_MAX_AGE_HOURS,
+                      plan_steps: Optional[Iterable[str]] = None) -> "CycleCheckpoint":
+        """
+        Resumes an unfinished, recent cycle from disk, otherwise starts (and saves) a new
+        one. With plan_steps, only a cycle whose stored plan covers all of them is resumed.
+        """
+        plan_steps = set(plan_steps) if plan_steps is not None else None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            started = dt.fromisoformat(data["started_at"])
+            stored_steps = data.get("plan_steps")
+            if plan_steps is not None and (stored_steps is None or not plan_steps <= set(stored_steps)):
+                if not data.get("completed_at"):
+                    print(f"   [Checkpoint] Not resuming cycle {data['cycle_id']}: it planned "
+                          f"{', '.join(stored_steps or ['unknown steps'])}; this cycle needs "
+                          f"{', '.join(sorted(plan_steps))}. Starting fresh.")
+            elif not data.get("completed_at") and dt.now() - started < timedelta(hours=max_age_hours):
+                checkpoint = cls(path, data)
+                print(f"   [Checkpoint] Resuming cycle {data['cycle_id']} from {data['started_at']} "
+                      f"({len(checkpoint.completed_steps())} steps already done).")
+                return checkpoint
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"   [Checkpoint] Ignoring unreadable checkpoint: {e}")
+        checkpoint = cls(path, plan_steps=plan_steps)
+        checkpoint._save()
+        return checkpoint
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.data["steps"] or self.data["work"])
+
+    def complete(self):
+        """Marks the cycle finished; the next load_or_start() begins a new cycle."""
+        with self._lock:
+            self.data["completed_at"] = dt.now().isoformat(timespec="seconds")
+            self._save_locked()
+
+    # ── Steps ──────────────────────────────────────────────────
+
+    def completed_steps(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.data["steps"].items() if v.get("status") == "done"}
+
+    def is_step_done(self, name: str) -> bool:
+        return self.data["steps"].get(name, {}).get("status") == "done"
+
+    def step_result(self, name: str) -> Any:
+        return self.data["steps"].get(name, {}).get("result")
+
+    def mark_step(self, name: str, result: Any = None, status: str = "done"):
+        try:
+            json.dumps(result)
+        except (TypeError, ValueError):
+            result = None
+        with self._lock:
+            self.data["steps"][name] = {
+                "status": status,
+                "result": result,
+                "finished_at": dt.now().isoformat(timespec="seconds"),
+            }
+            self._save_locked()
+
+    # ── Work items (dates, fixtures, chunks inside a step) ────
+
+    def is_done(self, scope: str, key: str) -> bool:
+        return str(key) in self.data["work"].get(scope, {})
+
+    def done_keys(self, scope: str) -> set:
+        return set(self.data["work"].get(scope, {}))
+
+    def mark_done(self, scope: str, keys: Iterable[str]):
+        keys = [str(k) for k in keys if k]
+        if not keys:
+            return
+        stamp = dt.now().isoformat(timespec="seconds")
+        with self._lock:
+            bucket = self.data["work"].setdefault(scope, {})
+            for key in keys:
+                bucket[key] = stamp
+            self._save_locked()
+
+    # ── Persistence ───────────────────────────────────────────
+
+    def _save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"   [Checkpoint] Failed to persist: {e}")
+
+
+_active: Optional[CycleCheckpoint] = None
+
+
+def set_active_checkpoint(checkpoint: Optional[CycleCheckpoint]):
+    """Publishes the running cycle's checkpoint to steps that track work items."""
+    global _active
+    _active = checkpoint
+
+
+def get_active_checkpoint() -> Optional[CycleCheckpoint]:
+    """The running cycle's checkpoint, or None outside the full cycle (utility/granular runs)."""
+    return _active
@@ -0,0 +1,178 @@
+# cycle_timer.py: Event-driven cycle timing from the fixture calendar.
+# Part of LeoBook Core — System
+#
+# Classes: CyclePlan, CycleTimer
+# Functions: lagos_now(), load_calendar()
+
+"""
+Cycle Timer Module
+Replaces the fixed LEO_CYCLE_WAIT_HOURS sleep between cycles. The prediction
+calendar (predictions.csv: date, match_time, status) tells us when there is
+useful work:
+
+  review   a 'pending' prediction whose kickoff is LEO_REVIEW_DELAY_MINUTES old
+           (same 2.5h completion buffer as outcome_reviewer)
+  booking  an unbooked prediction ('pending'/'failed_harvest') kicking off within
+           LEO_BOOKING_HORIZON_HOURS, with a last call LEO_BOOKING_LEAD_MINUTES
+           before kickoff
+  full     the periodic Flashscore discovery + analysis pass, at most every
+           LEO_CYCLE_WAIT_HOURS (the old fixed interval, now the upper bound)
+
+CycleTimer.plan() says which chapters have work now; CycleTimer.next_wake()
+returns the earliest future event, clamped to [LEO_MIN_WAKE_MINUTES, next full
+cycle]. Events that fell due while a cycle was running wake the loop again
+after the minimum interval instead of waiting for the next event.
+"""
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime as dt, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from Data.Access.db_helpers import PREDICTIONS_CSV, _read_csv
+
+NIGERIA_TZ = ZoneInfo("Africa/Lagos")
+
+CYCLE_WAIT_HOURS = float(os.getenv("LEO_CYCLE_WAIT_HOURS", "6"))
+LEO_MIN_WAKE_MINUTES = float(os.getenv("LEO_MIN_WAKE_MINUTES", "10"))
+LEO_REVIEW_DELAY_MINUTES = float(os.getenv("LEO_REVIEW_DELAY_MINUTES", "150"))
+LEO_BOOKING_HORIZON_HOURS = float(os.getenv("LEO_BOOKING_HORIZON_HOURS", "12"))
+LEO_BOOKING_LEAD_MINUTES = float(os.getenv("LEO_BOOKING_LEAD_MINUTES", "45"))
+
+REVIEW_STATUSES = {"pending"}
+BOOKING_STATUSES = {"pending", "failed_harvest"}
+
+# Which cycle steps each kind of work needs (Chapter 3 oversight runs with any of them)
+WORK_STEPS = {
+    "full": {"prologue_p1", "prologue_p2", "ch1_p1", "ch1_p2", "ch1_p3", "ch2_p1", "ch2_p2", "ch3"},
+    "review": {"prologue_p1", "prologue_p2", "ch3"},
+    "booking": {"ch1_p2", "ch1_p3", "ch2_p1", "ch2_p2", "ch3"},
+}
+
+
+def lagos_now() -> dt:
+    """Current Africa/Lagos wall time (naive, like the CSV dates)."""
+    return dt.now(NIGERIA_TZ).replace(tzinfo=None)
+
+
+def _kickoff(row: Dict[str, str]) -> Optional[dt]:
+    date_str, time_str = (row.get("date") or "").strip(), (row.get("match_time") or "").strip()
+    if not date_str or not time_str or time_str == "N/A":
+        return None
+    try:
+        return dt.strptime(f"{date_str} {time_str[:5]}", "%d.%m.%Y %H:%M")
+    except ValueError:
+        return None
+
+
+def load_calendar(path: str = PREDICTIONS_CSV) -> List[Tuple[dt, str]]:
+    """(kickoff, status) for every prediction with a parseable kickoff."""
+    calendar = []
+    for row in _read_csv(path):
+        kickoff = _kickoff(row)
+        if kickoff is not None:
+            calendar.append((kickoff, (row.get("status") or "").strip()))
+    return calendar
+
+
+@dataclass
+class CyclePlan:
+    """The work due at `at`; steps() is what the cycle scheduler should run."""
+    at: dt
+    full: bool = False
+    review: int = 0    # finished matches awaiting outcome review
+    booking: int = 0   # upcoming matches awaiting booking
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def has_work(self) -> bool:
+        return self.full or self.review > 0 or self.booking > 0
+
+    def steps(self) -> set:
+        if self.full:
+            return set(WORK_STEPS["full"])
+        selected = set()
+        if self.review:
+            selected |= WORK_STEPS["review"]
+        if self.booking:
+            selected |= WORK_STEPS["booking"]
+        return selected
+
+    def includes(self, step_name: str) -> bool:
+        return step_name in self.steps()
+
+    def describe(self) -> str:
+        return "; ".join(self.reasons) or "nothing due"
+
+
+class CycleTimer:
+    """Decides what each cycle runs and how long Leo sleeps in between."""
+
+    def __init__(self, full_interval_hours: float = CYCLE_WAIT_HOURS,
+                 min_wake_minutes: float = LEO_MIN_WAKE_MINUTES):
+        self.full_interval = timedelta(hours=full_interval_hours)
+        self.min_wake = timedelta(minutes=min_wake_minutes)
+        self.review_delay = timedelta(minutes=LEO_REVIEW_DELAY_MINUTES)
+        self.booking_horizon = timedelta(hours=LEO_BOOKING_HORIZON_HOURS)
+        self.booking_lead = timedelta(minutes=LEO_BOOKING_LEAD_MINUTES)
+        self.last_full_at: Optional[dt] = None   # None -> the first cycle is always full
+        self.last_plan_at: Optional[dt] = None
+
+    def _full_due_at(self) -> Optional[dt]:
+        return None if self.last_full_at is None else self.last_full_at + self.full_interval
+
+    def plan(self, now: Optional[dt] = None, calendar: Optional[List[Tuple[dt, str]]] = None) -> CyclePlan:
+        """What has pending work right now."""
+        now = now or lagos_now()
+        calendar = load_calendar() if calendar is None else calendar
+        plan = CyclePlan(at=now)
+
+        full_due = self._full_due_at()
+        if full_due is None or now >= full_due:
+            plan.full = True
+            plan.reasons.append("first cycle" if full_due is None else f"full refresh ({self.full_interval.total_seconds() / 3600:g}h)")
+
+        for kickoff, status in calendar:
+            if status in REVIEW_STATUSES and kickoff + self.review_delay <= now:
+                plan.review += 1
+            if status in BOOKING_STATUSES and now < kickoff <= now + self.booking_horizon:
+                plan.booking += 1
+        if plan.review:
+            plan.reasons.append(f"{plan.review} finished match(es) to review")
+        if plan.booking:
+            plan.reasons.append(f"{plan.booking} upcoming match(es) to book")
+
+        self.last_plan_at = now
+        return plan
+
+    def record(self, plan: CyclePlan):
+        """Call once the planned cycle has run."""
+        if plan.full:
+            self.last_full_at = plan.at
+
+    def events(self, since: dt, calendar: List[Tuple[dt, str]]) -> List[Tuple[dt, str]]:
+        """Calendar events after `since`: (time, label), earliest first."""
+        events = []
+        for kickoff, status in calendar:
+            if status in REVIEW_STATUSES:
+                events.append((kickoff + self.review_delay, f"review of {kickoff:%d.%m %H:%M} kickoff"))
+            if status in BOOKING_STATUSES:
+                events.append((kickoff - self.booking_horizon, f"booking window for {kickoff:%d.%m %H:%M} kickoff"))
+                events.append((kickoff - self.booking_lead, f"last booking call for {kickoff:%d.%m %H:%M} kickoff"))
+        return sorted(e for e in events if e[0] > since)
+
+    def next_wake(self, now: Optional[dt] = None,
+                  calendar: Optional[List[Tuple[dt, str]]] = None) -> Tuple[dt, str]:
+        """(wake time, reason). Events since the last plan count, so work that fell due mid-cycle is not lost."""
+        now = now or lagos_now()
+        calendar = load_calendar() if calendar is None else calendar
+        since = self.last_plan_at or now
+
+        wake, reason = self._full_due_at() or now + self.full_interval, "full refresh"
+        upcoming = self.events(since, calendar)
+        if upcoming and upcoming[0][0] < wake:
+            wake, reason = upcoming[0]
+        if wake < now + self.min_wake:
+            wake = now + self.min_wake
+        return wake, reason
@@ -10,7 +10,7 @@ import uuid
 from pathlib import Path
 from datetime import datetime as dt
 from Core.Utils.constants import DEFAULT_STAKE
-from Core.Utils.utils import Tee
+from Core.System.log_writer import QueuedLogWriter, QueuedTee
 
 _current_dir = Path(__file__).parent.absolute()
 LOG_DIR = _current_dir.parent.parent / "Data" / "Logs"
@@ -63,7 +63,7 @@ def log_audit_state(chapter: str, action: str, details: str = ""):
     })
 
 def setup_terminal_logging(args):
-    """Sets up Tee logging to file with dynamic prefixes."""
+    """Sets up queued console + file logging with dynamic prefixes (file I/O on a background thread)."""
     # Set timeout
     if args:
         os.environ["PLAYWRIGHT_TIMEOUT"] = "3600000"
@@ -90,11 +90,11 @@ def setup_terminal_logging(args):
     timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
     log_file_path = TERMINAL_LOG_DIR / f"{prefix}_{timestamp}.log"
 
-    log_file = open(log_file_path, "w", encoding="utf-8")
+    log_file = QueuedLogWriter(log_file_path)
     original_stdout = sys.stdout
     original_stderr = sys.stderr
-    sys.stdout = Tee(original_stdout, log_file)
-    sys.stderr = Tee(original_stderr, log_file)
+    sys.stdout = QueuedTee(original_stdout, log_file)
+    sys.stderr = QueuedTee(original_stderr, log_file)
     
     return log_file, original_stdout, original_stderr
 
@@ -0,0 +1,178 @@
+# log_writer.py: Queue-backed terminal log file writer with size rotation and compression.
+# Part of LeoBook Core — System
+#
+# Classes: QueuedLogWriter, QueuedTee
+
+"""
+Log Writer Module
+Replaces the synchronous Tee for session terminal logs. QueuedTee writes to the
+console as before but only enqueues the text for the log file; a daemon thread
+(QueuedLogWriter) drains the queue in batches, so no print on the event loop
+waits on disk.
+
+The session log rotates once it passes LEO_LOG_MAX_MB: the full segment is
+gzip-compressed next to it (<name>.001.log.gz, .002...) and only the newest
+LEO_LOG_KEEP_SEGMENTS compressed segments are kept. If the queue ever holds
+LEO_LOG_QUEUE_SIZE pending writes, new text is dropped from the file (never
+from the console) and the drop count is written once the writer catches up.
+"""
+
+import gzip
+import os
+import queue
+import shutil
+import threading
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+LEO_LOG_MAX_MB = float(os.getenv("LEO_LOG_MAX_MB", "20"))
+LEO_LOG_KEEP_SEGMENTS = int(os.getenv("LEO_LOG_KEEP_SEGMENTS", "10"))
+LEO_LOG_QUEUE_SIZE = int(os.getenv("LEO_LOG_QUEUE_SIZE", "100000"))
+LEO_LOG_FLUSH_SECONDS = float(os.getenv("LEO_LOG_FLUSH_SECONDS", "1.0"))
+
+_STOP = object()
+
+
+class QueuedLogWriter:
+    """Owns the session log file; all file I/O happens on its background thread."""
+
+    def __init__(self, path, max_bytes: int = int(LEO_LOG_MAX_MB * 1024 * 1024),
+                 keep_segments: int = LEO_LOG_KEEP_SEGMENTS, queue_size: int = LEO_LOG_QUEUE_SIZE,
+                 flush_seconds: float = LEO_LOG_FLUSH_SECONDS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.keep_segments = keep_segments
+        self.flush_seconds = flush_seconds
+        self.dropped = 0
+        self.closed = False
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._segment = 0
+        self._file: TextIO = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+        self._thread = threading.Thread(target=self._run, name="leo-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, text: str):
+        if self.closed or not text:
+            return
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """No-op: the writer thread flushes every LEO_LOG_FLUSH_SECONDS and on close()."""
+
+    def close(self, timeout: float = 10.0):
+        """Drains pending text, flushes and closes the file."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ── Writer thread ──────────────────────────────────────────
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                self._safe_flush()
+                continue
+            batch: List[str] = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if self.dropped:
+                batch.append(f"\n   [Log] {self.dropped} write(s) dropped from the log file (queue full)\n")
+                self.dropped = 0
+            self._write_batch("".join(batch))
+            if stopping or self._queue.empty():
+                self._safe_flush()
+        try:
+            self._file.close()
+        except Exception:
+            pass
+
+    def _write_batch(self, text: str):
+        if not text:
+            return
+        try:
+            self._file.write(text)
+            self._size += len(text)
+            if self.max_bytes > 0 and self._size >= self.max_bytes:
+                self._rotate()
+        except Exception:
+            # The log file is best-effort; the console copy already went out
+            pass
+
+    def _safe_flush(self):
+        try:
+            self._file.flush()
+        except Exception:
+            pass
+
+    def _rotate(self):
+        self._file.close()
+        self._segment += 1
+        stem = self.path.name[:-len(self.path.suffix)] if self.path.suffix else self.path.name
+        segment_path = self.path.with_name(f"{stem}.{self._segment:03d}{self.path.suffix}")
+        os.replace(self.path, segment_path)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+        self._compress(segment_path)
+        self._prune(stem)
+
+    @staticmethod
+    def _compress(segment_path: Path):
+        gz_path = segment_path.with_name(segment_path.name + ".gz")
+        tmp_path = gz_path.with_name(gz_path.name + ".tmp")
+        try:
+            with open(segment_path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, gz_path)
+            os.remove(segment_path)
+        except Exception:
+            # Keep the uncompressed segment rather than lose it
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def _prune(self, stem: str):
+        if self.keep_segments <= 0:
+            return
+        segments = sorted(self.path.parent.glob(f"{stem}.[0-9][0-9][0-9]{self.path.suffix}*"))
+        for old in segments[:-self.keep_segments]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+class QueuedTee:
+    """sys.stdout/sys.stderr replacement: synchronous console write, queued log-file write."""
+
+    def __init__(self, console: TextIO, writer: QueuedLogWriter):
+        self.console = console
+        self.writer = writer
+
+    def write(self, obj) -> int:
+        text = obj if isinstance(obj, str) else str(obj)
+        self.console.write(text)
+        self.console.flush()
+        self.writer.write(text)
+        return len(text)
+
+    def flush(self):
+        self.console.flush()
+
+    def __getattr__(self, name):
+        # isatty(), encoding, fileno()... behave like the console stream
+        return getattr(self.console, name)
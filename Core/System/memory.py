@@ -0,0 +1,273 @@
+# memory.py: Memory sampling, tracemalloc profiling and memory budgets.
+# Part of LeoBook Core — System
+#
+# Classes: MemoryReport, BrowserRecycleWatch
+# Functions: start_memory_profiling(), process_rss_mb(), browser_memory(), check_memory(), request_browser_recycle()
+
+"""
+Memory Module
+Leo runs forever with several Playwright instances (the live streamer, the
+chapter browsers, enrichment browsers) and module-level caches, so memory
+growth has to be watched from inside the process.
+
+check_memory(label) is called after every scheduler step, after every cycle
+and after every live-streamer poll. With profiling, a budget or the metrics
+endpoint (LEO_METRICS_PORT) on, it samples:
+  rss        the Python process (psutil, or /proc/self/status without it)
+  browser    Chromium processes spawned under this process (psutil only)
+  py_heap    traced Python allocations (profiling mode only)
+
+Budgets (0 = off):
+  LEO_MEMORY_BUDGET_MB          process RSS; over it every registered TTLCache
+                                is cleared and the garbage collector runs
+  LEO_BROWSER_MEMORY_BUDGET_MB  total Chromium RSS; over it long-lived browsers
+                                (the streamer) are asked to recycle their session
+Actions are rate-limited by LEO_MEMORY_ACTION_COOLDOWN seconds.
+
+LEO_MEMORY_PROFILE=1 starts tracemalloc and appends every sample to
+LEO_MEMORY_LOG_PATH (Data/Logs/memory.jsonl), including the top allocators by
+line and the biggest growth since the previous sample. tracemalloc slows
+allocation noticeably; use it to find a leak, not in normal runs.
+"""
+
+import gc
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime as dt
+from typing import Any, Dict, List, Optional, Tuple
+
+from Core.System.metrics import MEMORY_ACTIONS, MEMORY_BYTES, metrics_enabled
+
+LEO_MEMORY_PROFILE = os.getenv("LEO_MEMORY_PROFILE", "0").lower() in ("1", "true", "yes", "on")
+LEO_MEMORY_LOG_PATH = os.getenv("LEO_MEMORY_LOG_PATH", os.path.join("Data", "Logs", "memory.jsonl"))
+LEO_MEMORY_TOP = int(os.getenv("LEO_MEMORY_TOP", "10"))
+LEO_MEMORY_TRACE_FRAMES = int(os.getenv("LEO_MEMORY_TRACE_FRAMES", "1"))
+LEO_MEMORY_BUDGET_MB = float(os.getenv("LEO_MEMORY_BUDGET_MB", "0"))
+LEO_BROWSER_MEMORY_BUDGET_MB = float(os.getenv("LEO_BROWSER_MEMORY_BUDGET_MB", "0"))
+LEO_MEMORY_ACTION_COOLDOWN = float(os.getenv("LEO_MEMORY_ACTION_COOLDOWN", "300"))
+
+_BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+_MB = 1024 * 1024
+
+_lock = threading.Lock()
+_last_snapshot: Optional[tracemalloc.Snapshot] = None
+_last_action: Dict[str, float] = {}
+_recycle_generation = 0
+
+
+@dataclass
+class MemoryReport:
+    label: str
+    at: str
+    rss_mb: Optional[float]
+    browser_mb: Optional[float] = None
+    browser_processes: int = 0
+    py_heap_mb: Optional[float] = None
+    py_heap_peak_mb: Optional[float] = None
+    cache_entries: int = 0
+    top_allocators: List[Dict[str, Any]] = field(default_factory=list)
+    top_growth: List[Dict[str, Any]] = field(default_factory=list)
+    actions: List[str] = field(default_factory=list)
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def over_budget(self) -> bool:
+        return LEO_MEMORY_BUDGET_MB > 0 and (self.rss_mb or 0) > LEO_MEMORY_BUDGET_MB
+
+    @property
+    def browser_over_budget(self) -> bool:
+        return LEO_BROWSER_MEMORY_BUDGET_MB > 0 and (self.browser_mb or 0) > LEO_BROWSER_MEMORY_BUDGET_MB
+
+    def describe(self) -> str:
+        parts = [f"rss {self.rss_mb:.0f}MB" if self.rss_mb is not None else "rss n/a"]
+        if self.browser_mb is not None:
+            parts.append(f"browsers {self.browser_mb:.0f}MB/{self.browser_processes} proc")
+        if self.py_heap_mb is not None:
+            parts.append(f"py heap {self.py_heap_mb:.0f}MB (peak {self.py_heap_peak_mb:.0f}MB)")
+        parts.append(f"{self.cache_entries} cache entries")
+        return ", ".join(parts)
+
+
+# ── Sampling ─────────────────────────────────────────────────
+
+def start_memory_profiling():
+    """Starts tracemalloc when LEO_MEMORY_PROFILE is on (call once, early)."""
+    if LEO_MEMORY_PROFILE and not tracemalloc.is_tracing():
+        tracemalloc.start(max(1, LEO_MEMORY_TRACE_FRAMES))
+        print(f"   [Memory] Profiling on (tracemalloc, {LEO_MEMORY_TRACE_FRAMES} frame(s)) -> {LEO_MEMORY_LOG_PATH}")
+
+
+def _psutil():
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+def process_rss_mb() -> Optional[float]:
+    psutil = _psutil()
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / _MB
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def browser_memory() -> Tuple[Optional[float], int]:
+    """(total RSS in MB, process count) of Chromium processes under this process; (None, 0) without psutil."""
+    psutil = _psutil()
+    if psutil is None:
+        return None, 0
+    total, count = 0, 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            if any(n in child.name().lower() for n in _BROWSER_PROCESS_NAMES):
+                total += child.memory_info().rss
+                count += 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / _MB, count
+
+
+def _frame(stat) -> str:
+    frame = stat.traceback[0]
+    filename = frame.filename
+    if filename.startswith(os.getcwd() + os.sep):
+        filename = os.path.relpath(filename)
+    return f"{filename}:{frame.lineno}"
+
+
+def _heap_profile(report: MemoryReport):
+    global _last_snapshot
+    current, peak = tracemalloc.get_traced_memory()
+    report.py_heap_mb, report.py_heap_peak_mb = round(current / _MB, 1), round(peak / _MB, 1)
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    report.top_allocators = [{"where": _frame(s), "mb": round(s.size / _MB, 2), "count": s.count}
+                             for s in snapshot.statistics("lineno")[:LEO_MEMORY_TOP]]
+    if _last_snapshot is not None:
+        growth = [s for s in snapshot.compare_to(_last_snapshot, "lineno") if s.size_diff > 0][:LEO_MEMORY_TOP]
+        report.top_growth = [{"where": _frame(s), "mb": round(s.size_diff / _MB, 2), "count": s.count_diff}
+                             for s in growth]
+    _last_snapshot = snapshot
+
+
+def _sample(label: str, attrs: Dict[str, Any]) -> MemoryReport:
+    from Core.Utils.ttl_cache import cache_stats
+    rss = process_rss_mb()
+    browser_mb, browser_count = browser_memory()
+    report = MemoryReport(
+        label=label, at=dt.now().isoformat(timespec="seconds"),
+        rss_mb=round(rss, 1) if rss is not None else None,
+        browser_mb=round(browser_mb, 1) if browser_mb is not None else None,
+        browser_processes=browser_count,
+        cache_entries=sum(s["size"] for s in cache_stats().values()),
+        attrs=attrs,
+    )
+    if tracemalloc.is_tracing():
+        _heap_profile(report)
+
+    if report.rss_mb is not None:
+        MEMORY_BYTES.set(report.rss_mb * _MB, kind="rss")
+    if report.browser_mb is not None:
+        MEMORY_BYTES.set(report.browser_mb * _MB, kind="browser")
+    if report.py_heap_mb is not None:
+        MEMORY_BYTES.set(report.py_heap_mb * _MB, kind="py_heap")
+    return report
+
+
+# ── Budgets ──────────────────────────────────────────────────
+
+def _cooled_down(action: str) -> bool:
+    now = time.monotonic()
+    if now - _last_action.get(action, -LEO_MEMORY_ACTION_COOLDOWN) < LEO_MEMORY_ACTION_COOLDOWN:
+        return False
+    _last_action[action] = now
+    return True
+
+
+def _enforce_budgets(report: MemoryReport):
+    if report.over_budget and _cooled_down("clear_caches"):
+        from Core.Utils.ttl_cache import reset_all_caches
+        dropped = reset_all_caches()
+        collected = gc.collect()
+        after = process_rss_mb()
+        report.actions.append("clear_caches")
+        MEMORY_ACTIONS.inc(action="clear_caches")
+        print(f"   [Memory] RSS {report.rss_mb:.0f}MB over budget ({LEO_MEMORY_BUDGET_MB:.0f}MB): "
+              f"cleared {dropped} cache entries, gc freed {collected} objects"
+              + (f" -> {after:.0f}MB" if after is not None else ""))
+    if report.browser_over_budget and _cooled_down("recycle_browser"):
+        request_browser_recycle(f"browsers at {report.browser_mb:.0f}MB (budget {LEO_BROWSER_MEMORY_BUDGET_MB:.0f}MB)")
+        report.actions.append("recycle_browser")
+
+
+def request_browser_recycle(reason: str):
+    """Asks every long-lived browser session (BrowserRecycleWatch holders) to restart."""
+    global _recycle_generation
+    with _lock:
+        _recycle_generation += 1
+    MEMORY_ACTIONS.inc(action="recycle_browser")
+    print(f"   [Memory] Browser recycle requested: {reason}")
+
+
+class BrowserRecycleWatch:
+    """Held by a long-lived browser loop; due() is True once per recycle request."""
+
+    def __init__(self):
+        self._seen = _recycle_generation
+
+    def due(self) -> bool:
+        if self._seen != _recycle_generation:
+            self._seen = _recycle_generation
+            return True
+        return False
+
+
+def _log_report(report: MemoryReport):
+    try:
+        os.makedirs(os.path.dirname(LEO_MEMORY_LOG_PATH) or ".", exist_ok=True)
+        record = asdict(report)
+        with open(LEO_MEMORY_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except Exception as e:
+        print(f"   [Memory] Failed to write sample: {e}")
+
+
+def check_memory(label: str, verbose: bool = False, **attrs) -> Optional[MemoryReport]:
+    """
+    Samples memory after a unit of work and enforces the budgets. Returns None
+    (without sampling) when neither profiling, a budget nor the metrics
+    endpoint (leo_memory_bytes) is configured.
+    """
+    if not (LEO_MEMORY_PROFILE or LEO_MEMORY_BUDGET_MB > 0 or LEO_BROWSER_MEMORY_BUDGET_MB > 0
+            or metrics_enabled()):
+        return None
+    try:
+        with _lock:
+            report = _sample(label, attrs)
+        _enforce_budgets(report)
+    except Exception as e:
+        print(f"   [Memory] Sampling failed after {label}: {e}")
+        return None
+
+    if LEO_MEMORY_PROFILE:
+        _log_report(report)
+    if verbose or LEO_MEMORY_PROFILE:
+        print(f"   [Memory] {label}: {report.describe()}")
+        for entry in [e for e in report.top_growth if e["mb"] >= 0.1][:3]:
+            print(f"   [Memory]   +{entry['mb']:.2f}MB {entry['where']}")
+    return report
@@ -0,0 +1,287 @@
+# metrics.py: Optional in-process metrics registry with a Prometheus text endpoint.
+# Part of LeoBook Core — System
+#
+# Classes: Counter, Gauge, Histogram, MetricsRegistry
+# Functions: metrics_enabled(), start_metrics_server(), track_navigations(), llm_call_metrics()
+
+"""
+Metrics Module
+Counters, gauges and histograms for where time goes in production: chapter
+step durations, pages navigated, retries, CSV I/O, Supabase sync volume,
+LLM calls per key/model, selector heals and live-streamer cycle time.
+
+Off unless LEO_METRICS_PORT is set: every update is then a cheap no-op.
+With a port, start_metrics_server() serves the registry in Prometheus text
+exposition format on http://LEO_METRICS_HOST:LEO_METRICS_PORT/metrics from a
+daemon thread (stdlib only, no prometheus_client needed).
+"""
+
+import functools
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LEO_METRICS_PORT = int(os.getenv("LEO_METRICS_PORT", "0") or 0)
+LEO_METRICS_HOST = os.getenv("LEO_METRICS_HOST", "127.0.0.1")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_enabled = LEO_METRICS_PORT > 0
+
+
+def metrics_enabled() -> bool:
+    return _enabled
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Exposition lines for the current values (HELP/TYPE are added by render())."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if not _enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        if not _enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# ── LeoBook metrics ──────────────────────────────────────────
+
+STEP_SECONDS = REGISTRY.histogram("leo_step_duration_seconds", "Cycle step (chapter page) wall time.", ["step", "status"])
+CYCLE_SECONDS = REGISTRY.histogram("leo_cycle_duration_seconds", "Full cycle wall time.")
+PAGES_NAVIGATED = REGISTRY.counter("leo_pages_navigated_total", "Main-frame navigations.", ["site"])
+RETRIES = REGISTRY.counter("leo_retries_total", "Failed attempts retried by aigo_retry.", ["function"])
+CSV_BYTES = REGISTRY.counter("leo_csv_bytes_total", "Bytes read/written on the CSV store.", ["file", "op"])
+CSV_SECONDS = REGISTRY.histogram("leo_csv_io_seconds", "CSV read/write latency.", ["file", "op"],
+                                 buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+SYNC_ROWS = REGISTRY.counter("leo_sync_rows_total", "Rows exchanged with Supabase.", ["table", "direction"])
+LLM_CALLS = REGISTRY.counter("leo_llm_calls_total", "LLM API calls.", ["provider", "model", "key", "outcome"])
+LLM_SECONDS = REGISTRY.histogram("leo_llm_latency_seconds", "LLM API call latency.", ["provider", "model"])
+SELECTOR_HEALS = REGISTRY.counter("leo_selector_heals_total", "On-demand selector heals.", ["context", "outcome"])
+STREAMER_CYCLE_SECONDS = REGISTRY.histogram("leo_streamer_cycle_seconds", "Live-streamer extraction cycle time.")
+MEMORY_BYTES = REGISTRY.gauge("leo_memory_bytes", "Last sampled memory (rss, browser, py_heap).", ["kind"])
+MEMORY_ACTIONS = REGISTRY.counter("leo_memory_budget_actions_total", "Memory budget actions taken.", ["action"])
+
+
+# ── Helpers ──────────────────────────────────────────────────
+
+def track_navigations(context, site: str):
+    """Counts main-frame navigations of a Playwright BrowserContext under `site`."""
+    if not _enabled or context is None:
+        return
+
+    def _on_request(request):
+        try:
+            if request.is_navigation_request() and request.frame.parent_frame is None:
+                PAGES_NAVIGATED.inc(site=site)
+        except Exception:
+            pass
+
+    context.on("request", _on_request)
+
+
+def _key_label(api_key: Optional[str]) -> str:
+    return f"...{api_key[-4:]}" if api_key else "none"
+
+
+def _outcome(error: Exception) -> str:
+    text = str(error)
+    for code in ("429", "403", "503"):
+        if code in text:
+            return code
+    return "error"
+
+
+def llm_call_metrics(provider: str, default_model: str, key_env: str):
+    """Decorator for a provider call taking model=/api_key= kwargs: counts outcomes and times it."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not _enabled:
+                return await func(*args, **kwargs)
+            model = kwargs.get("model") or default_model
+            key = _key_label(kwargs.get("api_key") or os.getenv(key_env, "").split(",")[0].strip())
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                outcome = _outcome(e)
+                raise
+            finally:
+                LLM_SECONDS.observe(time.perf_counter() - start, provider=provider, model=model)
+                LLM_CALLS.inc(provider=provider, model=model, key=key, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int = LEO_METRICS_PORT, host: str = LEO_METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Starts the /metrics endpoint once (no-op when metrics are disabled)."""
+    global _server, _enabled
+    if port <= 0:
+        return None
+    if _server is not None:
+        return _server
+    _enabled = True
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        print(f"   [Metrics] Could not bind {host}:{port}: {e}")
+        return None
+    threading.Thread(target=_server.serve_forever, name="leo-metrics", daemon=True).start()
+    print(f"   [Metrics] Serving http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,160 @@
+# scheduler.py: Dependency-graph scheduler for the chapter steps of a cycle.
+# Part of LeoBook Core — System
+#
+# Classes: Step, StepScheduler
+
+"""
+Step Scheduler Module
+Each chapter step declares the data it consumes (inputs) and produces
+(outputs). A step starts as soon as every producer of its inputs has
+finished, so steps that only share the data store — not each other's
+results — run concurrently. Shared resources (browser slots, the single
+Football.com session) are bounded by per-resource semaphores.
+
+Semantics mirror the old hand-written sequencing: a failed step is logged and
+its dependents still run (chapter functions already handle their own errors);
+a step whose `when` predicate is false is skipped and counts as finished.
+With a CycleCheckpoint, steps completed before a restart are not re-run —
+their stored result is reused.
+"""
+
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from Core.System.memory import check_memory
+from Core.System.metrics import STEP_SECONDS
+from Core.System.tracing import span
+
+
+@dataclass
+class Step:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    inputs: Set[str] = field(default_factory=set)
+    outputs: Set[str] = field(default_factory=set)
+    resources: Dict[str, int] = field(default_factory=dict)  # resource -> units held while running
+    when: Optional[Callable[[Dict[str, Any]], bool]] = None  # gate on earlier results
+    on_skip: Optional[Callable[[], Any]] = None
+    after: Set[str] = field(default_factory=set)  # explicit ordering without a data edge
+
+
+class StepScheduler:
+    """Runs a set of Steps as a DAG under resource limits."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, checkpoint=None):
+        self._steps: Dict[str, Step] = {}
+        self._checkpoint = checkpoint
+        self._limits = dict(limits or {})
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.results: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {}      # name -> done | failed | skipped | resumed
+        self.durations: Dict[str, float] = {}
+
+    def add(self, step: Step) -> "StepScheduler":
+        if step.name in self._steps:
+            raise ValueError(f"Duplicate step '{step.name}'")
+        self._steps[step.name] = step
+        return self
+
+    def dependencies(self) -> Dict[str, Set[str]]:
+        """step -> names of the steps it waits for (producers of its inputs + explicit `after`)."""
+        producers: Dict[str, str] = {}
+        for step in self._steps.values():
+            for out in step.outputs:
+                if out in producers:
+                    raise ValueError(f"Output '{out}' produced by both '{producers[out]}' and '{step.name}'")
+                producers[out] = step.name
+        deps = {}
+        for step in self._steps.values():
+            unknown = step.after - set(self._steps)
+            if unknown:
+                raise ValueError(f"Step '{step.name}' runs after unknown step(s): {sorted(unknown)}")
+            deps[step.name] = {producers[i] for i in step.inputs if i in producers} | set(step.after)
+            deps[step.name].discard(step.name)
+        return deps
+
+    def order(self) -> List[str]:
+        """Topological order (insertion order among ready steps). Raises on cycles."""
+        deps = self.dependencies()
+        done: List[str] = []
+        remaining = list(self._steps)
+        while remaining:
+            ready = [n for n in remaining if deps[n] <= set(done)]
+            if not ready:
+                raise ValueError(f"Dependency cycle among steps: {remaining}")
+            done.extend(ready)
+            remaining = [n for n in remaining if n not in ready]
+        return done
+
+    def _semaphore(self, resource: str) -> asyncio.Semaphore:
+        if resource not in self._semaphores:
+            self._semaphores[resource] = asyncio.Semaphore(max(1, self._limits.get(resource, 1)))
+        return self._semaphores[resource]
+
+    async def _run_step(self, step: Step):
+        if self._checkpoint is not None and self._checkpoint.is_step_done(step.name):
+            self.results[step.name] = self._checkpoint.step_result(step.name)
+            self.status[step.name] = "resumed"
+            print(f"   [Scheduler] ↷ {step.name} already completed this cycle (checkpoint).")
+            return
+
+        if step.when is not None and not step.when(self.results):
+            self.status[step.name] = "skipped"
+            print(f"   [Scheduler] ⏭ {step.name} skipped (precondition not met).")
+            if step.on_skip:
+                step.on_skip()
+            return
+
+        async with AsyncExitStack() as stack:
+            # Acquire in a fixed order so two steps never hold each other's resources
+            for resource in sorted(step.resources):
+                sem = self._semaphore(resource)
+                for _ in range(min(step.resources[resource], max(1, self._limits.get(resource, 1)))):
+                    await sem.acquire()
+                    stack.callback(sem.release)
+            print(f"   [Scheduler] ▶ {step.name}")
+            start = time.monotonic()
+            try:
+                with span(f"step:{step.name}"):
+                    self.results[step.name] = await step.run()
+                self.status[step.name] = "done"
+                if self._checkpoint is not None:
+                    self._checkpoint.mark_step(step.name, self.results[step.name])
+            except Exception as e:
+                self.results[step.name] = None
+                self.status[step.name] = "failed"
+                print(f"   [Scheduler] {step.name} raised: {e}")
+            finally:
+                self.durations[step.name] = time.monotonic() - start
+                STEP_SECONDS.observe(self.durations[step.name], step=step.name, status=self.status[step.name])
+        mark = "✓" if self.status[step.name] == "done" else "✗"
+        print(f"   [Scheduler] {mark} {step.name} {self.status[step.name]} in {self.durations[step.name]:.1f}s")
+        check_memory(f"step:{step.name}", status=self.status[step.name])
+
+    async def run(self) -> Dict[str, Any]:
+        """Runs every step once; returns {step_name: return value}."""
+        deps = self.dependencies()
+        order = self.order()
+        pending = list(order)
+        finished: Set[str] = set()
+        running: Dict[asyncio.Task, str] = {}
+
+        while pending or running:
+            for name in [n for n in pending if deps[n] <= finished]:
+                pending.remove(name)
+                running[asyncio.create_task(self._run_step(self._steps[name]))] = name
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                finished.add(running.pop(task))
+                if task.exception() is not None:  # scheduler bug, not a step failure
+                    print(f"   [Scheduler] Internal error: {task.exception()}")
+        return self.results
+
+    def summary(self) -> str:
+        parts = [f"{name}={self.status.get(name, 'pending')}"
+                 + (f"({self.durations[name]:.0f}s)" if name in self.durations else "")
+                 for name in self._steps]
+        return ", ".join(parts)
@@ -0,0 +1,217 @@
+# tracing.py: Lightweight async-aware tracing spans with JSON-lines and flamegraph export.
+# Part of LeoBook Core — System
+#
+# Classes: Span
+# Functions: span(), traced(), tracing_enabled(), flush_spans(), export_folded()
+
+"""
+Tracing Module
+Timing spans with parent/child relationships, so a slow cycle can be
+attributed to navigation, LLM, disk or sync instead of being read off print
+timestamps. The current span lives in a ContextVar: asyncio tasks inherit
+their creator's span as parent, and concurrent tasks never see each other's.
+
+    with span("sync.table", table="predictions"):
+        ...
+
+    @traced("fs.process_match")
+    async def process_match_task(...): ...
+
+Off unless LEO_TRACE=1 (then span()/traced() are near-free no-ops). Finished
+spans are buffered and appended to LEO_TRACE_PATH (Data/Logs/traces.jsonl) as
+one JSON object per line. export_folded() turns that file into folded stacks
+("cycle;fs.process_match;rule_engine.analyze <self µs>") for flamegraph.pl or
+speedscope:
+
+    python -m Core.System.tracing Data/Logs/traces.jsonl > cycle.folded
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+LEO_TRACE = os.getenv("LEO_TRACE", "0").lower() in ("1", "true", "yes", "on")
+LEO_TRACE_PATH = os.getenv("LEO_TRACE_PATH", os.path.join("Data", "Logs", "traces.jsonl"))
+LEO_TRACE_FLUSH_EVERY = int(os.getenv("LEO_TRACE_FLUSH_EVERY", "200"))
+
+_current: contextvars.ContextVar = contextvars.ContextVar("leo_span", default=None)
+_buffer: List[Dict[str, Any]] = []
+_buffer_lock = threading.Lock()
+
+
+def tracing_enabled() -> bool:
+    return LEO_TRACE
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "start", "_t0", "duration", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set(self, **attrs):
+        """Adds attributes once they are known (row counts, status codes...)."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "thread": threading.current_thread().name,
+        }
+        if self.attrs:
+            record["attrs"] = {k: v if isinstance(v, (int, float, bool, type(None))) else str(v)
+                               for k, v in self.attrs.items()}
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Times the enclosed block as a child of the current span."""
+    if not LEO_TRACE:
+        yield _NOOP
+        return
+    current = Span(name, _current.get(), attrs)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        current.duration = time.perf_counter() - current._t0
+        _current.reset(token)
+        _record(current)
+
+
+def traced(name: Optional[str] = None, attrs: Optional[Callable[..., Dict[str, Any]]] = None):
+    """
+    Decorator form of span() for sync and async functions (name defaults to the
+    qualname). `attrs` receives the call's arguments and returns span attributes.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        def _attrs(args, kwargs):
+            if attrs is None:
+                return {}
+            try:
+                return attrs(*args, **kwargs)
+            except Exception:
+                return {}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not LEO_TRACE:
+                    return await func(*args, **kwargs)
+                with span(span_name, **_attrs(args, kwargs)):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not LEO_TRACE:
+                return func(*args, **kwargs)
+            with span(span_name, **_attrs(args, kwargs)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(finished: Span):
+    with _buffer_lock:
+        _buffer.append(finished.to_dict())
+        full = len(_buffer) >= LEO_TRACE_FLUSH_EVERY
+    if full or finished.parent_id is None:
+        flush_spans()
+
+
+def flush_spans(path: str = LEO_TRACE_PATH):
+    """Appends buffered spans to the JSON-lines file."""
+    with _buffer_lock:
+        pending = _buffer[:]
+        _buffer.clear()
+    if not pending:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in pending))
+    except Exception as e:
+        print(f"   [Tracing] Failed to write spans: {e}")
+
+
+atexit.register(flush_spans)
+
+
+def export_folded(path: str = LEO_TRACE_PATH) -> List[str]:
+    """
+    Folded-stack lines ("root;child;leaf <self_µs>") from a spans file. Self time
+    is a span's duration minus its children's, clamped at 0 (concurrent children
+    can overlap and sum to more than their parent's wall time).
+    """
+    spans: Dict[str, Dict[str, Any]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                spans[record["span_id"]] = record
+
+    child_ms: Dict[str, float] = defaultdict(float)
+    for record in spans.values():
+        if record.get("parent_id") in spans:
+            child_ms[record["parent_id"]] += record["duration_ms"]
+
+    def stack(record) -> str:
+        names = []
+        seen = set()
+        while record is not None and record["span_id"] not in seen:
+            seen.add(record["span_id"])
+            names.append(record["name"].replace(";", ":").replace(" ", "_"))
+            record = spans.get(record.get("parent_id"))
+        return ";".join(reversed(names))
+
+    folded: Dict[str, float] = defaultdict(float)
+    for span_id, record in spans.items():
+        self_ms = max(0.0, record["duration_ms"] - child_ms.get(span_id, 0.0))
+        folded[stack(record)] += self_ms
+    return [f"{path_} {int(ms * 1000)}" for path_, ms in sorted(folded.items()) if ms > 0]
+
+
+if __name__ == "__main__":
+    for out in export_folded(sys.argv[1] if len(sys.argv) > 1 else LEO_TRACE_PATH):
+        print(out)
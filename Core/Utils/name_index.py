@@ -0,0 +1,142 @@
+# name_index.py: In-memory trigram index for team/league name resolution.
+# Part of LeoBook Core — Utilities
+#
+# Classes: NameIndex
+# Functions: normalize_for_search(), trigrams(), name_tokens(), kickoff_minutes()
+
+"""
+Name Index Module
+Resolves free-text team/league names against thousands of known rows without
+scanning every candidate. Names are normalized with normalize_for_search(),
+split into padded character trigrams, and stored in an inverted index;
+queries score only the candidates that share trigrams with the input.
+name_tokens()/kickoff_minutes() are the blocking keys used by the fixture matchers.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+# Tokens too common in team names to discriminate between fixtures
+GENERIC_NAME_TOKENS = {"vs", "fc", "sc", "cf", "ac", "afc", "fk", "sk", "club", "de", "the",
+                       "u19", "u20", "u21", "u23", "women", "w", "ii", "b"}
+
+
+def normalize_for_search(name: str) -> str:
+    """Standard normalization for search term generation (NFKD for accents)."""
+    if not name: return ""
+    # Normalize unicode characters to decompose accents
+    nfkd_form = unicodedata.normalize('NFKD', name)
+    # Filter out non-ASCII characters (accents)
+    only_ascii = "".join([c for c in nfkd_form if not unicodedata.combining(c)])
+    # Remove non-alphanumeric and lower
+    return re.sub(r'[^a-z0-9\s]', '', only_ascii.lower().strip())
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """
+    Space-padded character trigrams of an already-normalized string. Single-space
+    padding keeps word-boundary grams, so a name contained in a longer one
+    ('premier league' in 'england premier league') shares all of its grams.
+    """
+    text = " ".join(normalized.split())
+    if not text:
+        return set()
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_tokens(text: str) -> Set[str]:
+    """Discriminating word tokens of a team/match name (normalized, generic tokens dropped)."""
+    return {t for t in normalize_for_search(text).split() if len(t) > 1 and t not in GENERIC_NAME_TOKENS}
+
+
+def kickoff_minutes(value) -> Optional[int]:
+    """'HH:MM' (optionally with seconds or a date prefix) -> minutes since midnight, else None."""
+    if not value:
+        return None
+    parts = str(value).strip().split(" ")[-1].split(":")
+    try:
+        return int(parts[0]) * 60 + int(parts[1])
+    except (ValueError, IndexError):
+        return None
+
+
+class NameIndex:
+    """
+    Inverted trigram index: key -> one or more names.
+
+    query() returns the top-k keys ranked by Dice similarity (rank="dice") or by
+    the overlap coefficient — how much of the shorter name is covered — (rank="overlap"),
+    which surfaces 'premier league' for 'england premier league round 5'.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Tuple[Hashable, str]]] = defaultdict(set)
+        self._grams: Dict[Tuple[Hashable, str], Set[str]] = {}
+        self._exact: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._payloads: Dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, key: Hashable, name: str, payload: Any = None):
+        """Indexes `name` under `key` (a key may carry several names/aliases)."""
+        norm = normalize_for_search(name)
+        if payload is not None or key not in self._payloads:
+            self._payloads[key] = payload
+        if not norm:
+            return
+        entry = (key, norm)
+        if entry in self._grams:
+            return
+        grams = trigrams(norm)
+        self._grams[entry] = grams
+        self._exact[norm].add(key)
+        for gram in grams:
+            self._postings[gram].add(entry)
+
+    def payload(self, key: Hashable) -> Any:
+        return self._payloads.get(key)
+
+    def exact(self, name: str, normalized: bool = False) -> List[Hashable]:
+        """Keys whose normalized name equals `name`."""
+        norm = name if normalized else normalize_for_search(name)
+        return list(self._exact.get(norm, ()))
+
+    def query(self, name: str, k: Optional[int] = 10, min_score: float = 0.0, normalized: bool = False,
+              accept: Optional[Callable[[Hashable], bool]] = None,
+              rank: str = "dice") -> List[Tuple[Hashable, str, float, float]]:
+        """
+        Top-k candidates for `name` as (key, matched_name, dice, overlap), best first
+        (k=None returns every candidate sharing a trigram). min_score applies to the
+        ranking metric. `accept` filters keys (e.g. country constraint) before ranking.
+        """
+        norm = name if normalized else normalize_for_search(name)
+        query_grams = trigrams(norm)
+        if not query_grams:
+            return []
+
+        shared: Dict[Tuple[Hashable, str], int] = defaultdict(int)
+        for gram in query_grams:
+            for entry in self._postings.get(gram, ()):
+                shared[entry] += 1
+
+        best: Dict[Hashable, tuple] = {}  # key -> ((primary, secondary), row)
+        for entry, common in shared.items():
+            key, cand_name = entry
+            if accept is not None and not accept(key):
+                continue
+            cand_grams = self._grams[entry]
+            dice = 2.0 * common / (len(query_grams) + len(cand_grams))
+            overlap = common / min(len(query_grams), len(cand_grams))
+            score = (overlap, dice) if rank == "overlap" else (dice, overlap)
+            if score[0] < min_score:
+                continue
+            current = best.get(key)
+            if current is None or score > current[0]:
+                best[key] = (score, (key, cand_name, dice, overlap))
+
+        ranked = [row for _, row in sorted(best.values(), key=lambda item: item[0], reverse=True)]
+        return ranked if k is None else ranked[:k]
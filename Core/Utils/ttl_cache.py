@@ -0,0 +1,148 @@
+# ttl_cache.py: Bounded TTL caches for long-running per-process state.
+# Part of LeoBook Core — Utilities
+#
+# Classes: TTLCache
+# Functions: get_cache(), reset_cycle_caches(), reset_all_caches(), cache_stats()
+
+"""
+TTL Cache Module
+Replaces ad hoc module-level dicts/sets that are never cleared. Every cache is
+bounded (LRU eviction), expires entries after a TTL, counts hits and misses,
+and registers itself so Leo.py can reset all per-cycle caches in one call.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+_registry: Dict[str, "TTLCache"] = {}
+_registry_lock = threading.Lock()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry TTL and hit/miss counters.
+    Supports set-like use (`key in cache`, `cache.add(key)`) for "already done" markers
+    and dict-like use (`get`/`set`) for cached values.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl_seconds: Optional[float] = None,
+                 reset_per_cycle: bool = True):
+        self.name = name
+        self.max_size = max(1, int(max_size))
+        self.ttl_seconds = ttl_seconds
+        self.reset_per_cycle = reset_per_cycle
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        with _registry_lock:
+            _registry[name] = self
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Returns the live value for key or _MISSING. Caller holds the lock."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            self.expirations += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any = True, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key: Hashable):
+        """Set-style marker insert."""
+        self.set(key, True)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def reset(self):
+        """Drops all entries (counters are kept for lifetime stats)."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def __repr__(self) -> str:
+        return f"TTLCache({self.name!r}, size={len(self._data)}/{self.max_size}, ttl={self.ttl_seconds})"
+
+
+def get_cache(name: str) -> Optional[TTLCache]:
+    """Looks up a registered cache by name."""
+    return _registry.get(name)
+
+
+def reset_cycle_caches() -> int:
+    """Clears every cache registered with reset_per_cycle=True. Returns the number of entries dropped."""
+    dropped = 0
+    with _registry_lock:
+        caches = list(_registry.values())
+    for cache in caches:
+        if cache.reset_per_cycle:
+            dropped += len(cache)
+            cache.reset()
+    return dropped
+
+
+def reset_all_caches() -> int:
+    """Clears every registered cache, long-lived ones included (memory pressure). Returns entries dropped."""
+    dropped = 0
+    with _registry_lock:
+        caches = list(_registry.values())
+    for cache in caches:
+        dropped += len(cache)
+        cache.reset()
+    return dropped
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of hit/miss/size counters for every registered cache."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
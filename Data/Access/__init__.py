@@ -3,15 +3,28 @@ DB Helpers Package
 Database operations, outcome review, and data management utilities.
 """
 
-from .outcome_reviewer import (
-    get_predictions_to_review,
-    save_single_outcome,
-    process_review_task_offline,
-    run_review_process,
-    run_accuracy_generation,
-    start_review
-)
-from .db_helpers import evaluate_market_outcome
+import importlib
+
+# Re-exports resolve on first access (PEP 562): importing db_helpers alone
+# must not load outcome_reviewer (pandas, Playwright).
+_LAZY_EXPORTS = {
+    "get_predictions_to_review": ".outcome_reviewer",
+    "save_single_outcome": ".outcome_reviewer",
+    "process_review_task_offline": ".outcome_reviewer",
+    "run_review_process": ".outcome_reviewer",
+    "run_accuracy_generation": ".outcome_reviewer",
+    "start_review": ".outcome_reviewer",
+    "evaluate_market_outcome": ".db_helpers",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
 
 __version__ = "3.0.0"
 __all__ = [
@@ -17,6 +17,10 @@ from datetime import datetime as dt
 from typing import Dict, Any, List, Optional
 import uuid
 import asyncio
+import time
+
+from Core.System.metrics import CSV_BYTES, CSV_SECONDS
+from Core.System.tracing import traced
 
 # Global lock for synchronizing CSV access across async tasks
 CSV_LOCK = asyncio.Lock()
@@ -31,22 +35,33 @@ def _read_csv(filepath: str) -> List[Dict[str, str]]:
     """Safely reads a CSV file into a list of dictionaries."""
     if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
         return []
+    start = time.perf_counter()
     try:
         with open(filepath, 'r', newline='', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
+            rows = list(csv.DictReader(f))
+        _record_csv_io(filepath, "read", os.path.getsize(filepath), start)
+        return rows
     except Exception as e:
         print(f"    [File Error] Could not read {filepath}: {e}")
         return []
 
+def _record_csv_io(filepath: str, op: str, nbytes: int, start: float):
+    name = os.path.basename(filepath)
+    CSV_BYTES.inc(nbytes, file=name, op=op)
+    CSV_SECONDS.observe(time.perf_counter() - start, file=name, op=op)
+
 def _append_to_csv(filepath: str, data_row: Dict, fieldnames: List[str]):
     """Safely appends a single dictionary row to a CSV file."""
     file_exists = os.path.exists(filepath) and os.path.getsize(filepath) > 0
+    start = time.perf_counter()
     try:
         with open(filepath, 'a', newline='', encoding='utf-8') as f:
+            offset = f.tell()
             writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
             if not file_exists:
                 writer.writeheader()
             writer.writerow(data_row)
+            _record_csv_io(filepath, "append", f.tell() - offset, start)
     except Exception as e:
         print(f"    [File Error] Failed to write to {filepath}: {e}")
 
@@ -54,14 +69,17 @@ append_to_csv = _append_to_csv  # Alias for external use
 
 def _write_csv(filepath: str, data: List[Dict], fieldnames: List[str]):
     """Safely writes a list of dictionaries to a CSV file, overwriting it."""
+    start = time.perf_counter()
     try:
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
             writer.writeheader()
             writer.writerows(data)
+            _record_csv_io(filepath, "write", f.tell(), start)
     except Exception as e:
         print(f"    [File Error] Failed to write to {filepath}: {e}")
 
+@traced("csv.upsert_entry", attrs=lambda filepath, *a, **k: {"file": os.path.basename(filepath)})
 def upsert_entry(filepath: str, data_row: Dict, fieldnames: List[str], unique_key: str):
     """Performs a robust UPSERT (Update or Insert) operation on a CSV file."""
     unique_id = data_row.get(unique_key)
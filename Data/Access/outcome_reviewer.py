@@ -46,6 +46,8 @@ from .sync_manager import SyncManager
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Intelligence.selector_db import log_selector_failure
 from Core.Utils.constants import NAVIGATION_TIMEOUT
+from Core.System.metrics import track_navigations
+from Core.Browser.page_archive import attach_page_archive
 
 
 def _load_schedule_db() -> Dict[str, Dict]:
@@ -514,6 +516,8 @@ async def run_review_process(p: Optional[Playwright] = None):
             print(f"   [Info] Triggering Browser Fallback for {len(needs_browser)} unresolved reviews...")
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context()
+            track_navigations(context, "flashscore")
+            await attach_page_archive(context, "flashscore")
             page = await context.new_page()
             
             for m in needs_browser:
@@ -21,6 +21,8 @@ from supabase import create_client, Client
 from Data.Access.supabase_client import get_supabase_client
 from Data.Access.db_helpers import DB_DIR, files_and_headers
 from Core.Intelligence.aigo_suite import AIGOSuite
+from Core.System.metrics import SYNC_ROWS
+from Core.System.tracing import traced
 from Data.Supabase.push_schema import push_schema
 
 logger = logging.getLogger(__name__)
@@ -73,6 +75,7 @@ class SyncManager:
         for table_key, config in TABLE_CONFIG.items():
             await self._sync_table(table_key, config)
 
+    @traced("sync.table", attrs=lambda self, table_key, *a, **k: {"table": table_key})
     async def _sync_table(self, table_key: str, config: Dict):
         """Sync a single table using pandas for delta detection."""
         table_name = config['table']
@@ -212,6 +215,7 @@ class SyncManager:
             pulled_data.extend(res.data)
             pbar.update(len(batch_ids))
         pbar.close()
+        SYNC_ROWS.inc(len(pulled_data), table=table_name, direction="pull")
 
         if not pulled_data:
             return
@@ -335,6 +339,7 @@ class SyncManager:
                 batch = deduped[i:i + api_batch_size]
                 self.supabase.table(table_name).upsert(batch, on_conflict=conflict_key).execute()
                 pbar.update(len(batch))
+                SYNC_ROWS.inc(len(batch), table=table_name, direction="push")
                 
             pbar.close()
             logger.info(f"    [SYNC] Upserted {len(deduped)} rows to {table_name}.")
@@ -3,13 +3,15 @@
 #
 # Functions: run_prologue_p1(), run_prologue_p2(), run_prologue_p3(), run_chapter_1_p1(), run_chapter_1_p2(), run_chapter_1_p3(), run_chapter_2_p1(), run_chapter_2_p2() (+5 more)
 
+import time
+_STARTUP_T0 = time.perf_counter()
+
 import asyncio
 import nest_asyncio
 import os
 import sys
 from datetime import datetime as dt
 from dotenv import load_dotenv
-from playwright.async_api import async_playwright
 
 # Apply nest_asyncio for nested loops
 nest_asyncio.apply()
@@ -45,32 +47,30 @@ def validate_config():
     
     print("[CONFIG] All required environment variables validated.")
 
-# Validate configuration on startup
-validate_config()
 
-# --- Modular Imports (all logic is external) ---
+# --- Light imports only: pandas, supabase, Playwright and the intelligence
+# stack are imported by the page functions that need them, so utility
+# commands start without loading every subsystem. ---
 from Core.System.lifecycle import (
     log_state, log_audit_state, setup_terminal_logging, parse_args, state
 )
 from Core.Intelligence.aigo_suite import AIGOSuite
-from Core.System.withdrawal_checker import (
-    check_triggers, propose_withdrawal, calculate_proposed_amount, get_latest_win,
-    check_withdrawal_approval, execute_withdrawal
-)
+from Core.Utils.ttl_cache import reset_cycle_caches
+from Core.System.checkpoint import CycleCheckpoint, set_active_checkpoint
 from Data.Access.db_helpers import init_csvs, log_audit_event
-from Data.Access.sync_manager import SyncManager, run_full_sync
-from Data.Access.outcome_reviewer import run_review_process, run_accuracy_generation
-from Data.Access.prediction_accuracy import print_accuracy_report
-from Scripts.enrich_all_schedules import enrich_all_schedules
-from Modules.Flashscore.manager import run_flashscore_analysis, run_flashscore_offline_repredict, run_flashscore_schedule_only
-from Modules.Flashscore.fs_live_streamer import live_score_streamer
-from Modules.FootballCom.fb_manager import run_odds_harvesting, run_automated_booking
-from Core.System.monitoring import run_chapter_3_oversight
-from Scripts.recommend_bets import get_recommendations
 
 # Configuration
 CYCLE_WAIT_HOURS = int(os.getenv('LEO_CYCLE_WAIT_HOURS', 6))
 LOCK_FILE = "leo.lock"
+_HEAVY_MODULES = ("pandas", "numpy", "sklearn", "playwright", "supabase", "google.genai", "httpx")
+
+
+def startup_report(mode: str):
+    """Prints time-to-dispatch and which heavy subsystems were loaded to get there."""
+    elapsed = time.perf_counter() - _STARTUP_T0
+    heavy = [m for m in _HEAVY_MODULES if m in sys.modules]
+    print(f"[STARTUP] {mode} ready in {elapsed:.2f}s "
+          f"({len(sys.modules)} modules; heavy: {', '.join(heavy) or 'none'})")
 
 
 # ============================================================
@@ -86,10 +86,13 @@ async def run_prologue_p1(p):
         print("  PROLOGUE PAGE 1: Cloud Handshake & Prediction Review")
         print("=" * 60)
 
+        from Data.Access.sync_manager import SyncManager
+        from Data.Access.outcome_reviewer import run_review_process
+        from Data.Access.prediction_accuracy import print_accuracy_report
+
         sync_mgr = SyncManager()
         await sync_mgr.sync_on_startup()
 
-        from Data.Access.outcome_reviewer import run_review_process
         await run_review_process(p)
 
         print_accuracy_report()
@@ -112,6 +115,8 @@ async def run_prologue_p2():
         print("\n" + "=" * 60)
         print("  PROLOGUE PAGE 2: Accuracy & Final Prologue Sync")
         print("=" * 60)
+        from Data.Access.outcome_reviewer import run_accuracy_generation
+        from Data.Access.sync_manager import run_full_sync
         await run_accuracy_generation()
         await run_full_sync(session_name="Prologue Final")
         log_audit_event("PROLOGUE_P2", "Accuracy generated and Prologue sync completed.", status="success")
@@ -128,6 +133,8 @@ async def run_chapter_1_p1(p):
         print("\n" + "=" * 60)
         print("  CHAPTER 1 PAGE 1: Extraction & Prediction")
         print("=" * 60)
+        from Modules.Flashscore.manager import run_flashscore_analysis
+        from Data.Access.sync_manager import run_full_sync
         await run_flashscore_analysis(p)
         await run_full_sync(session_name="Ch1 P1")
         log_audit_event("CH1_P1", "Flashscore extraction and analysis completed.", status="success")
@@ -144,6 +151,8 @@ async def run_chapter_1_p2(p):
         print("\n" + "=" * 60)
         print("  CHAPTER 1 PAGE 2: Odds Harvesting & URL Resolution")
         print("=" * 60)
+        from Modules.FootballCom.fb_manager import run_odds_harvesting
+        from Data.Access.sync_manager import run_full_sync
         await run_odds_harvesting(p)
         await run_full_sync(session_name="Ch1 P2")
         log_audit_event("CH1_P2", "Odds harvesting and URL resolution completed.", status="success")
@@ -163,6 +172,8 @@ async def run_chapter_1_p3():
         print("\n" + "=" * 60)
         print("  CHAPTER 1 PAGE 3: Final Sync & Recommendations")
         print("=" * 60)
+        from Data.Access.sync_manager import run_full_sync
+        from Scripts.recommend_bets import get_recommendations
         sync_ok = await run_full_sync(session_name="Chapter 1 Final")
         if not sync_ok:
             print("  [AIGO] Sync parity issues detected. Logged for review.")
@@ -183,6 +194,8 @@ async def run_chapter_2_p1(p):
         print("\n" + "=" * 60)
         print("  CHAPTER 2 PAGE 1: Automated Booking")
         print("=" * 60)
+        from Modules.FootballCom.fb_manager import run_automated_booking
+        from Data.Access.sync_manager import run_full_sync
         await run_automated_booking(p)
         await run_full_sync(session_name="Ch2 P1 Booking")
         log_audit_event("CH2_P1", "Automated booking phase completed.", status="success")
@@ -199,6 +212,11 @@ async def run_chapter_2_p2(p):
         print("\n" + "=" * 60)
         print("  CHAPTER 2 PAGE 2: Funds & Withdrawal Check")
         print("=" * 60)
+        from Core.System.withdrawal_checker import (
+            check_triggers, propose_withdrawal, calculate_proposed_amount, get_latest_win,
+            check_withdrawal_approval, execute_withdrawal
+        )
+        from Data.Access.sync_manager import run_full_sync
         async with await p.chromium.launch(headless=True) as check_browser:
             from Modules.FootballCom.navigator import extract_balance
             check_page = await check_browser.new_page()
@@ -227,6 +245,8 @@ async def run_chapter_3():
         print("\n" + "=" * 60)
         print("  CHAPTER 3: Chief Engineer Monitoring & Oversight")
         print("=" * 60)
+        from Core.System.monitoring import run_chapter_3_oversight
+        from Data.Access.sync_manager import run_full_sync
 
         await run_chapter_3_oversight()
 
@@ -243,6 +263,7 @@ async def run_chapter_3():
                     valid_keys = RuleConfig.__annotations__.keys()
                     filtered = {k: v for k, v in config_data.items() if k in valid_keys}
                     config = RuleConfig(**filtered)
+                    from Modules.Flashscore.manager import run_flashscore_offline_repredict
                     await run_flashscore_offline_repredict(playwright=None, custom_config=config)
                     print("  [Backtest] Complete.")
                 os.remove(TRIGGER_FILE)
@@ -267,15 +288,18 @@ async def run_utility(args):
 
     if args.sync:
         print("\n  --- LEO: Force Full Cloud Sync ---")
+        from Data.Access.sync_manager import run_full_sync
         await run_full_sync(session_name="Manual Sync")
         print("  [SUCCESS] Sync complete.")
 
     elif args.recommend:
         print("\n  --- LEO: Generate Recommendations ---")
+        from Scripts.recommend_bets import get_recommendations
         await get_recommendations(save_to_file=True)
 
     elif args.accuracy:
         print("\n  --- LEO: Accuracy Report ---")
+        from Data.Access.prediction_accuracy import print_accuracy_report
         print_accuracy_report()
 
     elif args.search_dict:
@@ -285,6 +309,8 @@ async def run_utility(args):
 
     elif args.review:
         print("\n  --- LEO: Outcome Review ---")
+        from playwright.async_api import async_playwright
+        from Data.Access.prediction_accuracy import print_accuracy_report
         async with async_playwright() as p:
             from Data.Access.outcome_reviewer import run_review_process
             await run_review_process(p)
@@ -301,12 +327,15 @@ async def run_utility(args):
             valid_keys = RuleConfig.__annotations__.keys()
             filtered = {k: v for k, v in config_data.items() if k in valid_keys}
             config = RuleConfig(**filtered)
+            from Modules.Flashscore.manager import run_flashscore_offline_repredict
             await run_flashscore_offline_repredict(playwright=None, custom_config=config)
         else:
             print(f"  [ERROR] Config file not found: {CONFIG_FILE}")
 
     elif args.streamer:
         print("\n  --- LEO: Live Score Streamer ---")
+        from playwright.async_api import async_playwright
+        from Modules.Flashscore.fs_live_streamer import live_score_streamer
         async with async_playwright() as p:
             await live_score_streamer(p)
 
@@ -315,11 +344,15 @@ async def run_utility(args):
         extract_all = getattr(args, 'all', False)
         mode = "Full Deep" if extract_all else ("Refresh" if refresh else "Extract")
         print(f"\n  --- LEO: Schedule {mode} ---")
+        from playwright.async_api import async_playwright
+        from Modules.Flashscore.manager import run_flashscore_schedule_only
         async with async_playwright() as p:
             await run_flashscore_schedule_only(p, refresh=refresh, extract_all=extract_all)
 
     elif args.enrich:
         print("\n  --- LEO: Manual Metadata Enrichment ---")
+        from Scripts.enrich_all_schedules import enrich_all_schedules
+        from Data.Access.sync_manager import run_full_sync
         await enrich_all_schedules(extract_standings=True, league_page=True)
         await run_full_sync(session_name="Manual Enrich")
 
@@ -327,6 +360,7 @@ async def run_utility(args):
         print("\n  --- LEO: Parallel Enrichment & Search Dict ---")
         from Scripts.enrich_leagues import enrich_leagues
         from Scripts.build_search_dict import main as build_search
+        from Data.Access.sync_manager import run_full_sync
         await asyncio.gather(
             enrich_leagues(),
             build_search(),
@@ -379,6 +413,7 @@ async def dispatch(args):
     """Route CLI arguments to the correct execution path."""
     init_csvs()
 
+    from playwright.async_api import async_playwright
     async with async_playwright() as p:
         # --- Prologue ---
         if args.prologue:
@@ -424,13 +459,87 @@ async def dispatch(args):
     print("[ERROR] Unknown dispatch target.")
 
 
+# ============================================================
+# CYCLE GRAPH — What each page consumes and produces
+# ============================================================
+
+MAX_BROWSER_STEPS = int(os.getenv("LEO_MAX_BROWSER_STEPS", "2"))
+
+
+def _skip_chapter_2():
+    print("\n" + "=" * 60)
+    print("  CHAPTER 2: SKIPPED — Football.com session unhealthy")
+    print("=" * 60)
+    log_audit_event("CH2_SKIPPED", "Skipped: Football.com session failed.", status="skipped")
+
+
+def build_cycle_scheduler(p, checkpoint=None, plan=None):
+    """
+    One cycle as a DAG. Edges come from data, not page numbers: Prologue P2
+    (accuracy) only needs reviewed outcomes, so it overlaps the whole Chapter 1→2
+    chain; Chapter 2 is gated on a healthy Football.com session from Ch1 P2.
+    Browser-bound pages share MAX_BROWSER_STEPS slots and the Football.com
+    session is used by one page at a time. With a checkpoint, pages finished
+    before a restart are skipped. With a CyclePlan, pages without pending work
+    (nothing to review, nothing to book) are skipped.
+    """
+    from Core.System.scheduler import Step, StepScheduler
+
+    planned = lambda name: plan is None or plan.includes(name)
+
+    def gate(name, extra=None):
+        if plan is None:
+            return extra
+        return lambda results: planned(name) and (extra is None or extra(results))
+
+    def skip_chapter_2():
+        if planned("ch2_p1"):
+            _skip_chapter_2()
+
+    fb_healthy = lambda results: results.get("ch1_p2") is True
+    scheduler = StepScheduler(limits={"browser": MAX_BROWSER_STEPS, "football_com": 1}, checkpoint=checkpoint)
+    scheduler.add(Step("prologue_p1", lambda: run_prologue_p1(p),
+                       outputs={"cloud_state", "reviewed_outcomes"}, resources={"browser": 1},
+                       when=gate("prologue_p1")))
+    scheduler.add(Step("prologue_p2", run_prologue_p2,
+                       inputs={"reviewed_outcomes"}, outputs={"accuracy"}, when=gate("prologue_p2")))
+    scheduler.add(Step("ch1_p1", lambda: run_chapter_1_p1(p),
+                       inputs={"cloud_state"}, outputs={"predictions"}, resources={"browser": 1},
+                       when=gate("ch1_p1")))
+    scheduler.add(Step("ch1_p2", lambda: run_chapter_1_p2(p),
+                       inputs={"predictions"}, outputs={"odds", "fb_session"},
+                       resources={"browser": 1, "football_com": 1}, when=gate("ch1_p2")))
+    scheduler.add(Step("ch1_p3", run_chapter_1_p3,
+                       inputs={"odds"}, outputs={"recommendations"}, when=gate("ch1_p3")))
+    scheduler.add(Step("ch2_p1", lambda: run_chapter_2_p1(p),
+                       inputs={"recommendations", "fb_session"}, outputs={"bookings"},
+                       resources={"browser": 1, "football_com": 1},
+                       when=gate("ch2_p1", fb_healthy), on_skip=skip_chapter_2))
+    scheduler.add(Step("ch2_p2", lambda: run_chapter_2_p2(p),
+                       inputs={"bookings"}, outputs={"balance"},
+                       resources={"browser": 1, "football_com": 1}, when=gate("ch2_p2", fb_healthy)))
+    scheduler.add(Step("ch3", run_chapter_3,
+                       inputs={"accuracy", "recommendations", "balance"}, outputs={"oversight"},
+                       when=gate("ch3")))
+    return scheduler
+
+
 # ============================================================
 # MAIN — Full cycle loop (default mode)
 # ============================================================
 
-@AIGOSuite.aigo_retry(max_retries=2, delay=60.0, use_aigo=False)
+async def _sleep_until_next_wake(timer):
+    """Sleeps until the next calendar event (review, booking window) or the periodic full refresh."""
+    from Core.System.cycle_timer import lagos_now
+    wake_at, reason = timer.next_wake()
+    seconds = max(0.0, (wake_at - lagos_now()).total_seconds())
+    print(f"   [Timer] Next wake {wake_at.strftime('%d.%m %H:%M')} (Lagos) for {reason} — sleeping {seconds / 60:.0f}m...")
+    await asyncio.sleep(seconds)
+
+
+@AIGOSuite.aigo_retry(max_retries=2, delay=60.0, use_aigo=False, trace=False)
 async def main():
-    """Full cycle: Prologue → Ch1 → Ch2 → Ch3, repeating on CYCLE_WAIT_HOURS."""
+    """Full cycle: Prologue → Ch1 → Ch2 → Ch3, woken by the fixture calendar (at most CYCLE_WAIT_HOURS apart)."""
     # Singleton Check
     if os.path.exists(LOCK_FILE):
         try:
@@ -447,6 +556,13 @@ async def main():
 
     try:
         init_csvs()
+        from Core.System.metrics import start_metrics_server, CYCLE_SECONDS
+        from Core.System.tracing import span
+        from Core.System.memory import start_memory_profiling, check_memory
+        start_metrics_server()
+        start_memory_profiling()
+        from playwright.async_api import async_playwright
+        from Modules.Flashscore.fs_live_streamer import live_score_streamer
 
         async with async_playwright() as p:
             # Spawn live score streamer with its OWN Playwright instance and isolated data dir
@@ -463,49 +579,47 @@ async def main():
                         shutil.rmtree(temp_dir, ignore_errors=True)
 
             streamer_task = asyncio.create_task(_isolated_streamer())
+            from Core.System.cycle_timer import CycleTimer
+            timer = CycleTimer(full_interval_hours=CYCLE_WAIT_HOURS)
 
             while True:
                 try:
+                    plan = timer.plan()
+                    if not plan.has_work:
+                        await _sleep_until_next_wake(timer)
+                        continue
+
                     state["cycle_count"] += 1
                     state["cycle_start_time"] = dt.now()
                     cycle_num = state["cycle_count"]
                     log_state(chapter="Cycle Start", action=f"Starting Cycle #{cycle_num}")
-                    log_audit_event("CYCLE_START", f"Cycle #{cycle_num} initiated.")
-
-                    # ── PROLOGUE P1: Sequential (dependency for Chapter 1) ──
-                    await run_prologue_p1(p)
-
-                    # ── CONCURRENT: Prologue P2 || Chapter 1→2 ──
-                    print("\n" + "=" * 60)
-                    print("  ⚡ CONCURRENT EXECUTION: Prologue P2 || Chapter 1→2")
-                    print("=" * 60)
-
-                    async def _chapter_1_2():
-                        await run_chapter_1_p1(p)
-                        fb_healthy = await run_chapter_1_p2(p)
-                        await run_chapter_1_p3()
-                        if fb_healthy:
-                            await run_chapter_2_p1(p)
-                            await run_chapter_2_p2(p)
-                        else:
-                            print("\n" + "=" * 60)
-                            print("  CHAPTER 2: SKIPPED — Football.com session unhealthy")
-                            print("=" * 60)
-                            log_audit_event("CH2_SKIPPED", "Skipped: Football.com session failed.", status="skipped")
-
-                    await asyncio.gather(
-                        run_prologue_p2(),
-                        _chapter_1_2(),
-                        return_exceptions=True
-                    )
-
-                    # ── CHAPTER 3: Monitoring ──
-                    await run_chapter_3()
+                    log_audit_event("CYCLE_START", f"Cycle #{cycle_num} initiated ({plan.describe()}).")
+                    print(f"   [Timer] Cycle #{cycle_num}: {plan.describe()}")
+
+                    # Per-cycle caches (league enrichment, standings) start fresh each cycle
+                    dropped = reset_cycle_caches()
+                    if dropped:
+                        print(f"   [Cache] Cleared {dropped} per-cycle cache entries.")
+
+                    # Resume an interrupted cycle (finished pages/dates/fixtures are skipped)
+                    # — only if it planned every step this cycle's plan needs
+                    checkpoint = CycleCheckpoint.load_or_start(plan_steps=plan.steps())
+                    set_active_checkpoint(checkpoint)
+
+                    # ── Prologue → Ch1 → Ch2 → Ch3 as a dependency graph ──
+                    scheduler = build_cycle_scheduler(p, checkpoint, plan)
+                    with CYCLE_SECONDS.time(), span("cycle", cycle=cycle_num, plan=plan.describe()):
+                        await scheduler.run()
+                    print(f"   [Scheduler] Cycle #{cycle_num}: {scheduler.summary()}")
+                    check_memory("cycle", verbose=True, cycle=cycle_num)
+                    checkpoint.complete()
+                    set_active_checkpoint(None)
+                    timer.record(plan)
 
                     # ── CYCLE COMPLETE ──
                     log_audit_event("CYCLE_COMPLETE", f"Cycle #{cycle_num} finished.")
-                    print(f"\n   [System] Cycle #{cycle_num} finished at {dt.now().strftime('%H:%M:%S')}. Sleeping {CYCLE_WAIT_HOURS}h...")
-                    await asyncio.sleep(CYCLE_WAIT_HOURS * 3600)
+                    print(f"\n   [System] Cycle #{cycle_num} finished at {dt.now().strftime('%H:%M:%S')}.")
+                    await _sleep_until_next_wake(timer)
 
                 except Exception as e:
                     state["error_log"].append(f"{dt.now()}: {e}")
@@ -514,6 +628,8 @@ async def main():
                     await asyncio.sleep(60)
     finally:
         if os.path.exists(LOCK_FILE): os.remove(LOCK_FILE)
+        from Core.Intelligence.api_manager import close_http_clients
+        await close_http_clients()
 
 
 @AIGOSuite.aigo_retry(max_retries=2, delay=10.0)
@@ -521,6 +637,10 @@ async def main_offline_repredict():
     """Run offline reprediction."""
     print("    --- LEO: Offline Reprediction Mode ---      ")
     init_csvs()
+    from playwright.async_api import async_playwright
+    from Data.Access.outcome_reviewer import run_review_process
+    from Data.Access.prediction_accuracy import print_accuracy_report
+    from Modules.Flashscore.manager import run_flashscore_offline_repredict
     async with async_playwright() as p:
         try:
             await run_review_process(p)
@@ -535,6 +655,7 @@ async def main_offline_repredict():
 # ============================================================
 
 if __name__ == "__main__":
+    validate_config()
     args = parse_args()
     log_file, original_stdout, original_stderr = setup_terminal_logging(args)
 
@@ -544,6 +665,8 @@ if __name__ == "__main__":
                       args.rule_engine, args.streamer, args.schedule,
                       args.enrich, args.enrich_leagues])
     is_granular = args.prologue or args.chapter is not None
+    startup_report("offline repredict" if args.offline_repredict else
+                   "utility" if is_utility else "dispatch" if is_granular else "full cycle")
 
     try:
         if args.offline_repredict:
@@ -557,5 +680,7 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("\n   --- LEO: Shutting down. ---")
     finally:
+        from Core.Intelligence.selector_db import flush_knowledge
+        flush_knowledge()
         sys.stdout, sys.stderr = original_stdout, original_stderr
         log_file.close()
@@ -4,10 +4,11 @@
 # Single source of truth for extracting matches from the Flashscore ALL tab.
 # Used by: fs_live_streamer.py, fs_schedule.py
 
-import asyncio
 from playwright.async_api import Page
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Intelligence.aigo_suite import AIGOSuite
+from Core.Browser.wait_helpers import wait_for_dom_quiet, wait_for_selector_count_stable
+from Core.Browser.page_archive import record_scenario
 
 
 @AIGOSuite.aigo_retry(max_retries=2, delay=2.0)
@@ -41,14 +42,14 @@ async def expand_all_leagues(page: Page) -> int:
                 break  # All leagues expanded
 
             # Wait for DOM to settle after clicks
-            await asyncio.sleep(1.5)
+            await wait_for_dom_quiet(page, quiet_ms=400, timeout=3000)
 
         except Exception as e:
             print(f"    [Extractor] Expansion round {round_num+1} warning: {e}")
             break
 
     if total_expanded:
-        await asyncio.sleep(1)
+        await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
     print(f"    [Extractor] Total expanded: {total_expanded} leagues across {round_num+1} rounds.")
     return total_expanded
 
@@ -60,8 +61,10 @@ async def extract_all_matches(page: Page, label: str = "Extractor") -> list:
     Uses SelectorManager selectors with container fallback for mobile.
     Returns list of match dicts.
     """
+    await record_scenario("all_matches", page, label=label)
     selectors = SelectorManager.get_all_selectors_for_context("fs_home_page")
-    await asyncio.sleep(3)
+    # Wait until the match list stops growing instead of a fixed 3s
+    await wait_for_selector_count_stable(page, selectors.get("match_rows") or ".event__match", stable_ms=600, timeout=5000)
 
     result = await page.evaluate(r"""(sel) => {
         const matches = [];
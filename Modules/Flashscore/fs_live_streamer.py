@@ -1,11 +1,13 @@
 # fs_live_streamer.py: fs_live_streamer.py: Continuous live score streaming from Flashscore ALL tab.
 # Part of LeoBook Modules — Flashscore
 #
-# Functions: _read_csv(), _write_csv(), _compute_outcome_correct(), _is_streamer_alive(), _touch_heartbeat(), _propagate_status_updates(), _purge_stale_live_scores(), _extract_all_matches() (+2 more)
+# Functions: _read_csv(), _write_csv(), _compute_outcome_correct(), _is_streamer_alive(), _touch_heartbeat(), _sleep_with_heartbeat(), _parse_kickoff(), _load_fixture_calendar(), _plan_next_poll(), _propagate_status_updates(), _purge_stale_live_scores() (+3 more)
 
 """
 Live Score Streamer v3
-Scrapes the Flashscore ALL tab every 15 seconds using its own browser context.
+Scrapes the Flashscore ALL tab using its own browser context. The polling interval
+is derived from the fixture calendar: it tightens during peaks, and the browser is
+paused entirely in quiet windows with no live or imminent fixtures.
 Extracts live, finished, postponed, cancelled, and FRO match statuses.
 Saves results to live_scores.csv and upserts to Supabase.
 Propagates status to schedules.csv and predictions.csv.
@@ -15,6 +17,7 @@ Purges matches no longer live from live_scores.csv and Supabase.
 import asyncio
 import csv
 import os
+import time
 from datetime import datetime as dt, timedelta
 from playwright.async_api import Playwright
 
@@ -28,12 +31,24 @@ from Core.Browser.site_helpers import fs_universal_popup_dismissal
 from Core.Utils.constants import NAVIGATION_TIMEOUT, WAIT_FOR_LOAD_STATE_TIMEOUT
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Intelligence.aigo_suite import AIGOSuite
+from Core.Utils.ttl_cache import TTLCache
+from Core.System.metrics import STREAMER_CYCLE_SECONDS, track_navigations
+from Core.Browser.page_archive import attach_page_archive
+from Core.System.memory import BrowserRecycleWatch, check_memory
 from Modules.Flashscore.fs_extractor import extract_all_matches, expand_all_leagues as ensure_content_expanded
 
-STREAM_INTERVAL = 60  # seconds
+STREAM_INTERVAL = int(os.getenv("STREAMER_INTERVAL", 60))  # seconds — baseline while matches are live
+STREAM_INTERVAL_PEAK = int(os.getenv("STREAMER_PEAK_INTERVAL", 30))  # seconds — busy windows
+STREAM_QUIET_MAX_SLEEP = int(os.getenv("STREAMER_QUIET_MAX_SLEEP", 1800))  # seconds — longest browser-less pause
+HEARTBEAT_TOUCH_SECONDS = 300  # quiet pauses re-touch the heartbeat this often (_is_streamer_alive allows 30 min)
+PEAK_ACTIVE_THRESHOLD = int(os.getenv("STREAMER_PEAK_THRESHOLD", 25))  # active fixtures that count as a peak
+KICKOFF_LOOKAHEAD_MINUTES = 15  # wake up this long before the next kickoff
+MATCH_WINDOW_MINUTES = 150  # same horizon as the 2.5hr Gold Rule
 FLASHSCORE_URL = "https://www.flashscore.com/football/"
 _STREAMER_HEARTBEAT_FILE = os.path.join(os.path.dirname(LIVE_SCORES_CSV), '.streamer_heartbeat')
 _last_push_sig = None  # Delta detection: (frozenset(live_ids), sched_count, pred_count)
+# schedules.csv kickoffs keyed by file mtime — reloaded only when the file changes
+_calendar_cache = TTLCache("streamer_calendar", max_size=2, ttl_seconds=3600, reset_per_cycle=False)
 
 # JS to expand the "Show More" dropdown found in mobile/collapsed views
 EXPAND_DROPDOWN_JS = """
@@ -92,6 +107,90 @@ def _touch_heartbeat():
         pass
 
 
+async def _sleep_with_heartbeat(seconds: float):
+    """Sleeps in HEARTBEAT_TOUCH_SECONDS chunks, touching the heartbeat so a long pause never looks dead."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    while True:
+        _touch_heartbeat()
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, HEARTBEAT_TOUCH_SECONDS))
+
+
+# ---------------------------------------------------------------------------
+# Adaptive polling: derive the next interval from the fixture calendar
+# ---------------------------------------------------------------------------
+def _parse_kickoff(date_val: str, time_val: str):
+    """Parse a schedules.csv date (DD.MM.YYYY or YYYY-MM-DD) and HH:MM time. Returns None if unparseable."""
+    date_val = (date_val or '').strip()
+    time_val = (time_val or '').strip()[:5]
+    for fmt in ("%d.%m.%Y %H:%M", "%Y-%m-%d %H:%M"):
+        try:
+            return dt.strptime(f"{date_val} {time_val}", fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _load_fixture_calendar() -> list:
+    """Sorted kickoff datetimes of all non-terminal fixtures in schedules.csv (cached by file mtime)."""
+    try:
+        mtime = os.path.getmtime(SCHEDULES_CSV)
+    except OSError:
+        return []
+    cached = _calendar_cache.get(mtime)
+    if cached is not None:
+        return cached
+
+    terminal = {'finished', 'cancelled', 'canceled', 'postponed', 'abandoned', 'fro'}
+    kickoffs = []
+    for row in _read_csv(SCHEDULES_CSV):
+        status = (row.get('match_status') or row.get('status') or '').lower()
+        if status in terminal:
+            continue
+        kickoff = _parse_kickoff(row.get('date'), row.get('match_time'))
+        if kickoff:
+            kickoffs.append(kickoff)
+    kickoffs.sort()
+
+    _calendar_cache.set(mtime, kickoffs)
+    return kickoffs
+
+
+def _plan_next_poll(observed_live: int = 0, now: dt = None) -> tuple:
+    """
+    Decide how long to wait before the next extraction and whether the browser is needed.
+    Active fixtures = max(calendar fixtures in their live window, live matches seen on the page).
+    Returns (interval_seconds, keep_browser).
+    """
+    now = now or dt.now()
+    kickoffs = _load_fixture_calendar()
+    if not kickoffs and not observed_live:
+        # No calendar to reason about (fresh install / empty schedules) — keep the baseline cadence.
+        return STREAM_INTERVAL, True
+
+    window_start = now - timedelta(minutes=MATCH_WINDOW_MINUTES)
+    window_end = now + timedelta(minutes=KICKOFF_LOOKAHEAD_MINUTES)
+    in_window = sum(1 for k in kickoffs if window_start <= k <= window_end)
+    active = max(in_window, observed_live)
+
+    if active >= PEAK_ACTIVE_THRESHOLD:
+        return STREAM_INTERVAL_PEAK, True
+    if active > 0:
+        return STREAM_INTERVAL, True
+
+    next_kickoff = next((k for k in kickoffs if k > window_end), None)
+    if next_kickoff is None:
+        return STREAM_QUIET_MAX_SLEEP, False
+
+    until_warmup = (next_kickoff - timedelta(minutes=KICKOFF_LOOKAHEAD_MINUTES) - now).total_seconds()
+    if until_warmup <= STREAM_INTERVAL:
+        return STREAM_INTERVAL, True
+    return int(min(until_warmup, STREAM_QUIET_MAX_SLEEP)), False
+
+
 def _propagate_status_updates(live_matches: list, resolved_matches: list = None):
     """
     Propagate live scores and resolved results into schedules.csv and predictions.csv.
@@ -317,19 +416,32 @@ async def live_score_streamer(playwright: Playwright, user_data_dir: str = None)
     """
     Main streaming loop v3.2 (Mobile Optimized).
     - Headless browser session with iPhone 12 emulation.
-    - 60s extraction interval.
+    - Adaptive extraction interval from the fixture calendar (see _plan_next_poll);
+      the browser is closed during quiet windows and relaunched before the next kickoff.
     - Robust dropdown + league expansion.
     - Immediate DB + CSV upserts.
-    - RECYCLING: Restarts browser every 3 cycles to prevent memory bloat/crashes.
+    - RECYCLING: Restarts browser every 3 cycles to prevent memory bloat/crashes,
+      or after the current cycle when LEO_BROWSER_MEMORY_BUDGET_MB is exceeded.
     """
-    print(f"\n   [Streamer] 🔴 Mobile Live Score Streamer v3.2 starting (Headless, 60s, isolation={'ON' if user_data_dir else 'OFF'})...")
+    global _last_push_sig
+    print(f"\n   [Streamer] 🔴 Mobile Live Score Streamer v3.2 starting (Headless, adaptive {STREAM_INTERVAL_PEAK}-{STREAM_INTERVAL}s, isolation={'ON' if user_data_dir else 'OFF'})...")
     log_audit_event("STREAMER_START", f"Mobile live score streamer v3.2 initialized (Isolation: {bool(user_data_dir)}).")
 
     RECYCLE_INTERVAL = 3
     cycle = 0
+    recycle_watch = BrowserRecycleWatch()
+    observed_live = 0
     sync = SyncManager()
 
     while True:
+        interval, keep_browser = _plan_next_poll(observed_live)
+        if not keep_browser:
+            # Quiet window: no browser, no extraction — just the 2.5hr fallback and a heartbeat.
+            _propagate_status_updates([], [])
+            print(f"   [Streamer] 💤 Quiet window — no live or imminent fixtures. Browser paused for {interval // 60}m.")
+            await _sleep_with_heartbeat(interval)
+            continue
+
         browser = None
         context = None
         try:
@@ -359,6 +471,9 @@ async def live_score_streamer(playwright: Playwright, user_data_dir: str = None)
                 )
                 page = await context.new_page()
 
+            track_navigations(context, "flashscore_live")
+            await attach_page_archive(context, "flashscore_live")
+
             # 2. Initial Setup for the Session
             print("   [Streamer] Navigating to Flashscore (Mobile view, up to 3 mins)...")
             await page.goto(FLASHSCORE_URL, timeout=NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
@@ -381,6 +496,7 @@ async def live_score_streamer(playwright: Playwright, user_data_dir: str = None)
                 session_cycle += 1
                 _touch_heartbeat()
                 now_ts = dt.now().strftime("%H:%M:%S")
+                cycle_start = time.perf_counter()
 
                 try:
                     # Extraction
@@ -392,6 +508,7 @@ async def live_score_streamer(playwright: Playwright, user_data_dir: str = None)
                     live_matches = [m for m in all_matches if m.get('status') in LIVE_STATUSES]
                     resolved_matches = [m for m in all_matches if m.get('status') in RESOLVED_STATUSES]
                     current_live_ids = {m['fixture_id'] for m in live_matches}
+                    observed_live = len(live_matches)
 
                     # Save & Sync
                     stale_ids = _purge_stale_live_scores(current_live_ids)
@@ -431,8 +548,18 @@ async def live_score_streamer(playwright: Playwright, user_data_dir: str = None)
                         _propagate_status_updates([], [])
                         print(f"   [Streamer] {now_ts} — No active/resolved matches found (Cycle {cycle}). Fallback check performed.")
 
-                    # Sleep before next cycle
-                    await asyncio.sleep(STREAM_INTERVAL)
+                    STREAMER_CYCLE_SECONDS.observe(time.perf_counter() - cycle_start)
+                    check_memory("streamer", cycle=cycle)
+                    if recycle_watch.due():
+                        print(f"   [Streamer] Memory budget exceeded after cycle {cycle} — recycling browser early.")
+                        break
+
+                    # Sleep before next cycle (or hand over to the quiet-window pause)
+                    interval, keep_browser = _plan_next_poll(observed_live)
+                    if not keep_browser:
+                        print(f"   [Streamer] Calendar quiet after cycle {cycle} — releasing browser.")
+                        break
+                    await asyncio.sleep(interval)
 
                 except Exception as e:
                     if "Target crashed" in str(e) or "Page crashed" in str(e):
@@ -442,7 +569,7 @@ async def live_score_streamer(playwright: Playwright, user_data_dir: str = None)
                         print(f"   [Streamer] ⚠ Extraction Error in cycle {cycle}: {e}")
                         await asyncio.sleep(STREAM_INTERVAL)
 
-            # End of session (either interval reached or crash)
+            # End of session (interval reached, quiet window or crash)
             print(f"   [Streamer] Recycling browser session (Sessions per interval: {RECYCLE_INTERVAL})...")
 
         except Exception as e:
@@ -3,13 +3,18 @@
 #
 # Functions: strip_league_stage(), process_match_task()
 
-import asyncio
 from playwright.async_api import Browser
 from Data.Access.db_helpers import save_prediction, save_region_league_entry, save_standings, save_team_entry
 from Core.Browser.site_helpers import fs_universal_popup_dismissal
 from Core.Browser.Extractors.h2h_extractor import extract_h2h_data, activate_h2h_tab, save_extracted_h2h_to_schedules
 from Core.Browser.Extractors.standings_extractor import extract_standings_data, activate_standings_tab
 from Core.Utils.utils import log_error_state
+from Core.Browser.wait_helpers import wait_for_dom_quiet, wait_for_selector_count_stable
+from Core.Intelligence.selector_manager import SelectorManager
+from Core.Utils.ttl_cache import TTLCache
+from Core.System.metrics import track_navigations
+from Core.Browser.page_archive import attach_page_archive
+from Core.System.tracing import traced
 import re
 import os
 
@@ -28,10 +33,13 @@ from Core.Intelligence.rule_engine import RuleEngine
 from .fs_utils import retry_extraction
 
 # Cache of league IDs already enriched in this cycle (avoid duplicate page visits)
-_enriched_leagues = set()
-# Cache of league names whose standings were already extracted this cycle
-_extracted_standings = set()
+_enriched_leagues = TTLCache("fs_enriched_leagues", max_size=2048,
+                             ttl_seconds=int(os.getenv("LEAGUE_ENRICH_CACHE_TTL", 6 * 3600)))
+# Cache of league names whose standings were already extracted this cycle (TTL keeps tables from going stale across days)
+_extracted_standings = TTLCache("fs_extracted_standings", max_size=2048,
+                                ttl_seconds=int(os.getenv("STANDINGS_CACHE_TTL", 6 * 3600)))
 
+@traced("fs.process_match", attrs=lambda match_data, *a, **k: {"fixture_id": match_data.get("fixture_id")})
 async def process_match_task(match_data: dict, browser: Browser):
     """
     Worker function to process a single match in a new page/context.
@@ -44,6 +52,8 @@ async def process_match_task(match_data: dict, browser: Browser):
         viewport={'width': 450, 'height': 900},
         timezone_id="Africa/Lagos"
     )
+    track_navigations(context, "flashscore")
+    await attach_page_archive(context, "flashscore")
     page = await context.new_page()
     fixture_id = match_data.get('fixture_id') or match_data.get('id') or 'unknown'
     match_label = f"{match_data.get('home_team', 'unknown')}_vs_{match_data.get('away_team', 'unknown')}_{fixture_id}"
@@ -53,7 +63,8 @@ async def process_match_task(match_data: dict, browser: Browser):
 
         full_match_url = f"{match_data['match_link']}"
         await page.goto(full_match_url, wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT)
-        await asyncio.sleep(2.0)
+        tabs_sel = SelectorManager.get_selector("fs_match_page", "tabs_container")
+        await wait_for_selector_count_stable(page, tabs_sel or ".detail__tabs", stable_ms=300, timeout=5000)
 
         await fs_universal_popup_dismissal(page, "fs_match_page")
         await page.wait_for_load_state("domcontentloaded", timeout=WAIT_FOR_LOAD_STATE_TIMEOUT)
@@ -164,7 +175,7 @@ async def process_match_task(match_data: dict, browser: Browser):
         if match_link:
             try:
                 await page.goto(match_link, wait_until='domcontentloaded', timeout=30000)
-                await asyncio.sleep(1.5)
+                await wait_for_dom_quiet(page, quiet_ms=400, timeout=3000)
             except Exception:
                 pass
 
@@ -221,7 +232,6 @@ async def process_match_task(match_data: dict, browser: Browser):
         await log_error_state(page, f"process_match_task_{match_label}", e)
         return False
     finally:
-        await asyncio.sleep(1.0)
         try:
             await context.close()
         except Exception:
@@ -22,6 +22,9 @@ from Core.Utils.utils import BatchProcessor
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Utils.constants import NAVIGATION_TIMEOUT, WAIT_FOR_LOAD_STATE_TIMEOUT
 from Core.Intelligence.aigo_suite import AIGOSuite
+from Core.System.checkpoint import get_active_checkpoint
+from Core.System.metrics import track_navigations
+from Core.Browser.page_archive import attach_page_archive
 
 # Modular Imports
 from .fs_schedule import extract_matches_from_page
@@ -49,6 +52,8 @@ async def run_flashscore_analysis(playwright: Playwright):
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             timezone_id="Africa/Lagos"
         )
+        track_navigations(context, "flashscore")
+        await attach_page_archive(context, "flashscore")
         page = await context.new_page()
         
         # Concurrency strictly from .env MAX_CONCURRENCY
@@ -75,6 +80,9 @@ async def run_flashscore_analysis(playwright: Playwright):
         await fs_universal_popup_dismissal(page, "fs_home_page")
 
         last_processed_info = get_last_processed_info()
+        # Cycle checkpoint (full-cycle runs only): dates finished and fixtures already
+        # attempted before a crash/restart are not re-extracted or re-processed
+        checkpoint = get_active_checkpoint()
         
         # Fix #5: If resume date is already in the future, skip forward scanning
         resume_date = last_processed_info.get('date_obj')
@@ -95,6 +103,10 @@ async def run_flashscore_analysis(playwright: Playwright):
                 if resume_date and target_date.date() < resume_date:
                     continue
 
+                if checkpoint and checkpoint.is_done("fs_analysis_dates", target_full):
+                    print(f"\n--- SKIPPING DATE: {target_full} (completed earlier this cycle) ---")
+                    continue
+
                 print(f"\n--- ANALYZING DATE: {target_full} ---")
                 await fs_universal_popup_dismissal(page, "fs_home_page")
 
@@ -129,6 +141,9 @@ async def run_flashscore_analysis(playwright: Playwright):
                             existing_ids = {row['fixture_id'] for row in reader if row.get('fixture_id')}
                     except Exception:
                         pass
+                # Fixtures attempted earlier this cycle (including ones that yielded no prediction)
+                if checkpoint:
+                    existing_ids |= checkpoint.done_keys(f"fs_analysis:{target_full}")
 
                 # --- Save to DB & Filter ---
                 valid_matches = []
@@ -211,6 +226,8 @@ async def run_flashscore_analysis(playwright: Playwright):
                         for i in range(0, len(valid_matches), analysis_chunk_size):
                             chunk = valid_matches[i:i + analysis_chunk_size]
                             chunk_results = await processor.run_batch(chunk, process_match_task, browser=browser)
+                            if checkpoint:
+                                checkpoint.mark_done(f"fs_analysis:{target_full}", [m.get('fixture_id') for m in chunk])
                             successful_in_chunk = sum(1 for r in chunk_results if r)
                             total_cycle_predictions += successful_in_chunk
                             if successful_in_chunk > 0:
@@ -225,6 +242,9 @@ async def run_flashscore_analysis(playwright: Playwright):
                 else:
                     print("    [Info] No new matches to process.")
 
+                if checkpoint:
+                    checkpoint.mark_done("fs_analysis_dates", [target_full])
+
     finally:
         if context is not None:
             await context.close()
@@ -264,6 +284,8 @@ async def run_flashscore_schedule_only(playwright: Playwright, refresh: bool = F
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             timezone_id="Africa/Lagos"
         )
+        track_navigations(context, "flashscore")
+        await attach_page_archive(context, "flashscore")
         page = await context.new_page()
 
         # Navigation
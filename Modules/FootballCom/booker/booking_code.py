@@ -8,7 +8,6 @@ Bet Placement Orchestration
 Handles adding selections to the slip and finalizing accumulators.
 """
 
-import asyncio
 from typing import List, Dict
 from pathlib import Path
 from datetime import datetime as dt
@@ -24,7 +23,8 @@ from Core.Utils.utils import log_error_state, capture_debug_snapshot
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Intelligence.popup_handler import PopupHandler
 
-from .ui import handle_page_overlays, dismiss_overlays
+from .ui import handle_page_overlays, dismiss_overlays, wait_for_condition
+from Core.Browser.wait_helpers import wait_for_dom_quiet
 from .mapping import find_market_and_outcome
 from .slip import get_bet_slip_count
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
@@ -138,7 +138,7 @@ async def harvest_booking_codes(page: Page, matched_urls: Dict[str, str], day_pr
 
         # 1. Navigation
         await page.goto(match_url, wait_until='domcontentloaded', timeout=30000)
-        await asyncio.sleep(3)
+        await wait_for_dom_quiet(page, quiet_ms=500, timeout=5000)
         await PopupHandler().fb_universal_popup_dismissal(page, "fb_match_page")
         await ensure_bet_insights_collapsed(page)
 
@@ -154,7 +154,7 @@ async def harvest_booking_codes(page: Page, matched_urls: Dict[str, str], day_pr
             book_btn_sel = await SelectorManager.get_selector_auto(page, "fb_match_page", "book_bet_button")
             if book_btn_sel and await page.locator(book_btn_sel).count() > 0:
                 await page.locator(book_btn_sel).first.click(force=True)
-                await asyncio.sleep(2)
+                await wait_for_dom_quiet(page, quiet_ms=300, timeout=3000)
 
                 booking_code = await extract_booking_details(page)
                 if booking_code and booking_code != "N/A":
@@ -190,14 +190,14 @@ async def find_and_click_outcome(page: Page, m_name: str, o_name: str) -> tuple:
         else:
             await page.locator(search_sel).first.scroll_into_view_if_needed()
             await page.locator(search_sel).first.click(force=True)
-            await asyncio.sleep(0.5)
+            await wait_for_condition(lambda: page.locator(input_sel).first.is_visible(), timeout=2000, interval=0.1)
 
         await page.locator(input_sel).first.fill(m_name)
         await page.keyboard.press("Enter")
-        await asyncio.sleep(2)
 
         # Outcome discovery - using flexible text matching
         outcome_sel = f"button:has-text('{o_name}'), div[role='button']:has-text('{o_name}'), .m-outcome-item:has-text('{o_name}')"
+        await wait_for_condition(lambda: frame.locator(outcome_sel).count(), timeout=4000, interval=0.2)
         if await frame.locator(outcome_sel).count() > 0:
              target_btn = frame.locator(outcome_sel).first
              btn_text = await target_btn.inner_text()
@@ -215,9 +215,10 @@ async def find_and_click_outcome(page: Page, m_name: str, o_name: str) -> tuple:
              count_before = await get_bet_slip_count(page)
              await target_btn.scroll_into_view_if_needed()
              await target_btn.click(force=True)
-             await asyncio.sleep(1)
-             
-             success = await get_bet_slip_count(page) > count_before
+
+             async def _slip_grew():
+                 return await get_bet_slip_count(page) > count_before
+             success = await wait_for_condition(_slip_grew, timeout=3000, interval=0.2)
              return success, odds
         else:
             print(f"    [Error] Outcome '{o_name}' not found for market '{m_name}'.")
@@ -232,36 +233,40 @@ async def finalize_accumulator(page: Page, target_date: str) -> bool:
     print(f"[Betting] Finalizing accumulator for {target_date}...")
     await dismiss_overlays(page)
     await handle_page_overlays(page)
-    await asyncio.sleep(1)
+    await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
     
     # 1. Open Slip
     drawer_sel = await SelectorManager.get_selector_auto(page, "fb_match_page", "slip_drawer_container")
     if not await page.locator(drawer_sel).first.is_visible(timeout=500):
         trigger_sel = await SelectorManager.get_selector_auto(page, "fb_match_page", "slip_trigger_button")
         await page.locator(trigger_sel).first.click(force=True)
-        await asyncio.sleep(2)
+        await wait_for_condition(lambda: page.locator(drawer_sel).first.is_visible(), timeout=4000, interval=0.2)
 
     # 2. Select Multiple
     multi_sel = await SelectorManager.get_selector_auto(page, "fb_match_page", "slip_tab_multiple")
     if multi_sel:
         await page.locator(multi_sel).first.click(force=True)
-        await asyncio.sleep(1)
+        await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
 
     # 3. Enter Stake
     stake_sel = await SelectorManager.get_selector_auto(page, "fb_match_page", "stake_input")
     await page.locator(stake_sel).first.fill("1")
     await page.keyboard.press("Enter")
-    await asyncio.sleep(1)
+    await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
 
     # 4. Place
     place_sel = await SelectorManager.get_selector_auto(page, "fb_match_page", "place_bet_button")
     await page.locator(place_sel).first.click(force=True)
-    await asyncio.sleep(2)
+    await wait_for_dom_quiet(page, quiet_ms=400, timeout=4000)
 
     # 5. Confirm
     confirm_sel = await SelectorManager.get_selector_auto(page, "fb_match_page", "confirm_bet_button")
     await page.locator(confirm_sel).first.click(force=True)
-    await asyncio.sleep(3)
+    code_sel = SelectorManager.get_selector("fb_match_page", "booking_code_text")
+    if code_sel:
+        await wait_for_condition(lambda: page.locator(code_sel).first.is_visible(), timeout=6000, interval=0.25)
+    else:
+        await wait_for_dom_quiet(page, quiet_ms=500, timeout=6000)
     
     # Validation & Finalize
     booking_code = await extract_booking_details(page)
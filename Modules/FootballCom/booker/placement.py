@@ -8,7 +8,6 @@ Bet Placement Orchestration
 Handles adding selections to the slip and finalizing accumulators with robust verification.
 """
 
-import asyncio
 from typing import List, Dict
 from playwright.async_api import Page
 from Core.Browser.site_helpers import get_main_frame
@@ -18,6 +17,7 @@ from Core.Intelligence.selector_manager import SelectorManager
 from Core.Intelligence.intelligence import fb_universal_popup_dismissal as neo_popup_dismissal
 from Core.Intelligence.aigo_suite import AIGOSuite
 from .ui import wait_for_condition
+from Core.Browser.wait_helpers import wait_for_dom_quiet
 from .mapping import find_market_and_outcome
 from .slip import get_bet_slip_count, force_clear_slip
 from Data.Access.db_helpers import log_audit_event
@@ -37,7 +37,7 @@ async def ensure_bet_insights_collapsed(page: Page):
         if arrow_sel and await page.locator(arrow_sel).count() > 0 and await page.locator(arrow_sel).is_visible():
             print("    [UI] Collapsing Bet Insights widget...")
             await page.locator(arrow_sel).first.click()
-            await asyncio.sleep(1)
+            await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
     except Exception:
         pass
 
@@ -57,7 +57,7 @@ async def expand_collapsed_market(page: Page, market_name: str):
                  # This function explicitly toggles.
                  print(f"    [Market] Clicking market header for '{market_name}' to ensure expansion...")
                  await target_header.click()
-                 await asyncio.sleep(1)
+                 await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
     except Exception as e:
         print(f"    [Market] Expansion failed: {e}")
 
@@ -90,7 +90,7 @@ async def place_bets_for_matches(page: Page, matched_urls: Dict[str, str], day_p
         try:
             # 1. Navigation
             await page.goto(match_url, wait_until='domcontentloaded', timeout=30000)
-            await asyncio.sleep(3)
+            await wait_for_dom_quiet(page, quiet_ms=500, timeout=5000)
             await neo_popup_dismissal(page, match_url)
             await ensure_bet_insights_collapsed(page)
 
@@ -107,11 +107,11 @@ async def place_bets_for_matches(page: Page, matched_urls: Dict[str, str], day_p
             if search_icon and search_input:
                 if await page.locator(search_icon).count() > 0:
                     await page.locator(search_icon).first.click()
-                    await asyncio.sleep(1)
+                    await wait_for_condition(lambda: page.locator(search_input).first.is_visible(), timeout=2000, interval=0.1)
                     
                     await page.locator(search_input).fill(m_name)
                     await page.keyboard.press("Enter")
-                    await asyncio.sleep(2)
+                    await wait_for_dom_quiet(page, quiet_ms=400, timeout=3000)
                     
                     # Handle Collapsed Market: Try to find header and click if outcomes not immediately obvious
                     # (Skipping complex check, just click header if name exists)
@@ -137,15 +137,14 @@ async def place_bets_for_matches(page: Page, matched_urls: Dict[str, str], day_p
                                   print(f"    [Selection] Found outcome row for '{o_name}'")
                                   await target_row.click()
                     
-                    # 5. Verification Loop
-                    for _ in range(3):
-                        await asyncio.sleep(1)
+                    # 5. Verification (poll the slip count instead of fixed 1s steps)
+                    async def _slip_grew():
+                        return await get_bet_slip_count(page) > initial_count
+                    if await wait_for_condition(_slip_grew, timeout=3000, interval=0.2):
                         new_count = await get_bet_slip_count(page)
-                        if new_count > initial_count:
-                            print(f"    [Success] Outcome '{o_name}' added. Slip count: {new_count}")
-                            outcome_added = True
-                            update_prediction_status(match_id, target_date, 'added_to_slip')
-                            break
+                        print(f"    [Success] Outcome '{o_name}' added. Slip count: {new_count}")
+                        outcome_added = True
+                        update_prediction_status(match_id, target_date, 'added_to_slip')
                     
                     if not outcome_added:
                         print(f"    [Error] Failed to add outcome '{o_name}'. Slip count did not increase.")
@@ -210,8 +209,12 @@ async def place_multi_bet_from_codes(page: Page, harvested_matches: List[Dict],
         if not code: continue
         url = f"https://www.football.com/ng/m?shareCode={code}"
         print(f"    [Execute] Injecting code {code}...")
+        count_before = await get_bet_slip_count(page)
         await page.goto(url, timeout=30000, wait_until='domcontentloaded')
-        await asyncio.sleep(1.5)
+
+        async def _code_loaded():
+            return await get_bet_slip_count(page) > count_before
+        await wait_for_condition(_code_loaded, timeout=4000, interval=0.25)
 
     # 3. Verify Count
     total_in_slip = await get_bet_slip_count(page)
@@ -239,12 +242,12 @@ async def place_multi_bet_from_codes(page: Page, harvested_matches: List[Dict],
     # 6. Fill Stake
     amount_input = SelectorManager.get_selector_strict("fb_match_page", "betslip_stake_input")
     await page.locator(amount_input).first.fill(str(final_stake))
-    await asyncio.sleep(1)
+    await wait_for_dom_quiet(page, quiet_ms=300, timeout=2000)
 
     # 7. Place and Confirm
     place_btn = SelectorManager.get_selector_strict("fb_match_page", "betslip_place_bet_button")
     await page.locator(place_btn).first.click(force=True)
-    await asyncio.sleep(3)
+    await wait_for_dom_quiet(page, quiet_ms=600, timeout=6000)
     
     # 8. Success Check
     from ..navigator import extract_balance
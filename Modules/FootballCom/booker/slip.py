@@ -10,11 +10,11 @@ Handles counting and clearing of the betslip with robust, self-healing logic.
 """
 
 import re
-import asyncio
 from playwright.async_api import Page
 
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Intelligence.aigo_suite import AIGOSuite
+from Core.Browser.wait_helpers import wait_for_condition
 
 async def get_bet_slip_count(page: Page) -> int:
     """Extract current number of bets in the slip using dynamic selector."""
@@ -50,6 +50,9 @@ async def force_clear_slip(page: Page):
 
     print(f"    [Slip] {count} bets detected. Clearing...")
 
+    clear_sel = SelectorManager.get_selector("fb_match_page", "betslip_remove_all")
+    confirm_sel = SelectorManager.get_selector("fb_match_page", "confirm_bet_button")
+
     # 1. Open Slip
     trigger_keys = ["slip_trigger_button", "betslip_trigger_by_attribute", "bet_slip_fab_icon_button"]
     slip_opened = False
@@ -58,20 +61,23 @@ async def force_clear_slip(page: Page):
         if sel and await page.locator(sel).count() > 0:
             await page.locator(sel).first.click()
             slip_opened = True
-            await asyncio.sleep(1.5)
+            if clear_sel:
+                await wait_for_condition(lambda: page.locator(clear_sel).count(), timeout=3000, interval=0.2)
             break
     
     # 2. Click Remove All
-    clear_sel = SelectorManager.get_selector("fb_match_page", "betslip_remove_all")
     if clear_sel and await page.locator(clear_sel).count() > 0:
         await page.locator(clear_sel).first.click()
-        await asyncio.sleep(1)
+        if confirm_sel:
+            await wait_for_condition(lambda: page.locator(confirm_sel).count(), timeout=2000, interval=0.2)
         
         # 3. Confirm Removal
-        confirm_sel = SelectorManager.get_selector("fb_match_page", "confirm_bet_button")
         if confirm_sel and await page.locator(confirm_sel).count() > 0:
             await page.locator(confirm_sel).first.click()
-            await asyncio.sleep(1)
+
+        async def _slip_empty():
+            return await get_bet_slip_count(page) == 0
+        await wait_for_condition(_slip_empty, timeout=3000, interval=0.2)
         
     # Validation
     new_count = await get_bet_slip_count(page)
@@ -12,6 +12,7 @@ import asyncio
 from playwright.async_api import Page, Locator
 from Core.Utils.utils import log_error_state
 from Core.Intelligence.selector_manager import SelectorManager
+from Core.Browser.wait_helpers import wait_for_condition  # Shared poller (re-exported for booker modules)
 
 async def handle_page_overlays(page: Page):
     """Forcefully hide or remove sticky elements that intercept clicks."""
@@ -32,21 +33,6 @@ async def handle_page_overlays(page: Page):
         except: pass
 
 
-async def wait_for_condition(condition_func, timeout: int = 10000, interval: float = 0.5) -> bool:
-    """
-    Polls a condition_func (async) until it returns True or timeout expires.
-    """
-    import time
-    start = time.time()
-    while time.time() - start < (timeout / 1000.0):
-        try:
-            if await condition_func():
-                return True
-        except:
-            pass
-        await asyncio.sleep(interval)
-    return False
-
 async def dismiss_overlays(page: Page):
     """Actively click 'Skip' or 'Close' on common UI overlays."""
     overlays = ["text='Next'", "text='Got it'", "text='Skip'", ".m-tutorial-close", ".m-close-btn"]
@@ -14,6 +14,7 @@ from typing import List, Dict
 from playwright.async_api import Page
 
 from Core.Intelligence.selector_manager import SelectorManager
+from Core.Browser.page_archive import record_scenario
 
 from Core.Utils.constants import WAIT_FOR_LOAD_STATE_TIMEOUT
 from .navigator import hide_overlays
@@ -24,6 +25,7 @@ from Core.Intelligence.aigo_suite import AIGOSuite
 async def extract_league_matches(page: Page, target_date: str) -> List[Dict]:
     """Iterates leagues and extracts matches with AIGO protection."""
     print("  [Harvest] Starting protected extraction sequence...")
+    await record_scenario("league_matches", page, target_date=target_date)
     await hide_overlays(page)
     all_matches = []
     
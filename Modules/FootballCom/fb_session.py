@@ -9,6 +9,10 @@ import subprocess
 from pathlib import Path
 from playwright.async_api import Playwright, BrowserContext
 
+from Core.System.metrics import track_navigations
+from Core.Browser.page_archive import attach_page_archive
+
+
 async def cleanup_chrome_processes():
     """Automatically terminate conflicting Chrome processes before launch."""
     try:
@@ -59,6 +63,8 @@ async def launch_browser_with_retry(playwright: Playwright, user_data_dir: Path,
             )
 
             print(f"  [Launch] Browser launched successfully on attempt {attempt + 1}!")
+            track_navigations(context, "football_com")
+            await attach_page_archive(context, "football_com")
             return context
 
         except Exception as e:
@@ -52,6 +52,7 @@ async def resolve_urls(page: Page, target_date: str) -> dict:
     # 3. Fuzzy Matching & Progressive Sync
     resolved_count = 0
     mappings = {}
+    matched_by_fixture = {m.get('fixture_id'): m for m in cached_site_matches if m.get('fixture_id')}
     
     for fs_match in day_fs_matches:
         fs_home = fs_match.get('home_team', '').lower()
@@ -59,13 +60,16 @@ async def resolve_urls(page: Page, target_date: str) -> dict:
         fixture_id = fs_match.get('fixture_id')
         
         # Skip if already matched in cache
-        already_matched = next((m for m in cached_site_matches if m.get('fixture_id') == fixture_id), None)
+        already_matched = matched_by_fixture.get(fixture_id)
         if already_matched:
             mappings[fixture_id] = already_matched.get('url')
             continue
 
         # Use GrokMatcher (LLM > Fuzzy > None)
-        best_match, highest_score = await matcher.resolve(f"{fs_home} vs {fs_away}", cached_site_matches)
+        best_match, highest_score = await matcher.resolve(
+            f"{fs_home} vs {fs_away}", cached_site_matches,
+            fs_time=fs_match.get('match_time'), fs_league=fs_match.get('region_league')
+        )
         
         if best_match:
             print(f"    [Matched] {fs_home} vs {fs_away}  ==>  {best_match['home_team']} vs {best_match['away_team']} ({highest_score:.1f}%)")
@@ -4,9 +4,17 @@
 # Classes: GrokMatcher
 
 import os
+from collections import defaultdict
 from typing import List, Dict, Optional, Tuple
 from Levenshtein import distance
 
+from Core.Utils.name_index import name_tokens as _name_tokens, kickoff_minutes as _kickoff_minutes
+
+# Candidate blocking: only site matches sharing a team-name token (and, when both
+# kickoffs are known, within KICKOFF_WINDOW_MINUTES) are scored; the LLM sees the top few.
+KICKOFF_WINDOW_MINUTES = int(os.getenv("RESOLVER_KICKOFF_WINDOW_MINUTES", "90"))
+LLM_TOP_CANDIDATES = int(os.getenv("RESOLVER_LLM_TOP_CANDIDATES", "5"))
+
 # Try importing Google GenAI (New Package)
 try:
     from google import genai
@@ -20,41 +28,97 @@ class GrokMatcher:
         self.use_llm = HAS_GEMINI
         if not self.use_llm:
             print("    [GrokMatcher] google-genai not available. Falling back to Fuzzy.")
+        # Token index over the current site-match list, rebuilt when the list changes
+        self._index_source = None
+        self._index_size = -1
+        self._token_index: Dict[str, set] = {}
 
-    async def resolve(self, fs_name: str, fb_matches: List[Dict]) -> Tuple[Optional[Dict], float]:
+    async def resolve(self, fs_name: str, fb_matches: List[Dict], fs_time: str = None,
+                      fs_league: str = None) -> Tuple[Optional[Dict], float]:
         """
         Resolves a Flashscore match name against a list of Football.com matches.
         Returns (best_match_dict, score).
+        Optional fs_time ('HH:MM') and fs_league narrow the candidate block further.
         """
+        candidates = self._block_candidates(fs_name, fb_matches, fs_time, fs_league)
+        if not candidates:
+            return None, 0
+
         # Quick exact/fuzzy pre-filter to avoid API costs limitations
-        best_fuzzy, fuzzy_score = self._fuzzy_resolve(fs_name, fb_matches)
+        ranked = self._fuzzy_rank(fs_name, candidates)
+        best_fuzzy, fuzzy_score = ranked[0]
         if fuzzy_score > 90: # Slightly lower threshold for raw Levenshtein score mapping
             return best_fuzzy, fuzzy_score
 
         if not self.use_llm:
             return best_fuzzy, fuzzy_score
 
-        # Use LLM for difficult cases
-        return await self._llm_resolve(fs_name, fb_matches, best_fuzzy, fuzzy_score)
+        # Use LLM for difficult cases — only the closest few candidates
+        top = [m for m, _ in ranked[:LLM_TOP_CANDIDATES]]
+        return await self._llm_resolve(fs_name, top, best_fuzzy, fuzzy_score)
 
-    def _fuzzy_resolve(self, fs_name: str, fb_matches: List[Dict]) -> Tuple[Optional[Dict], float]:
-        best_match = None
-        min_distance = 999
+    def _ensure_index(self, fb_matches: List[Dict]):
+        if self._index_source is fb_matches and self._index_size == len(fb_matches):
+            return
+        index = defaultdict(set)
+        for pos, m in enumerate(fb_matches):
+            for token in _name_tokens(f"{m.get('home_team', '')} {m.get('away_team', '')}"):
+                index[token].add(pos)
+        self._token_index = index
+        self._index_source = fb_matches
+        self._index_size = len(fb_matches)
+
+    def _block_candidates(self, fs_name: str, fb_matches: List[Dict], fs_time: str = None,
+                          fs_league: str = None) -> List[Dict]:
+        """
+        Blocking stage: site matches sharing a name token, narrowed by kickoff window and
+        league when those filters leave something. Falls back to the full list when the
+        name shares no token with any site match (keeps recall for transliterations).
+        """
+        if not fb_matches:
+            return []
+        self._ensure_index(fb_matches)
+        positions = set()
+        for token in _name_tokens(fs_name):
+            positions |= self._token_index.get(token, set())
+        block = [fb_matches[i] for i in sorted(positions)] if positions else list(fb_matches)
+
+        target_minutes = _kickoff_minutes(fs_time)
+        if target_minutes is not None:
+            def _in_window(m):
+                kick = _kickoff_minutes(m.get('time'))
+                if kick is None:
+                    return True
+                diff = abs(kick - target_minutes)
+                return min(diff, 1440 - diff) <= KICKOFF_WINDOW_MINUTES
+            timed = [m for m in block if _in_window(m)]
+            block = timed or block
+
+        league_tokens = _name_tokens(fs_league or "")
+        if league_tokens:
+            same_league = [m for m in block if league_tokens & _name_tokens(m.get('league', ''))]
+            block = same_league or block
+
+        return block
+
+    def _fuzzy_rank(self, fs_name: str, fb_matches: List[Dict]) -> List[Tuple[Dict, float]]:
+        """Levenshtein-ranked (match, score) pairs, best first."""
         target = fs_name.lower()
-        
-        for m in fb_matches:
-            candidate = f"{m.get('home_team')} vs {m.get('away_team')}".lower()
-            dist = distance(target, candidate)
-            if dist < min_distance:
-                min_distance = dist
-                best_match = m
-        
         # Convert distance to a pseudo-score (0-100)
         # Score = 100 - (dist / max_len * 100)
         max_len = max(len(target), 1)
-        score = max(0, 100 - (min_distance / max_len * 100))
-                
-        return best_match, score
+        scored = []
+        for m in fb_matches:
+            candidate = f"{m.get('home_team')} vs {m.get('away_team')}".lower()
+            dist = distance(target, candidate)
+            scored.append((m, max(0, 100 - (dist / max_len * 100))))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored
+
+    def _fuzzy_resolve(self, fs_name: str, fb_matches: List[Dict]) -> Tuple[Optional[Dict], float]:
+        if not fb_matches:
+            return None, 0
+        return self._fuzzy_rank(fs_name, fb_matches)[0]
 
     async def _llm_resolve(self, fs_name: str, fb_matches: List[Dict], fallback_match, fallback_score) -> Tuple[Optional[Dict], float]:
         """Call Gemini via LLMHealthManager for multi-key/model rotation."""
@@ -73,18 +137,14 @@ class GrokMatcher:
         # Use DESCENDING chain (intelligence-critical task)
         model_chain = health_manager.get_model_chain("aigo")
 
+        est_tokens = health_manager.estimate_tokens(prompt_text)
         for model_name in model_chain:
-            api_key = health_manager.get_next_gemini_key(model=model_name)
+            api_key = await health_manager.acquire_gemini_key(model_name, est_tokens)
             if not api_key:
                 continue
             try:
-                import asyncio
-                client = genai.Client(api_key=api_key)
-                response = await asyncio.to_thread(
-                    client.models.generate_content,
-                    model=model_name,
-                    contents=prompt_text
-                )
+                from Core.Intelligence.api_manager import gemini_api_call
+                response = await gemini_api_call(prompt_text, api_key=api_key, model=model_name)
                 
                 answer = response.text.strip().lower() if response.text else ""
                 
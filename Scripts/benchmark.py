@@ -0,0 +1,530 @@
+# benchmark.py: Reproducible benchmarks for the storage, engine and sync hot paths.
+# Part of LeoBook Scripts — Diagnostics
+#
+# Classes: LocalSupabase
+# Functions: generate_schedules(), generate_predictions(), generate_teams(), run_benchmarks(), compare_to_baseline(), main()
+
+"""
+Benchmark Suite
+Times the hot paths against seeded synthetic data at 10k / 100k / 1M rows, so
+scaling regressions show up here instead of as slower production cycles:
+
+  read_csv                 _read_csv over predictions.csv (size rows)
+  upsert_entry             UPSERT_CALLS single-row upserts into a size-row file
+  batch_upsert             1% of size (half updates, half inserts) in one batch
+  get_team_crest           CREST_LOOKUPS worst-case lookups in a size-row teams.csv
+  rule_engine_analyze      size/100 RuleEngine.analyze calls on backtester vision data
+  goal_predictor           size/10 predict_score_probabilities calls
+  market_reliability       calculate_market_reliability over size predictions
+  progressive_backtest     run_progressive_backtest, fixed 7-day window, size-row history
+  sync_table               SyncManager._sync_table against LocalSupabase (in-memory stand-in)
+
+Everything runs in a temporary Data/Store: module path constants are pointed at
+it for the duration of a benchmark and the cloud is never contacted. Results go
+to Data/Benchmarks/bench_<timestamp>.json; with --baseline each (benchmark, size)
+is compared and the run exits 1 when one is slower than baseline by more than
+--threshold. --save-baseline stores the run as the new baseline.
+
+    python Scripts/benchmark.py --sizes 10k,100k
+    python Scripts/benchmark.py --sizes 1m --only read_csv,batch_upsert
+    python Scripts/benchmark.py --baseline Data/Benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+from Data.Access.db_helpers import files_and_headers, PREDICTIONS_CSV, SCHEDULES_CSV, TEAMS_CSV, STANDINGS_CSV
+
+BENCH_DIR = os.path.join(project_root, "Data", "Benchmarks")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+SEED = 20260218
+UPSERT_CALLS = 5
+CREST_LOOKUPS = 20
+LEAGUE_COUNT = 200
+TEAMS_PER_LEAGUE = 20
+CALENDAR_DAYS = 365
+BACKTEST_WINDOW_DAYS = 7
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+# ── Synthetic data ─────────────────────────────────────────────
+
+def _league(i: int) -> str:
+    return f"REGION{i % 40:02d}: League {i:03d}"
+
+
+def _team(league: int, slot: int) -> Tuple[str, str]:
+    team_id = f"t{league:03d}{slot:02d}"
+    return team_id, f"Team {league:03d}-{slot:02d}"
+
+
+def generate_schedules(n: int, end: datetime, rng: random.Random) -> List[Dict[str, str]]:
+    """n finished fixtures spread over CALENDAR_DAYS days ending at `end`."""
+    rows = []
+    for i in range(n):
+        league = rng.randrange(LEAGUE_COUNT)
+        home, away = rng.sample(range(TEAMS_PER_LEAGUE), 2)
+        (home_id, home_name), (away_id, away_name) = _team(league, home), _team(league, away)
+        day = end - timedelta(days=rng.randrange(CALENDAR_DAYS))
+        rows.append({
+            "fixture_id": f"fx{i:08d}", "date": day.strftime("%d.%m.%Y"),
+            "match_time": f"{rng.randrange(12, 23):02d}:{rng.choice(('00', '30', '45'))}",
+            "region_league": _league(league), "league_id": f"lg{league:03d}",
+            "home_team": home_name, "away_team": away_name,
+            "home_team_id": home_id, "away_team_id": away_id,
+            "home_score": str(rng.choice((0, 0, 1, 1, 1, 2, 2, 3, 4))),
+            "away_score": str(rng.choice((0, 0, 1, 1, 2, 2, 3))),
+            "match_status": "finished", "match_link": f"https://www.flashscore.com/match/fx{i:08d}/",
+            "league_stage": "", "last_updated": (day + timedelta(hours=3)).isoformat(),
+        })
+    return rows
+
+
+def generate_predictions(schedules: List[Dict[str, str]], rng: random.Random) -> List[Dict[str, str]]:
+    markets = ("Over 2.5", "Under 2.5", "BTTS Yes", "BTTS No", "{home} to win", "{away} to win",
+               "Home or Draw", "Draw or Away")
+    rows = []
+    for s in schedules:
+        market = rng.choice(markets).format(home=s["home_team"], away=s["away_team"])
+        rows.append({
+            "fixture_id": s["fixture_id"], "date": s["date"], "match_time": s["match_time"],
+            "region_league": s["region_league"], "home_team": s["home_team"], "away_team": s["away_team"],
+            "home_team_id": s["home_team_id"], "away_team_id": s["away_team_id"],
+            "prediction": market, "confidence": rng.choice(("Low", "Medium", "High", "Very High")),
+            "reason": "H2H dominance; strong home form",
+            "actual_score": f"{s['home_score']}-{s['away_score']}",
+            "outcome_correct": rng.choice(("True", "False")), "status": "reviewed",
+            "match_link": s["match_link"], "last_updated": s["last_updated"],
+        })
+    return rows
+
+
+def generate_teams(n: int) -> List[Dict[str, str]]:
+    return [{"team_id": f"tm{i:08d}", "team_name": f"Team {i:08d}", "league_ids": f"lg{i % LEAGUE_COUNT:03d}",
+             "team_crest": f"https://static.flashscore.com/res/image/data/crest{i:08d}.png",
+             "last_updated": "2026-01-01T00:00:00"} for i in range(n)]
+
+
+def generate_standings() -> List[Dict[str, str]]:
+    rows = []
+    for league in range(LEAGUE_COUNT):
+        for pos in range(TEAMS_PER_LEAGUE):
+            team_id, team_name = _team(league, pos)
+            gf, ga = 60 - pos * 2, 20 + pos
+            rows.append({
+                "standings_key": f"lg{league:03d}_{team_id}", "league_id": f"lg{league:03d}",
+                "team_id": team_id, "team_name": team_name, "position": str(pos + 1), "played": "30",
+                "goals_for": str(gf), "goals_against": str(ga), "goal_difference": str(gf - ga),
+                "points": str(70 - pos * 3), "region_league": _league(league),
+            })
+    return rows
+
+
+def _write(path: str, rows: List[Dict[str, Any]], headers: List[str]):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=headers, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# ── Local Supabase stand-in ────────────────────────────────────
+
+class _LocalQuery:
+    def __init__(self, rows: Dict[str, Dict[str, Any]], key_field: str):
+        self._rows, self._key = rows, key_field
+        self._op, self._range, self._in, self._payload = "select", None, None, None
+
+    def select(self, *_):
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
+    def in_(self, field: str, ids):
+        self._in = set(str(i) for i in ids)
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self._op, self._payload = "upsert", rows
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    def execute(self):
+        if self._op == "upsert":
+            for row in self._payload:
+                self._rows.setdefault(str(row[self._key]), {}).update(row)
+            return SimpleNamespace(data=self._payload)
+        if self._op == "delete":
+            for key in self._in or ():
+                self._rows.pop(key, None)
+            return SimpleNamespace(data=[])
+        if self._in is not None:
+            return SimpleNamespace(data=[self._rows[k] for k in self._in if k in self._rows])
+        data = list(self._rows.values())
+        if self._range:
+            data = data[self._range[0]:self._range[1] + 1]
+        return SimpleNamespace(data=data)
+
+
+class LocalSupabase:
+    """In-memory tables answering the subset of the supabase-py query API SyncManager uses."""
+
+    def __init__(self, key_fields: Dict[str, str]):
+        self._key_fields = key_fields
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def table(self, name: str) -> _LocalQuery:
+        return _LocalQuery(self.tables.setdefault(name, {}), self._key_fields.get(name, "id"))
+
+
+# ── Sandbox ────────────────────────────────────────────────────
+
+@contextlib.contextmanager
+def _patched(patches: List[Tuple[Any, str, Any]]):
+    saved = [(obj, attr, getattr(obj, attr)) for obj, attr, _ in patches]
+    try:
+        for obj, attr, value in patches:
+            setattr(obj, attr, value)
+        yield
+    finally:
+        for obj, attr, value in reversed(saved):
+            setattr(obj, attr, value)
+
+
+@contextlib.contextmanager
+def _quiet():
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+class Workspace:
+    """A throwaway Data/Store for one benchmark size."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.dir = tempfile.mkdtemp(prefix=f"leo_bench_{size}_")
+        self.end = datetime(2026, 2, 18)
+        rng = random.Random(SEED + size)
+        self.schedules = generate_schedules(size, self.end, rng)
+        self.predictions = generate_predictions(self.schedules, rng)
+        self.path = lambda name: os.path.join(self.dir, name)
+        _write(self.path("schedules.csv"), self.schedules, files_and_headers[SCHEDULES_CSV])
+        _write(self.path("predictions.csv"), self.predictions, files_and_headers[PREDICTIONS_CSV])
+        _write(self.path("teams.csv"), generate_teams(size), files_and_headers[TEAMS_CSV])
+        _write(self.path("standings.csv"), generate_standings(), files_and_headers[STANDINGS_CSV])
+
+    def copy(self, name: str) -> str:
+        """Fresh copy of a seeded file (for benchmarks that mutate it)."""
+        target = self.path(f"work_{name}")
+        shutil.copyfile(self.path(name), target)
+        return target
+
+    def close(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+# ── Benchmarks: each returns (setup, run) where run() -> op count ─
+
+def bench_read_csv(ws: Workspace):
+    from Data.Access.db_helpers import _read_csv
+    path = ws.path("predictions.csv")
+    return None, lambda: len(_read_csv(path))
+
+
+def bench_upsert_entry(ws: Workspace):
+    from Data.Access.db_helpers import upsert_entry
+    headers = files_and_headers[PREDICTIONS_CSV]
+    state = {}
+
+    def setup():
+        state["path"] = ws.copy("predictions.csv")
+
+    def run():
+        for i in range(UPSERT_CALLS):
+            row = dict(ws.predictions[(i * 7919) % ws.size], status="booked")
+            upsert_entry(state["path"], row, headers, "fixture_id")
+        return UPSERT_CALLS
+    return setup, run
+
+
+def bench_batch_upsert(ws: Workspace):
+    from Data.Access.db_helpers import batch_upsert
+    headers = files_and_headers[PREDICTIONS_CSV]
+    count = max(1, ws.size // 100)
+    updates = [dict(ws.predictions[(i * 7919) % ws.size], status="booked") for i in range(count // 2)]
+    inserts = [dict(ws.predictions[i], fixture_id=f"new{i:08d}") for i in range(count - len(updates))]
+    state = {}
+
+    def setup():
+        state["path"] = ws.copy("predictions.csv")
+
+    def run():
+        batch_upsert(state["path"], updates + inserts, headers, "fixture_id")
+        return count
+    return setup, run
+
+
+def bench_get_team_crest(ws: Workspace):
+    import Data.Access.db_helpers as db
+    ids = [f"tm{ws.size - 1 - i:08d}" for i in range(CREST_LOOKUPS)]
+
+    def run():
+        with _patched([(db, "TEAMS_CSV", ws.path("teams.csv"))]):
+            for team_id in ids:
+                db.get_team_crest(team_id)
+        return len(ids)
+    return None, run
+
+
+def _vision_inputs(ws: Workspace, count: int):
+    from Core.Intelligence.progressive_backtester import _build_vision_data
+    import Data.Access.db_helpers as db
+    finished = sorted(ws.schedules, key=lambda m: datetime.strptime(m["date"], "%d.%m.%Y"), reverse=True)
+    standings_cache: Dict[str, List[Dict]] = {}
+    with _patched([(db, "STANDINGS_CSV", ws.path("standings.csv"))]):
+        return [_build_vision_data(finished[i], finished[:500], standings_cache) for i in range(count)]
+
+
+def bench_rule_engine_analyze(ws: Workspace):
+    from Core.Intelligence.rule_engine import RuleEngine
+    import Core.Intelligence.learning_engine as learning
+    calls = max(100, ws.size // 100)
+    visions = []
+
+    def setup():
+        if not visions:
+            visions.extend(_vision_inputs(ws, min(calls, 500)))
+
+    def run():
+        with _patched([(learning, "LEARNING_DB", Path(ws.path("learning_weights.json")))]):
+            for i in range(calls):
+                RuleEngine.analyze(visions[i % len(visions)])
+        return calls
+    return setup, run
+
+
+def bench_goal_predictor(ws: Workspace):
+    from Core.Intelligence.goal_predictor import GoalPredictor
+    calls = max(1000, ws.size // 10)
+    rng = random.Random(SEED)
+    xgs = [(rng.uniform(0.2, 3.5), rng.uniform(0.2, 3.0)) for _ in range(1000)]
+
+    def run():
+        for i in range(calls):
+            GoalPredictor.predict_score_probabilities(*xgs[i % len(xgs)])
+        return calls
+    return None, run
+
+
+def bench_market_reliability(ws: Workspace):
+    from Scripts.recommend_bets import calculate_market_reliability
+    return None, lambda: (calculate_market_reliability(ws.predictions), len(ws.predictions))[1]
+
+
+def bench_progressive_backtest(ws: Workspace):
+    import Data.Access.db_helpers as db
+    import Core.Intelligence.progressive_backtester as backtester
+    import Core.Intelligence.rule_engine_manager as engines
+    import Core.Intelligence.learning_engine as learning
+    start = (ws.end - timedelta(days=BACKTEST_WINDOW_DAYS - 1)).strftime("%Y-%m-%d")
+    end = ws.end.strftime("%Y-%m-%d")
+    patches = [
+        (db, "SCHEDULES_CSV", ws.path("schedules.csv")),
+        (db, "STANDINGS_CSV", ws.path("standings.csv")),
+        (backtester, "DATA_DIR", Path(ws.dir)),
+        (engines, "ENGINES_FILE", Path(ws.path("rule_engines.json"))),
+        (learning, "LEARNING_DB", Path(ws.path("learning_weights.json"))),
+        (learning, "PREDICTIONS_CSV", Path(ws.path("predictions.csv"))),
+        (learning.LearningEngine, "sync_to_supabase", staticmethod(lambda all_weights: None)),
+    ]
+
+    def run():
+        with _patched(patches):
+            summary = asyncio.run(backtester.run_progressive_backtest("default", start, end))
+        return (summary or {}).get("total", 0) + (summary or {}).get("skipped", 0)
+    return None, run
+
+
+def bench_sync_table(ws: Workspace):
+    import Data.Access.sync_manager as sync
+    key_fields = {conf["table"]: conf["key"] for conf in sync.TABLE_CONFIG.values()}
+    config = sync.TABLE_CONFIG["predictions"]
+    state = {}
+
+    def setup():
+        # Remote holds 90% of the rows: a third newer than local (pull), the rest
+        # older (push); the 10% it lacks are pushed too.
+        remote = LocalSupabase(key_fields)
+        table = remote.tables.setdefault(config["table"], {})
+        for i, row in enumerate(ws.predictions):
+            if i % 10 == 9:
+                continue
+            shifted = datetime.fromisoformat(row["last_updated"]) + timedelta(hours=1 if i % 3 == 0 else -1)
+            table[row["fixture_id"]] = dict(row, last_updated=shifted.isoformat())
+        os.makedirs(ws.path("sync_store"), exist_ok=True)
+        shutil.copyfile(ws.path("predictions.csv"), os.path.join(ws.path("sync_store"), config["csv"]))
+        manager = sync.SyncManager.__new__(sync.SyncManager)
+        manager.supabase = remote
+        state["manager"] = manager
+
+    def run():
+        with _patched([(sync, "DATA_DIR", Path(ws.path("sync_store")))]):
+            asyncio.run(state["manager"]._sync_table("predictions", config))
+        return ws.size
+    return setup, run
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "read_csv": bench_read_csv,
+    "upsert_entry": bench_upsert_entry,
+    "batch_upsert": bench_batch_upsert,
+    "get_team_crest": bench_get_team_crest,
+    "rule_engine_analyze": bench_rule_engine_analyze,
+    "goal_predictor": bench_goal_predictor,
+    "market_reliability": bench_market_reliability,
+    "progressive_backtest": bench_progressive_backtest,
+    "sync_table": bench_sync_table,
+}
+
+
+# ── Runner ─────────────────────────────────────────────────────
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_benchmarks(sizes: List[int], names: List[str], repeat: int = 3) -> Dict[str, Any]:
+    results = []
+    for size in sizes:
+        print(f"\n   [Bench] Generating {size:,} synthetic rows...")
+        ws = Workspace(size)
+        try:
+            for name in names:
+                try:
+                    setup, run = BENCHMARKS[name](ws)
+                    timings, ops = [], 0
+                    for _ in range(repeat):
+                        if setup:
+                            with _quiet():
+                                setup()
+                        with _quiet():
+                            start = time.perf_counter()
+                            ops = run()
+                            timings.append(time.perf_counter() - start)
+                    best = min(timings)
+                    results.append({"name": name, "size": size, "seconds": round(best, 6),
+                                    "median_seconds": round(sorted(timings)[len(timings) // 2], 6),
+                                    "ops": ops, "ops_per_sec": round(ops / best, 2) if best > 0 else None})
+                    print(f"   [Bench] {name:<22} {size:>9,}  {best * 1000:>10.1f} ms  ({ops:,} ops)")
+                except Exception as e:
+                    results.append({"name": name, "size": size, "error": f"{type(e).__name__}: {e}"})
+                    print(f"   [Bench] {name:<22} {size:>9,}  FAILED: {e}")
+        finally:
+            ws.close()
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(run: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Rows of (name, size, baseline, current, ratio, regression) for entries present in both."""
+    base = {(r["name"], r["size"]): r for r in baseline.get("results", []) if "seconds" in r}
+    rows = []
+    for r in run["results"]:
+        b = base.get((r["name"], r["size"]))
+        if not b or "seconds" not in r or not b["seconds"]:
+            continue
+        ratio = r["seconds"] / b["seconds"]
+        rows.append({"name": r["name"], "size": r["size"], "baseline": b["seconds"], "current": r["seconds"],
+                     "ratio": round(ratio, 3), "regression": ratio > 1 + threshold})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="LeoBook hot-path benchmarks")
+    parser.add_argument("--sizes", default="10k,100k", help="Comma-separated row counts (e.g. 10k,100k,1m)")
+    parser.add_argument("--only", default="", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (best is reported)")
+    parser.add_argument("--out", default="", help="Result JSON path (default Data/Benchmarks/bench_<timestamp>.json)")
+    parser.add_argument("--baseline", default="", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Allowed slowdown vs baseline (0.20 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {DEFAULT_BASELINE}")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    run = run_benchmarks(sizes, names, max(1, args.repeat))
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    out = args.out or os.path.join(BENCH_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare_to_baseline(run, json.load(f), args.threshold)
+        run["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "rows": comparison}
+        print(f"\n   [Bench] vs baseline {args.baseline} (threshold +{args.threshold:.0%}):")
+        for row in comparison:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            print(f"   [Bench] {row['name']:<22} {row['size']:>9,}  x{row['ratio']:.2f}  {flag}")
+        if any(row["regression"] for row in comparison):
+            exit_code = 1
+
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"\n   [Bench] Results written to {out}")
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"   [Bench] Baseline updated: {DEFAULT_BASELINE}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
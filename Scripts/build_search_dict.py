@@ -2,14 +2,15 @@
 import csv
 import os
 import json
-import time
-import requests
 import re
-import unicodedata
 import uuid
 from collections import defaultdict
 from Core.Intelligence.aigo_suite import AIGOSuite
-from supabase import create_client
+from Core.Intelligence.llm_cache import get_llm_cache, make_cache_key
+from Core.Intelligence.api_manager import get_http_client
+from Core.Intelligence.offline_llm import is_offline, is_recording, get_offline_provider
+from Core.Utils.name_index import NameIndex, normalize_for_search
+from Data.Access.supabase_client import get_supabase_client
 from dotenv import load_dotenv
 from Data.Access.db_helpers import CSV_LOCK, _read_csv, _write_csv
 
@@ -36,24 +37,13 @@ LLM_PROVIDERS = [
         'model': 'grok-4-1-fast-reasoning',
     },
 ]
-BATCH_SIZE = 10
-SLEEP_BETWEEN_BATCHES = 2
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_KEY in .env")
-
-# Initialize Supabase
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-def normalize_for_search(name: str) -> str:
-    """Standard normalization for search term generation (NFKD for accents)."""
-    if not name: return ""
-    # Normalize unicode characters to decompose accents
-    nfkd_form = unicodedata.normalize('NFKD', name)
-    # Filter out non-ASCII characters (accents)
-    only_ascii = "".join([c for c in nfkd_form if not unicodedata.combining(c)])
-    # Remove non-alphanumeric and lower
-    return re.sub(r'[^a-z0-9\s]', '', only_ascii.lower().strip())
+# Multi-entity prompt packing: as many names per call as fit the token budget
+PROMPT_TOKEN_BUDGET = int(os.getenv("SEARCH_DICT_PROMPT_TOKENS", "12000"))  # prompt + expected reply
+OUTPUT_TOKENS_PER_ENTITY = {"team": 160, "league": 110}
+MAX_PACK_SIZE = int(os.getenv("SEARCH_DICT_MAX_PACK", "40"))
+PACK_CONCURRENCY = int(os.getenv("SEARCH_DICT_PACK_CONCURRENCY", "3"))
+ENRICH_WINDOW = 200      # names resolved between CSV/Supabase persistence steps
+COALESCE_WINDOW = 0.5    # seconds per-match callers are pooled into one packed call
 
 def generate_deterministic_id(name: str, context: str = "") -> str:
     """Generates a deterministic ID using UUIDv5 as a fallback for slugs."""
@@ -70,6 +60,18 @@ def clean_none_values(data: dict) -> dict:
     """Replace Python None values with empty string to avoid 'None' in CSV."""
     return {k: ('' if v is None else v) for k, v in data.items()}
 
+def _parse_json_array(text: str):
+    """Returns the reply's JSON array of objects when it parses as-is, else None (no salvage)."""
+    match = re.search(r'\[\s*\{.*\}\s*\]', text or "", re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group())
+            return data if isinstance(data, list) else None
+        except ValueError:
+            pass
+    return None
+
+
 def extract_json_with_salvage(text: str) -> list:
     """
     Attempts to extract JSON from text even if malformed or truncated.
@@ -78,12 +80,9 @@ def extract_json_with_salvage(text: str) -> list:
     if not text: return []
     
     # 1. Try standard regex for JSON block
-    match = re.search(r'\[\s*\{.*\}\s*\]', text, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group())
-        except:
-            pass
+    data = _parse_json_array(text)
+    if data is not None:
+        return data
             
     # 2. Salvage individual objects if the array is broken
     objects = []
@@ -162,45 +161,97 @@ Return ONLY the JSON array — no explanations, no markdown.
 """
 
 
-def _call_llm(provider: dict, prompt: str) -> list:
-    """Calls a single LLM provider and returns parsed results."""
-    headers = {
-        "Authorization": f"Bearer {provider['api_key']}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": provider["model"],
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.1,
-        "max_tokens": 4096
-    }
-    resp = requests.post(provider["api_url"], headers=headers, json=payload, timeout=60)
-    resp.raise_for_status()
-    content = resp.json()["choices"][0]["message"]["content"].strip()
-
-    data = extract_json_with_salvage(content)
+async def _call_llm(provider: dict, prompt: str, max_tokens: int = 4096) -> list:
+    """Calls a single LLM provider and returns parsed results (served from the LLM cache when seen before, if that reply was clean)."""
+    cache = get_llm_cache()
+    cache_key = make_cache_key("search_dict", provider["model"], prompt) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached:
+            print(f"  [LLM Cache] Hit for {provider['model']} prompt ({len(cached)} items).")
+            return cached
+
+    if is_offline():
+        response = await get_offline_provider().generate(
+            prompt, None, provider=provider["name"], model=provider["model"], api_key=provider["api_key"]
+        )
+        content = response.text.strip()
+    else:
+        headers = {
+            "Authorization": f"Bearer {provider['api_key']}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": provider["model"],
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.1,
+            "max_tokens": max_tokens
+        }
+        resp = await get_http_client().post(provider["api_url"], headers=headers, json=payload, timeout=60)
+        resp.raise_for_status()
+        content = resp.json()["choices"][0]["message"]["content"].strip()
+        if is_recording():
+            get_offline_provider().record(prompt, None, content, provider["name"], provider["model"])
+
+    data = _parse_json_array(content)
+    complete = data is not None
+    if data is None:
+        data = extract_json_with_salvage(content)
     if not data:
         print(f"  [Warning] {provider['name']} response yielded no valid JSON: {content[:200]}...")
         return []
 
     validated = [item for item in data if isinstance(item, dict) and "input_name" in item]
+    # Only a reply that parsed whole and validated item-for-item is reused; salvaged or
+    # partly invalid replies are returned once and the prompt is asked again next time
+    if cache and validated and complete and len(validated) == len(data):
+        cache.set(cache_key, validated, namespace="search_dict", model=provider["model"])
     return validated
 
 
-def query_llm_for_metadata(items, item_type="team", retries=2):
+def _entity_cache_key(name: str, item_type: str) -> str:
+    return make_cache_key(f"search_dict_entity:{item_type}", "", normalize_for_search(name))
+
+
+def _split_cached_entities(items, item_type):
+    """Returns (cached_results, uncached_items). Cached rows are re-labelled with the caller's input_name."""
+    cache = get_llm_cache()
+    if not cache:
+        return [], list(items)
+    cached_results, remaining = [], []
+    for name in items:
+        hit = cache.get(_entity_cache_key(name, item_type))
+        if isinstance(hit, dict):
+            cached_results.append({**hit, "input_name": name})
+        else:
+            remaining.append(name)
+    return cached_results, remaining
+
+
+def _store_entities(results, item_type):
+    cache = get_llm_cache()
+    if not cache:
+        return
+    for item in results:
+        name = item.get("input_name")
+        if name and not is_field_empty(str(item.get("official_name", ""))):
+            cache.set(_entity_cache_key(name, item_type), item, namespace=f"search_dict_entity:{item_type}")
+
+
+async def _query_llm_uncached(items, item_type="team", retries=2):
     """
     Queries LLM providers with ASCENDING model chain (cheapest first).
-    For Gemini: iterates model chain × key rotation.
-    On 429: try next key for same model, then downgrade model.
+    For Gemini: iterates model chain, taking keys from the health manager's
+    scheduler (queues for RPM/TPM capacity instead of firing into a 429).
+    On an unexpected 429: try next key for same model, then downgrade model.
     """
-    if not items:
-        return []
-
     from Core.Intelligence.llm_health_manager import health_manager
     ordered = health_manager.get_ordered_providers()
     model_chain = health_manager.get_model_chain("search_dict")
 
     prompt = _build_prompt(items, item_type)
+    est_tokens = health_manager.estimate_tokens(prompt)
+    max_tokens = min(16384, max(4096, len(items) * OUTPUT_TOKENS_PER_ENTITY.get(item_type, 160) + 512))
 
     for provider_name in ordered:
         if not health_manager.is_provider_active(provider_name):
@@ -212,9 +263,9 @@ def query_llm_for_metadata(items, item_type="team", retries=2):
             for model_name in model_chain:
                 max_key_tries = min(3, len(health_manager._gemini_active or health_manager._gemini_keys))
                 for key_attempt in range(max_key_tries):
-                    api_key = health_manager.get_next_gemini_key(model=model_name)
+                    api_key = await health_manager.acquire_gemini_key(model_name, est_tokens)
                     if not api_key:
-                        print(f"  [LLM] All keys exhausted for {model_name}, upgrading model...")
+                        print(f"  [LLM] No key capacity for {model_name}, upgrading model...")
                         break
                     provider = {
                         "name": "Gemini",
@@ -226,7 +277,7 @@ def query_llm_for_metadata(items, item_type="team", retries=2):
                         try:
                             key_suffix = api_key[-4:]
                             print(f"  [LLM] Gemini {model_name} (key ...{key_suffix}) attempt {attempt}/{retries}...")
-                            results = _call_llm(provider, prompt)
+                            results = await _call_llm(provider, prompt, max_tokens)
                             if results:
                                 print(f"  [LLM] Gemini {model_name} returned {len(results)} items.")
                                 return results
@@ -241,7 +292,7 @@ def query_llm_for_metadata(items, item_type="team", retries=2):
                                 print(f"  [LLM] Key ...{key_suffix} permanently dead (403), removing...")
                                 break  # Try next key
                             print(f"  [Warning] Gemini {model_name} attempt {attempt}/{retries} failed: {e}")
-                            time.sleep(3 * attempt)
+                            await asyncio.sleep(3 * attempt)
                     else:
                         continue
                     continue
@@ -262,29 +313,226 @@ def query_llm_for_metadata(items, item_type="team", retries=2):
             for attempt in range(1, retries + 1):
                 try:
                     print(f"  [LLM] Grok attempt {attempt}/{retries}...")
-                    results = _call_llm(provider, prompt)
+                    results = await _call_llm(provider, prompt, max_tokens)
                     if results:
                         print(f"  [LLM] Grok returned {len(results)} items.")
                         return results
                 except Exception as e:
                     print(f"  [Warning] Grok attempt {attempt}/{retries} failed: {e}")
-                    time.sleep(3 * attempt)
+                    await asyncio.sleep(3 * attempt)
             print(f"  [Fallback] Grok exhausted. Trying next provider...")
 
     print(f"  [Error] All LLM providers failed for {len(items)} {item_type}(s).")
     return []
 
 async def async_query_llm_for_metadata(items, item_type="team", retries=2):
-    """Async wrapper that ensures health manager is initialized before sync LLM call."""
+    """Serves cached entities, then queries the LLM chain for the rest (health manager initialized first)."""
+    if not items:
+        return []
+
+    cached_results, items = _split_cached_entities(items, item_type)
+    if cached_results:
+        print(f"  [LLM Cache] {len(cached_results)} {item_type}(s) served from cache, {len(items)} to query.")
+    if not items:
+        return cached_results
+
     from Core.Intelligence.llm_health_manager import health_manager
     await health_manager.ensure_initialized()
-    return await asyncio.to_thread(query_llm_for_metadata, items, item_type, retries)
+    results = await _query_llm_uncached(items, item_type, retries)
+    _store_entities(results, item_type)
+    return cached_results + results
 
 # Backward-compatible alias
 query_grok_for_metadata_with_retry = async_query_llm_for_metadata
 
+
+# ================================================
+# Multi-Entity Prompt Packing
+# ================================================
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def pack_entities(names: list, item_type: str = "team", token_budget: int = PROMPT_TOKEN_BUDGET) -> list:
+    """
+    Greedily splits names into packs whose prompt plus expected reply fits token_budget
+    (and at most MAX_PACK_SIZE names). Returns a list of name lists.
+    """
+    base = _estimate_tokens(_build_prompt([], item_type))
+    per_output = OUTPUT_TOKENS_PER_ENTITY.get(item_type, 160)
+    packs, current, used = [], [], base
+    for name in names:
+        cost = _estimate_tokens(name) + 3 + per_output
+        if current and (used + cost > token_budget or len(current) >= MAX_PACK_SIZE):
+            packs.append(current)
+            current, used = [], base
+        current.append(name)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _match_results_to_names(names: list, results: list) -> dict:
+    """Maps LLM rows back to the requested names by normalized input_name (order only as a last resort)."""
+    by_norm = {normalize_for_search(n): n for n in names}
+    mapped, leftovers = {}, []
+    for item in results:
+        name = by_norm.get(normalize_for_search(str(item.get("input_name", ""))))
+        if name and name not in mapped:
+            mapped[name] = item
+        else:
+            leftovers.append(item)
+    # Positional fallback is only safe when the reply is complete
+    if leftovers and len(results) == len(names):
+        for name, item in zip(names, results):
+            if name not in mapped and any(item is left for left in leftovers):
+                mapped[name] = {**item, "input_name": name}
+    return mapped
+
+
+async def enrich_entities_packed(names: list, item_type: str = "team",
+                                 token_budget: int = PROMPT_TOKEN_BUDGET) -> dict:
+    """
+    Batched enrichment API: packs names into as few prompts as fit token_budget, runs the
+    packs concurrently (the key scheduler paces them) and splits replies back per entity.
+    Entities dropped by a truncated/malformed reply (salvaged via extract_json_with_salvage)
+    are re-asked once in smaller packs.
+    Returns {input_name: metadata}; names the LLM never answered are absent.
+    """
+    unique = list(dict.fromkeys(n for n in names if n and n.strip()))
+    if not unique:
+        return {}
+
+    semaphore = asyncio.Semaphore(PACK_CONCURRENCY)
+
+    async def _run_pack(pack):
+        async with semaphore:
+            return _match_results_to_names(pack, await async_query_llm_for_metadata(pack, item_type))
+
+    resolved = {}
+    for attempt in range(2):
+        pending = [n for n in unique if n not in resolved]
+        if not pending:
+            break
+        budget = token_budget if attempt == 0 else max(2000, token_budget // 2)
+        packs = pack_entities(pending, item_type, budget)
+        if attempt:
+            print(f"  [SearchDict] Re-asking {len(pending)} {item_type}(s) missing from packed replies...")
+        else:
+            print(f"  [SearchDict] {len(pending)} {item_type}(s) packed into {len(packs)} prompt(s).")
+        for mapped in await asyncio.gather(*[_run_pack(p) for p in packs], return_exceptions=True):
+            if isinstance(mapped, Exception):
+                print(f"  [SearchDict] Packed {item_type} call failed: {mapped}")
+                continue
+            resolved.update(mapped)
+        if not resolved:
+            break  # Providers are down — a second round would fail the same way
+    return resolved
+
+
+class _EnrichmentCoalescer:
+    """
+    Pools names from concurrent per-match callers for COALESCE_WINDOW seconds and
+    resolves them with a single enrich_entities_packed() call. State belongs to
+    one event loop and is dropped when a later asyncio.run() calls in.
+    """
+
+    def __init__(self, item_type: str):
+        self.item_type = item_type
+        self._loop = None
+        self._waiters = {}
+        self._flush_task = None
+
+    async def resolve(self, names: list) -> dict:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A task/futures left by a previous loop would never run or resolve here
+            self._loop = loop
+            self._waiters = {}
+            self._flush_task = None
+        futures = {}
+        for name in names:
+            future = loop.create_future()
+            self._waiters.setdefault(name, []).append(future)
+            futures[name] = future
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_after_window())
+        resolved = {}
+        for name, future in futures.items():
+            item = await future
+            if item:
+                resolved[name] = item
+        return resolved
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(COALESCE_WINDOW)
+        waiters, self._waiters = self._waiters, {}
+        try:
+            resolved = await enrich_entities_packed(list(waiters), self.item_type)
+        except Exception as e:
+            print(f"    [SearchDict] Coalesced {self.item_type} enrichment failed: {e}")
+            resolved = {}
+        for name, futures in waiters.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(resolved.get(name))
+        if self._waiters:
+            # Names pooled during the packed call found this task still running and scheduled nothing
+            self._flush_task = asyncio.ensure_future(self._flush_after_window())
+
+
+_team_coalescer = _EnrichmentCoalescer("team")
+_league_coalescer = _EnrichmentCoalescer("league")
+
+
+def _team_row(team_id: str, known_names, item: dict) -> dict:
+    """Builds the teams upsert row for one LLM metadata item."""
+    known_names = list(known_names)
+    off_name = item.get("official_name") or known_names[0]
+    search_terms = {normalize_for_search(off_name)}
+    for n in known_names: search_terms.add(normalize_for_search(n))
+    for n in item.get("other_names", []) or []: search_terms.add(normalize_for_search(n))
+    for a in item.get("abbreviations", []) or []: search_terms.add(normalize_for_search(a))
+    return clean_none_values({
+        "team_id": team_id,
+        "team_name": off_name,
+        "other_names": item.get("other_names", []),
+        "abbreviations": item.get("abbreviations", []),
+        "search_terms": list(filter(None, search_terms)),
+        "country": item.get("country"),
+        "city": item.get("city"),
+        "stadium": item.get("stadium"),
+    })
+
+
+def _league_row(league_id: str, input_name: str, item: dict) -> dict:
+    """Builds the region_league upsert row for one LLM metadata item."""
+    official_name = item.get("official_name") or input_name
+    search_terms = {normalize_for_search(input_name), normalize_for_search(official_name)}
+    for n in item.get("other_names", []) or []: search_terms.add(normalize_for_search(n))
+    for a in item.get("abbreviations", []) or []: search_terms.add(normalize_for_search(a))
+    return clean_none_values({
+        "league_id": league_id,
+        "league": official_name,
+        "other_names": item.get("other_names", []),
+        "abbreviations": item.get("abbreviations", []),
+        "search_terms": list(filter(None, search_terms)),
+    })
+
+
+TEAM_CSV_FIELDS = ["team_name", "other_names", "abbreviations", "search_terms", "country", "city", "stadium"]
+LEAGUE_CSV_FIELDS = ["league", "other_names", "abbreviations", "search_terms"]
+
 def batch_upsert(table_name: str, data: list, chunk_size: int = 1000):
     """Upserts data to Supabase in chunks to avoid payload limits."""
+    # Client is created on first upsert, not at import (importers only needing
+    # the enrichment helpers should not pay for — or require — a Supabase session)
+    supabase = get_supabase_client() if data else None
+    if data and supabase is None:
+        print(f"  [Error] Supabase not configured (SUPABASE_URL / SUPABASE_SERVICE_KEY). Skipped {len(data)} {table_name} rows.")
+        return
     for i in range(0, len(data), chunk_size):
         chunk = data[i:i + chunk_size]
         try:
@@ -358,40 +606,99 @@ def update_csv_file_under_lock(file_path, data_map, key_field, headers):
     os.replace(temp_file, file_path)
     print(f"Updated {updated_count} rows and added {new_count} new rows in {file_path}")
 
-def find_best_match_league(input_name: str, country: str, existing_leagues: dict):
+LEAGUE_FUZZY_ACCEPT = float(os.getenv("LEAGUE_FUZZY_ACCEPT", "0.85"))  # trigram Dice needed to reuse a league without containment
+_league_index_cache = {"source": None, "size": -1, "index": None}
+
+# Tokens that tell otherwise identical league names apart (tier numbers, age groups, women's/reserve sides)
+_ROMAN_TIERS = {"i": "1", "ii": "2", "iii": "3", "iv": "4", "v": "5", "vi": "6"}
+_GENDER_TOKENS = {"w", "women", "womens", "woman", "ladies", "fem", "feminine", "femenino", "femenina",
+                  "feminin", "femminile", "frauen", "damen", "vrouwen", "kvinner", "dam"}
+_SIDE_TOKENS = {"b", "reserve", "reserves", "youth", "amateur", "amateurs", "u"}
+
+
+def _league_markers(normalized: str) -> frozenset:
+    """Tier/age/gender tokens of a normalized league name ('premier league u21' -> {'u21'})."""
+    markers = set()
+    for token in normalized.split():
+        if token.isdigit():
+            markers.add(str(int(token)))
+        elif token in _ROMAN_TIERS:
+            markers.add(_ROMAN_TIERS[token])
+        elif re.fullmatch(r"u\d{2}", token):
+            markers.add(token)
+        elif token in _GENDER_TOKENS:
+            markers.add("w")
+        elif token in _SIDE_TOKENS:
+            markers.add(token)
+    return frozenset(markers)
+
+
+def build_league_index(existing_leagues: dict) -> NameIndex:
+    """Trigram index over region_league names (payload = lower-cased country)."""
+    index = NameIndex()
+    for league_id, row in existing_leagues.items():
+        index.add(league_id, row.get("league", ""), payload=(row.get("country") or "").strip().lower())
+    return index
+
+
+def _league_index_for(existing_leagues: dict) -> NameIndex:
+    """Reuses the index while the same existing_leagues dict (and size) is passed in."""
+    cache = _league_index_cache
+    if cache["source"] is not existing_leagues or cache["size"] != len(existing_leagues):
+        cache.update(source=existing_leagues, size=len(existing_leagues), index=build_league_index(existing_leagues))
+    return cache["index"]
+
+
+def find_best_match_league(input_name: str, country: str, existing_leagues: dict, index: NameIndex = None):
     """
     Match an input league name against existing league rows.
     Returns (league_id, is_new).
+
+    Resolution order (candidates come from the trigram index, not a full scan):
+    exact normalized name -> longest containing/contained name -> best trigram
+    similarity above LEAGUE_FUZZY_ACCEPT (same country, same tier/age/gender
+    markers) -> new deterministic ID.
     """
     norm_input = normalize_for_search(input_name)
     # Strip round/stage suffixes for matching: "TURKEY - 1. LIG - ROUND 22" â†’ "turkey 1 lig"
     norm_input_base = re.sub(r'\s*-?\s*(round|matchday|playoffs?|apertura|clausura|1/\d+-finals?|group\s*\w)\s*.*$', '', norm_input, flags=re.IGNORECASE).strip()
 
-    best_id = None
-    best_score = 0
+    if norm_input_base:
+        index = index or _league_index_for(existing_leagues)
+        wanted_country = (country or "").strip().lower()
 
-    for league_id, row in existing_leagues.items():
-        existing_name = normalize_for_search(row.get("league", ""))
-        existing_country = (row.get("country") or "").strip().lower()
-
-        # Country must match if both are present
-        if country and existing_country and country.strip().lower() != existing_country:
-            continue
+        def _country_ok(league_id):
+            # Country must match if both are present
+            existing_country = index.payload(league_id) or ""
+            return not (wanted_country and existing_country and wanted_country != existing_country)
 
         # Exact match (Name-based fallback if ID is just a slug or Unknown)
-        if norm_input_base == existing_name:
-            return league_id, False
-
-        # Substring containment score
-        if norm_input_base and existing_name:
+        for league_id in index.exact(norm_input_base, normalized=True):
+            if _country_ok(league_id):
+                return league_id, False
+
+        # Substring containment score (word-aligned containment keeps overlap near 1.0)
+        candidates = index.query(norm_input_base, k=None, normalized=True, accept=_country_ok,
+                                 rank="overlap", min_score=0.5)
+        best_id, best_score = None, 0
+        for league_id, existing_name, _dice, _overlap in candidates:
             if norm_input_base in existing_name or existing_name in norm_input_base:
-                score = len(existing_name)
-                if score > best_score:
-                    best_score = score
+                if len(existing_name) > best_score:
+                    best_score = len(existing_name)
                     best_id = league_id
-
-    if best_id:
-        return best_id, False
+        if best_id:
+            return best_id, False
+
+        # Close spelling variant settled locally instead of minting a new league. Only a
+        # pure spelling difference qualifies: "Liga 1"/"Liga 2" or "U21"/"U23" score high
+        # but are different competitions.
+        if wanted_country:
+            markers = _league_markers(norm_input_base)
+            for league_id, existing_name, dice, _overlap in sorted(candidates, key=lambda c: -c[2]):
+                if dice < LEAGUE_FUZZY_ACCEPT:
+                    break
+                if index.payload(league_id) == wanted_country and _league_markers(existing_name) == markers:
+                    return league_id, False
 
     # No match â€” generate deterministic ID
     return generate_deterministic_id(input_name, country or ""), True
@@ -477,36 +784,21 @@ async def main():
     for league_list, pass_name in [(empty_leagues, "PASS 1"), (incomplete_leagues_list, "PASS 2")]:
         if not league_list: continue
         print(f"\nâ”€â”€ {pass_name}: Leagues â”€â”€")
-        for i in range(0, len(league_list), BATCH_SIZE):
-            batch = league_list[i:i + BATCH_SIZE]
-            print(f"  Processing batch of {len(batch)} leagues...")
-            results = await async_query_llm_for_metadata(batch, item_type="league")
+        for i in range(0, len(league_list), ENRICH_WINDOW):
+            window = league_list[i:i + ENRICH_WINDOW]
+            print(f"  Processing {len(window)} leagues...")
+            resolved = await enrich_entities_packed(window, item_type="league")
             updates = {}
-            for item in results:
-                input_name = item.get("input_name")
-                official_name = item.get("official_name") or input_name
+            for input_name, item in resolved.items():
                 country = item.get("country") # LLM might return country for a league
                 lid, _ = find_best_match_league(input_name, country, existing_leagues)
-                
-                search_terms = {normalize_for_search(input_name), normalize_for_search(official_name)}
-                for n in item.get("other_names", []): search_terms.add(normalize_for_search(n))
-                for a in item.get("abbreviations", []): search_terms.add(normalize_for_search(a))
-                
-                upsert_data = clean_none_values({
-                    "league": official_name,
-                    "other_names": item.get("other_names", []),
-                    "abbreviations": item.get("abbreviations", []),
-                    "search_terms": list(filter(None, search_terms)),
-                    "league_id": lid
-                })
-                updates[lid] = upsert_data
+                updates[lid] = _league_row(lid, input_name, item)
 
             if updates:
                 print(f"  [Supabase] Upserting {len(updates)} leagues...")
                 batch_upsert("region_league", list(updates.values()))
                 async with CSV_LOCK:
-                    update_csv_file_under_lock(REGION_LEAGUE_CSV, updates, "league_id", ["league", "other_names", "abbreviations", "search_terms"])
-            await asyncio.sleep(SLEEP_BETWEEN_BATCHES)
+                    update_csv_file_under_lock(REGION_LEAGUE_CSV, updates, "league_id", LEAGUE_CSV_FIELDS)
 
     # --- Process Teams ---
     team_ids_all = list(teams_raw.keys())
@@ -516,39 +808,23 @@ async def main():
     for team_ids, pass_name in [(team_ids_pass1, "PASS 1"), (team_ids_pass2, "PASS 2")]:
         if not team_ids: continue
         print(f"\nâ”€â”€ {pass_name}: Teams â”€â”€")
-        for i in range(0, len(team_ids), BATCH_SIZE):
-            batch_ids = team_ids[i:i + BATCH_SIZE]
-            batch_names = [list(teams_raw[tid]["names"])[0] for tid in batch_ids] # Use first name as input
-            print(f"  Processing batch of {len(batch_ids)} teams...")
-            results = await async_query_llm_for_metadata(batch_names, item_type="team")
+        for i in range(0, len(team_ids), ENRICH_WINDOW):
+            window_ids = team_ids[i:i + ENRICH_WINDOW]
+            name_to_ids = defaultdict(list)
+            for tid in window_ids:
+                name_to_ids[list(teams_raw[tid]["names"])[0]].append(tid) # Use first name as input
+            print(f"  Processing {len(window_ids)} teams...")
+            resolved = await enrich_entities_packed(list(name_to_ids), item_type="team")
             updates = {}
-            for idx, item in enumerate(results):
-                if idx >= len(batch_ids): break # Safety break
-                tid = batch_ids[idx]
-                off_name = item.get("official_name") or list(teams_raw[tid]["names"])[0]
-                search_terms = {normalize_for_search(off_name)}
-                for n in teams_raw[tid]["names"]: search_terms.add(normalize_for_search(n))
-                for n in item.get("other_names", []): search_terms.add(normalize_for_search(n))
-                for a in item.get("abbreviations", []): search_terms.add(normalize_for_search(a))
-                
-                upsert_data = clean_none_values({
-                    "team_id": tid,
-                    "team_name": off_name,
-                    "other_names": item.get("other_names", []),
-                    "abbreviations": item.get("abbreviations", []),
-                    "search_terms": list(filter(None, search_terms)),
-                    "country": item.get("country"),
-                    "city": item.get("city"),
-                    "stadium": item.get("stadium"),
-                })
-                updates[tid] = upsert_data
+            for input_name, item in resolved.items():
+                for tid in name_to_ids.get(input_name, []):
+                    updates[tid] = _team_row(tid, teams_raw[tid]["names"], item)
 
             if updates:
                 print(f"  [Supabase] Upserting {len(updates)} teams...")
                 batch_upsert("teams", list(updates.values()))
                 async with CSV_LOCK:
-                    update_csv_file_under_lock(TEAMS_CSV, updates, "team_id", ["team_name", "other_names", "abbreviations", "search_terms", "country", "city", "stadium"])
-            await asyncio.sleep(SLEEP_BETWEEN_BATCHES)
+                    update_csv_file_under_lock(TEAMS_CSV, updates, "team_id", TEAM_CSV_FIELDS)
 
     print("\nSearch dictionary built and local CSVs/Supabase synced!")
 
@@ -563,8 +839,8 @@ async def enrich_match_search_dict(
 ):
     """
     Per-match enrichment: checks if the league + 2 teams need search_terms/abbreviations.
-    If any are missing, calls the LLM for just those items (max 3 per call).
-    Updates both CSV and Supabase immediately.
+    Missing items are pooled with concurrent per-match callers (_EnrichmentCoalescer)
+    into packed prompts. Updates both CSV and Supabase immediately.
     """
     items_to_enrich_team = []
     items_to_enrich_league = []
@@ -574,18 +850,17 @@ async def enrich_match_search_dict(
     async with CSV_LOCK:
         # Check teams
         if os.path.exists(TEAMS_CSV):
-            teams_data = _read_csv(TEAMS_CSV)
+            teams_by_id = {row.get('team_id'): row for row in _read_csv(TEAMS_CSV)}
             for tid, tname in [(home_id, home_team), (away_id, away_team)]:
                 if not tid or not tname:
                     continue
                 found = False
-                for row in teams_data:
-                    if row.get('team_id') == tid:
-                        st = (row.get('search_terms') or '').strip()
-                        abbr = (row.get('abbreviations') or '').strip()
-                        if st and st != '[]' and abbr and abbr != '[]':
-                            found = True  # Already enriched
-                        break
+                row = teams_by_id.get(tid)
+                if row:
+                    st = (row.get('search_terms') or '').strip()
+                    abbr = (row.get('abbreviations') or '').strip()
+                    if st and st != '[]' and abbr and abbr != '[]':
+                        found = True  # Already enriched
                 if not found:
                     items_to_enrich_team.append(tname)
                     team_id_map[tname] = tid
@@ -613,39 +888,17 @@ async def enrich_match_search_dict(
     # --- Enrich teams ---
     if items_to_enrich_team:
         try:
-            results = await async_query_llm_for_metadata(items_to_enrich_team, item_type="team")
+            resolved = await _team_coalescer.resolve(items_to_enrich_team)
             updates = {}
-            for idx, item in enumerate(results):
-                if idx >= len(items_to_enrich_team):
-                    break
-                tname = items_to_enrich_team[idx]
+            for tname, item in resolved.items():
                 tid = team_id_map.get(tname)
-                if not tid:
-                    continue
-                off_name = item.get("official_name") or tname
-                search_terms = {normalize_for_search(off_name), normalize_for_search(tname)}
-                for n in item.get("other_names", []):
-                    search_terms.add(normalize_for_search(n))
-                for a in item.get("abbreviations", []):
-                    search_terms.add(normalize_for_search(a))
-
-                upsert_data = clean_none_values({
-                    "team_id": tid,
-                    "team_name": off_name,
-                    "other_names": item.get("other_names", []),
-                    "abbreviations": item.get("abbreviations", []),
-                    "search_terms": list(filter(None, search_terms)),
-                    "country": item.get("country"),
-                    "city": item.get("city"),
-                    "stadium": item.get("stadium"),
-                })
-                updates[tid] = upsert_data
+                if tid:
+                    updates[tid] = _team_row(tid, [tname], item)
 
             if updates:
                 batch_upsert("teams", list(updates.values()))
                 async with CSV_LOCK:
-                    update_csv_file_under_lock(TEAMS_CSV, updates, "team_id",
-                        ["team_name", "other_names", "abbreviations", "search_terms", "country", "city", "stadium"])
+                    update_csv_file_under_lock(TEAMS_CSV, updates, "team_id", TEAM_CSV_FIELDS)
                 print(f"    [SearchDict] ✓ {len(updates)} teams enriched")
         except Exception as e:
             print(f"    [SearchDict] Team enrichment error (non-fatal): {e}")
@@ -653,31 +906,15 @@ async def enrich_match_search_dict(
     # --- Enrich league ---
     if items_to_enrich_league:
         try:
-            results = await async_query_llm_for_metadata(items_to_enrich_league, item_type="league")
+            resolved = await _league_coalescer.resolve(items_to_enrich_league)
             updates = {}
-            for item in results:
-                input_name = item.get("input_name")
-                official_name = item.get("official_name") or input_name
-                search_terms = {normalize_for_search(input_name), normalize_for_search(official_name)}
-                for n in item.get("other_names", []):
-                    search_terms.add(normalize_for_search(n))
-                for a in item.get("abbreviations", []):
-                    search_terms.add(normalize_for_search(a))
-
-                upsert_data = clean_none_values({
-                    "league_id": league_id,
-                    "league": official_name,
-                    "other_names": item.get("other_names", []),
-                    "abbreviations": item.get("abbreviations", []),
-                    "search_terms": list(filter(None, search_terms)),
-                })
-                updates[league_id] = upsert_data
+            for input_name, item in resolved.items():
+                updates[league_id] = _league_row(league_id, input_name, item)
 
             if updates:
                 batch_upsert("region_league", list(updates.values()))
                 async with CSV_LOCK:
-                    update_csv_file_under_lock(REGION_LEAGUE_CSV, updates, "league_id",
-                        ["league", "other_names", "abbreviations", "search_terms"])
+                    update_csv_file_under_lock(REGION_LEAGUE_CSV, updates, "league_id", LEAGUE_CSV_FIELDS)
                 print(f"    [SearchDict] ✓ League '{league_name}' enriched")
         except Exception as e:
             print(f"    [SearchDict] League enrichment error (non-fatal): {e}")
@@ -689,7 +926,8 @@ async def enrich_batch_teams_search_dict(team_pairs: list, batch_size: int = 10)
     
     Args:
         team_pairs: List of dicts with 'team_id' and 'team_name' (or 'name').
-        batch_size: Number of teams per LLM call (default 10).
+        batch_size: Minimum names resolved per persistence step. The number of teams
+                    per LLM call is set by the token budget (see pack_entities()).
     """
     if not team_pairs:
         return
@@ -715,12 +953,13 @@ async def enrich_batch_teams_search_dict(team_pairs: list, batch_size: int = 10)
     if not unenriched:
         return
 
-    print(f"    [SearchDict Batch] Enriching {len(unenriched)} unenriched teams in batches of {batch_size}...")
+    window = max(batch_size, ENRICH_WINDOW)
+    print(f"    [SearchDict Batch] Enriching {len(unenriched)} unenriched teams (packed prompts, {window} per step)...")
 
-    # 2. Process in batches
+    # 2. Process in windows; each window is packed into as few prompts as the token budget allows
     total_enriched = 0
     consecutive_failures = 0
-    for i in range(0, len(unenriched), batch_size):
+    for step, i in enumerate(range(0, len(unenriched), window), start=1):
         # Circuit-breaker: abort if no LLM providers are available
         from Core.Intelligence.llm_health_manager import health_manager
         if not health_manager._gemini_active and not getattr(health_manager, '_grok_active', False):
@@ -728,68 +967,38 @@ async def enrich_batch_teams_search_dict(team_pairs: list, batch_size: int = 10)
             print(f"    [SearchDict Batch] ⚠ No LLM providers available — skipping remaining {remaining} teams.")
             break
 
-        batch = unenriched[i:i + batch_size]
-        batch_names = [t['team_name'] for t in batch]
-        batch_id_map = {t['team_name']: t['team_id'] for t in batch}
+        batch = unenriched[i:i + window]
+        name_to_ids = defaultdict(list)
+        for t in batch:
+            name_to_ids[t['team_name']].append(t['team_id'])
 
         try:
-            results = await async_query_llm_for_metadata(batch_names, item_type="team")
+            resolved = await enrich_entities_packed(list(name_to_ids), item_type="team")
 
             # Circuit-breaker: track consecutive empty results
-            if not results:
+            if not resolved:
                 consecutive_failures += 1
                 if consecutive_failures >= 3:
-                    remaining = len(unenriched) - i - batch_size
+                    remaining = len(unenriched) - i - window
                     print(f"    [SearchDict Batch] ⚠ {consecutive_failures} consecutive LLM failures — aborting enrichment ({remaining} teams remaining).")
                     break
                 continue
             consecutive_failures = 0
 
             updates = {}
-            for idx, item in enumerate(results):
-                # Prefer LLM's input_name for mapping; fall back to index
-                input_name = item.get("input_name", "")
-                tid = batch_id_map.get(input_name)
-                tname = input_name or (batch_names[idx] if idx < len(batch_names) else None)
-                if not tid and idx < len(batch_names):
-                    tname = batch_names[idx]
-                    tid = batch_id_map.get(tname)
-                if not tid or not tname:
-                    continue
-
-                off_name = item.get("official_name") or tname
-                search_terms = {normalize_for_search(off_name), normalize_for_search(tname)}
-                for n in item.get("other_names", []):
-                    search_terms.add(normalize_for_search(n))
-                for a in item.get("abbreviations", []):
-                    search_terms.add(normalize_for_search(a))
-
-                upsert_data = clean_none_values({
-                    "team_id": tid,
-                    "team_name": off_name,
-                    "other_names": item.get("other_names", []),
-                    "abbreviations": item.get("abbreviations", []),
-                    "search_terms": list(filter(None, search_terms)),
-                    "country": item.get("country"),
-                    "city": item.get("city"),
-                    "stadium": item.get("stadium"),
-                })
-                updates[tid] = upsert_data
+            for tname, item in resolved.items():
+                for tid in name_to_ids.get(tname, []):
+                    updates[tid] = _team_row(tid, [tname], item)
 
             if updates:
                 batch_upsert("teams", list(updates.values()))
                 async with CSV_LOCK:
-                    update_csv_file_under_lock(TEAMS_CSV, updates, "team_id",
-                        ["team_name", "other_names", "abbreviations", "search_terms", "country", "city", "stadium"])
+                    update_csv_file_under_lock(TEAMS_CSV, updates, "team_id", TEAM_CSV_FIELDS)
                 total_enriched += len(updates)
-                print(f"    [SearchDict Batch] ✓ Batch {i // batch_size + 1}: {len(updates)} teams enriched")
+                print(f"    [SearchDict Batch] ✓ Step {step}: {len(updates)} teams enriched")
 
         except Exception as e:
-            print(f"    [SearchDict Batch] Batch {i // batch_size + 1} error (non-fatal): {e}")
-
-        # Small delay between batches to avoid rate limiting
-        if i + batch_size < len(unenriched):
-            await asyncio.sleep(2)
+            print(f"    [SearchDict Batch] Step {step} error (non-fatal): {e}")
 
     if total_enriched:
         print(f"    [SearchDict Batch] ✓ Total: {total_enriched}/{len(unenriched)} teams enriched")
@@ -797,4 +1006,3 @@ async def enrich_batch_teams_search_dict(team_pairs: list, batch_size: int = 10)
 
 if __name__ == "__main__":
     asyncio.run(main())
-
@@ -9,6 +9,7 @@ from datetime import datetime as dt
 from playwright.async_api import async_playwright, Page, Browser
 
 from Core.Utils.constants import MAX_CONCURRENCY
+from Core.Utils.name_index import normalize_for_search
 from Core.Browser.site_helpers import fs_universal_popup_dismissal
 from Core.Intelligence.selector_manager import SelectorManager
 from Core.Browser.Extractors.league_page_extractor import extract_league_metadata, extract_league_match_urls
@@ -371,17 +372,16 @@ async def enrich_league_inline(page, league_url: str, league_id: str, league_nam
         updated = False
         target_row = None
         
-        # Find existing row by ID or Name
-        for row in all_leagues:
-            if row.get("league_id") == league_id:
-                target_row = row
-                break
-            # Fallback: match by name if ID is just a slug
-            row_id = row.get("league_id", "")
-            if row.get("league") == league_name and ("_" in row_id or row_id == "Unknown"):
-                target_row = row
-                print(f"    [Enrich Inline] Healing league ID: {row_id} -> {new_league_id}")
-                break
+        # Find existing row by ID, then by (normalized) name if the stored ID is just a slug
+        target_row = next((row for row in all_leagues if row.get("league_id") == league_id), None)
+        wanted = normalize_for_search(league_name) if target_row is None else ""
+        if wanted:
+            for row in all_leagues:
+                row_id = row.get("league_id", "")
+                if ("_" in row_id or row_id == "Unknown") and normalize_for_search(row.get("league", "")) == wanted:
+                    target_row = row
+                    print(f"    [Enrich Inline] Healing league ID: {row_id} -> {new_league_id}")
+                    break
 
         if target_row:
             if league_crest and league_crest != "Unknown":
@@ -0,0 +1,167 @@
+# replay_extractors.py: Re-run recorded extractor calls offline against the page archive.
+# Part of LeoBook Scripts — Diagnostics
+#
+# Functions: run_scenario(), replay_all(), main()
+
+"""
+Extractor Replay
+Runs the Flashscore / Football.com extractors against pages captured with
+LEO_PAGE_ARCHIVE=record (see Core/Browser/page_archive.py), with no network:
+every request is fulfilled from the archive and unrecorded ones are aborted.
+Each scenario (one recorded extractor call) is re-run --repeat times in a fresh
+browser context and timed; the summary reports min/median per extractor and
+how many rows each run produced, so extractor changes can be checked for both
+speed and output drift.
+
+  h2h                 extract_h2h_data          (after activate_h2h_tab)
+  standings           extract_standings_data    (after activate_standings_tab)
+  all_matches         extract_all_matches       (after expand_all_leagues)
+  league_match_urls   extract_league_match_urls (navigates itself)
+  league_matches      extract_league_matches    (Football.com schedule page)
+
+    python Scripts/replay_extractors.py
+    python Scripts/replay_extractors.py --only h2h,standings --repeat 5 --out replay.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.append(project_root)
+
+# Replaying must never append to the archive being replayed
+os.environ["LEO_PAGE_ARCHIVE"] = "replay"
+
+from playwright.async_api import async_playwright
+
+from Core.Browser.page_archive import PAGE_ARCHIVE_DIR, PageArchive
+from Core.Utils.constants import NAVIGATION_TIMEOUT
+
+EXTRACTORS = ("h2h", "standings", "all_matches", "league_match_urls", "league_matches")
+
+
+def _row_count(result: Any) -> int:
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values() if isinstance(v, (list, tuple, dict)))
+    return 0
+
+
+async def _call_extractor(page, scenario: Dict[str, Any]):
+    name, kwargs = scenario["extractor"], scenario.get("kwargs") or {}
+
+    if name == "league_match_urls":
+        from Core.Browser.Extractors.league_page_extractor import extract_league_match_urls
+        return await extract_league_match_urls(page, **kwargs)
+
+    await page.goto(scenario["url"], timeout=NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
+    if name == "h2h":
+        from Core.Browser.Extractors.h2h_extractor import activate_h2h_tab, extract_h2h_data
+        await activate_h2h_tab(page)
+        return await extract_h2h_data(page, **kwargs)
+    if name == "standings":
+        from Core.Browser.Extractors.standings_extractor import activate_standings_tab, extract_standings_data
+        await activate_standings_tab(page)
+        return await extract_standings_data(page, **kwargs)
+    if name == "all_matches":
+        from Modules.Flashscore.fs_extractor import expand_all_leagues, extract_all_matches
+        await expand_all_leagues(page)
+        return await extract_all_matches(page, **kwargs)
+    if name == "league_matches":
+        from Modules.FootballCom.extractor import extract_league_matches
+        return await extract_league_matches(page, **kwargs)
+    raise ValueError(f"Unknown extractor '{name}'")
+
+
+async def run_scenario(browser, archive: PageArchive, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """One timed replay of a scenario in a fresh context (page load included, setup excluded)."""
+    options = {"timezone_id": "Africa/Lagos"}
+    if scenario.get("viewport"):
+        options["viewport"] = scenario["viewport"]
+    if scenario.get("user_agent"):
+        options["user_agent"] = scenario["user_agent"]
+    context = await browser.new_context(**options)
+    try:
+        await archive.replay_context(context)
+        page = await context.new_page()
+        misses_before = archive.stats["misses"]
+        start = time.perf_counter()
+        try:
+            result = await _call_extractor(page, scenario)
+            error = None
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"[:300]
+        elapsed = time.perf_counter() - start
+        return {"seconds": elapsed, "rows": _row_count(result), "error": error,
+                "misses": archive.stats["misses"] - misses_before}
+    finally:
+        await context.close()
+
+
+async def replay_all(archive_dir: str, only: List[str], repeat: int, headless: bool = True) -> Dict[str, Any]:
+    archive = PageArchive(archive_dir)
+    scenarios = [s for s in archive.scenarios() if s["extractor"] in only]
+    if not scenarios:
+        print(f"   [Replay] No scenarios for {', '.join(only)} in {archive_dir} (record with LEO_PAGE_ARCHIVE=record)")
+        return {"scenarios": [], "summary": {}}
+    print(f"   [Replay] {len(scenarios)} scenario(s), {len(archive.entries())} recorded request key(s), repeat={repeat}")
+
+    runs = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless, args=["--disable-dev-shm-usage", "--no-sandbox"])
+        try:
+            for scenario in scenarios:
+                attempts = [await run_scenario(browser, archive, scenario) for _ in range(repeat)]
+                times = [a["seconds"] for a in attempts]
+                last = attempts[-1]
+                status = f"ERROR {last['error']}" if last["error"] else f"{last['rows']} rows"
+                print(f"   [Replay] {scenario['extractor']:<18} median {statistics.median(times):7.2f}s  "
+                      f"{status}  misses={last['misses']}  {scenario['url'][:70]}")
+                runs.append({**scenario, "runs": attempts})
+        finally:
+            await browser.close()
+
+    by_extractor = defaultdict(list)
+    for run in runs:
+        by_extractor[run["extractor"]].extend(a["seconds"] for a in run["runs"] if not a["error"])
+    summary = {name: {"runs": len(times), "min_s": round(min(times), 4), "median_s": round(statistics.median(times), 4)}
+               for name, times in by_extractor.items() if times}
+
+    print("\n   [Replay] Summary:")
+    for name, stats in summary.items():
+        print(f"     {name:<18} runs={stats['runs']:<4} min={stats['min_s']:.3f}s median={stats['median_s']:.3f}s")
+    return {"scenarios": runs, "summary": summary, "archive_stats": dict(archive.stats)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded extractor scenarios offline.")
+    parser.add_argument("--archive", default=os.path.join(project_root, PAGE_ARCHIVE_DIR), help="Page archive directory")
+    parser.add_argument("--only", default=",".join(EXTRACTORS), help="Comma-separated extractors to replay")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per scenario")
+    parser.add_argument("--headed", action="store_true", help="Show the browser")
+    parser.add_argument("--out", help="Write the full results as JSON")
+    args = parser.parse_args()
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(only) - set(EXTRACTORS)
+    if unknown:
+        parser.error(f"unknown extractor(s): {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(replay_all(args.archive, only, max(1, args.repeat), headless=not args.headed))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"   [Replay] Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+import Scripts.build_search_dict as search_dict
+
+
+async def _overlapping_callers():
+    calls = []
+
+    async def fake_enrich(names, item_type):
+        calls.append(list(names))
+        await asyncio.sleep(0.2)  # the second caller arrives while this call is in flight
+        return {name: {"input_name": name} for name in names}
+
+    search_dict.enrich_entities_packed = fake_enrich
+    search_dict.COALESCE_WINDOW = 0.05
+    coalescer = search_dict._EnrichmentCoalescer("team")
+
+    async def late_caller():
+        await asyncio.sleep(0.1)
+        return await coalescer.resolve(["Late FC"])
+
+    first, second = await asyncio.wait_for(
+        asyncio.gather(coalescer.resolve(["Early FC"]), late_caller()), timeout=5)
+    return first, second, calls
+
+
+print("--- Testing _EnrichmentCoalescer with overlapping callers ---")
+try:
+    first, second, calls = asyncio.run(_overlapping_callers())
+    if "Early FC" in first and "Late FC" in second and calls == [["Early FC"], ["Late FC"]]:
+        print("SUCCESS: Both callers resolved (2 packed calls).")
+    else:
+        print(f"FAILED: Unexpected results {first} / {second} / calls={calls}")
+except asyncio.TimeoutError:
+    print("FAILED: A caller that arrived during the packed call was never resolved.")
+
+
+print("\n--- Testing find_best_match_league regressions ---")
+# (input league, existing league, should resolve to the existing row)
+LEAGUE_MATCH_REGRESSIONS = [
+    ("Indonesia Liga 1", "Indonesia Liga 2", False),
+    ("Premier League U21", "Premier League U23", False),
+    ("Liga 1 Women", "Liga 2 Women", False),
+    ("Campeonato Brasileiro Serie A", "Campeonato Brasileirao Serie A", True),
+]
+failed = 0
+for input_name, existing_name, should_match in LEAGUE_MATCH_REGRESSIONS:
+    existing = {"existing-id": {"league": existing_name, "country": "xx"}}
+    league_id, _is_new = search_dict.find_best_match_league(
+        input_name, "xx", existing, index=search_dict.build_league_index(existing))
+    if (league_id == "existing-id") != should_match:
+        failed += 1
+        print(f"FAILED: '{input_name}' vs '{existing_name}': expected {'match' if should_match else 'new league'}")
+if not failed:
+    print(f"SUCCESS: {len(LEAGUE_MATCH_REGRESSIONS)}/{len(LEAGUE_MATCH_REGRESSIONS)} league cases resolved as expected.")